@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+from typing import Dict, Optional
+
+from app.config.settings import Settings
+from app.infrastructure.datasources.deadlines import deadline
+from app.infrastructure.telemetry.metrics import metrics
+
+TIMEOUT_HEADER = b"x-request-timeout"
+
+deadline_exceeded = metrics.counter(
+    "http_request_deadline_exceeded_total",
+    "Peticiones cortadas con 504 por superar su plazo",
+)
+
+_TIMEOUT_BODY = json.dumps(
+    {"data": None, "error": {"message": "Request deadline exceeded", "status_code": 504}}
+).encode()
+
+
+class DeadlineMiddleware:
+    """
+    Asigna a cada petición un plazo, tomado de la cabecera X-Request-Timeout (segundos,
+    acotada por REQUEST_TIMEOUT_MAX_SECONDS) o del valor por defecto de su ruta, y lo
+    guarda en una contextvar para que repositorios y hashing lo respeten. Si la
+    petición no ha respondido al vencer, se corta con un 504
+    """
+    def __init__(self, app, settings: Settings):
+        self.app = app
+        self.default_timeout = settings.REQUEST_TIMEOUT_SECONDS
+        self.max_timeout = settings.REQUEST_TIMEOUT_MAX_SECONDS
+        # Prefijos más largos primero: gana la ruta más específica
+        self.route_timeouts: Dict[str, float] = dict(
+            sorted(settings.REQUEST_TIMEOUT_ROUTES.items(), key=lambda item: len(item[0]), reverse=True)
+        )
+
+    def _timeout_for(self, scope) -> Optional[float]:
+        for name, value in scope["headers"]:
+            if name == TIMEOUT_HEADER:
+                try:
+                    requested = float(value)
+                except ValueError:
+                    break
+                if requested > 0:
+                    return min(requested, self.max_timeout)
+                break
+        for prefix, timeout in self.route_timeouts.items():
+            if scope["path"].startswith(prefix):
+                return timeout
+        return self.default_timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timeout = self._timeout_for(scope)
+        if not timeout:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"started": False, "timed_out": False}
+
+        async def send_timeout():
+            state["timed_out"] = True
+            deadline_exceeded.inc(method=scope["method"])
+            await send({
+                "type": "http.response.start",
+                "status": 504,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(_TIMEOUT_BODY)).encode())],
+            })
+            await send({"type": "http.response.body", "body": _TIMEOUT_BODY})
+
+        with deadline(timeout) as expires_at:
+            async def send_wrapper(message):
+                if state["timed_out"]:
+                    return
+                if message["type"] == "http.response.start":
+                    # La respuesta llega tarde (p. ej. el 500 de una sentencia interrumpida
+                    # por el statement timeout): se sustituye por el 504
+                    if time.monotonic() >= expires_at:
+                        await send_timeout()
+                        return
+                    state["started"] = True
+                await send(message)
+
+            try:
+                await asyncio.wait_for(self.app(scope, receive, send_wrapper), timeout)
+            except asyncio.TimeoutError:
+                if not state["started"] and not state["timed_out"]:
+                    await send_timeout()
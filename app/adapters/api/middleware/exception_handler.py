@@ -2,6 +2,8 @@ from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
+import math
+from app.infrastructure.datasources.circuit_breaker import CircuitOpenError
 
 def add_exception_handlers(app: FastAPI):
     @app.exception_handler(StarletteHTTPException)
@@ -25,4 +27,15 @@ def add_exception_handlers(app: FastAPI):
             }
         )
     
+    @app.exception_handler(CircuitOpenError)
+    async def circuit_open_exception_handler(request: Request, exc: CircuitOpenError):
+        return JSONResponse(
+            status_code=503,
+            content={
+                "data": None,
+                "error": {"message": "Database unavailable", "status_code": 503}
+            },
+            headers={"Retry-After": str(math.ceil(exc.retry_after))}
+        )
+    
     # Puedes agregar más manejadores de excepciones aquí
\ No newline at end of file
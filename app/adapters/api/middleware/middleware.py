@@ -1,8 +1,8 @@
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
-import traceback
 import logging
+from app.infrastructure.telemetry.structured_logging import error_sampler
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +13,18 @@ class ExceptionMiddleware(BaseHTTPMiddleware):
             response = await call_next(request)
             return response
         except Exception as e:
-            logger.error(f"Unhandled exception: {str(e)}")
-            logger.error(traceback.format_exc())
+            # Los errores repetidos solo se cuentan; el traceback se captura una vez por ventana
+            capture, repeated = error_sampler.record(e)
+            if capture:
+                logger.error(
+                    "Unhandled exception: %s",
+                    e,
+                    exc_info=e,
+                    extra={"path": request.url.path, "repeated": repeated},
+                )
             
             # Return a 500 internal server error with a JSON response
             return JSONResponse(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 content={"detail": "Internal server error"},
-            )
\ No newline at end of file
+            )
@@ -0,0 +1,144 @@
+import hashlib
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Optional, Sequence
+
+from app.config.settings import Settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_SIGNATURE_TTL = 300  # segundos
+
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))) + os.sep
+_THIS_FILE = os.path.abspath(__file__)
+
+
+def sign_profile_request(secret: str, method: str, path: str, timestamp: Optional[int] = None) -> str:
+    """
+    Genera el valor de la cabecera X-Profile: "<timestamp>:<hmac-sha256>"
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    message = f"{timestamp}:{method.upper()}:{path}".encode()
+    signature = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f"{timestamp}:{signature}"
+
+
+def verify_profile_signature(secret: str, method: str, path: str, value: str) -> bool:
+    timestamp, _, _ = value.partition(":")
+    if not timestamp.isdigit() or abs(time.time() - int(timestamp)) > PROFILE_SIGNATURE_TTL:
+        return False
+    expected = sign_profile_request(secret, method, path, int(timestamp))
+    return hmac.compare_digest(expected, value)
+
+
+class StackSampler:
+    """
+    Profiler estadístico: muestrea periódicamente las pilas de los hilos que están
+    ejecutando código de la aplicación (bucle de eventos y threadpool de endpoints síncronos).
+    Si hay otras peticiones en curso a la vez, sus muestras también se incluyen
+    """
+    def __init__(self, interval: float, include_paths: Sequence[str] = (_APP_ROOT,)):
+        self.interval = interval
+        self.include_paths = tuple(include_paths)
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = self._collapse(frame, self.include_paths)
+                if stack:
+                    self.samples[stack] += 1
+
+    @staticmethod
+    def _collapse(frame, include_paths) -> Optional[str]:
+        frames = []
+        in_app = False
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == _THIS_FILE:
+                frame = frame.f_back
+                continue
+            in_app = in_app or code.co_filename.startswith(include_paths)
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        if not in_app:
+            return None
+        return ";".join(reversed(frames))
+
+
+class ProfilingMiddleware:
+    """
+    Perfila peticiones individuales cuando llevan una cabecera X-Profile firmada
+    o cuando son elegidas por PROFILING_SAMPLE_RATE. El resultado se escribe en
+    PROFILING_OUTPUT_DIR en formato de pilas colapsadas (flamegraph.pl, speedscope).
+    Las peticiones no perfiladas solo pagan la comprobación de la cabecera
+    """
+    def __init__(self, app, settings: Settings, include_paths: Sequence[str] = (_APP_ROOT,)):
+        self.app = app
+        self.include_paths = include_paths
+        self.secret = settings.PROFILING_SECRET
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.interval = settings.PROFILING_INTERVAL_MS / 1000
+        self.output_dir = settings.PROFILING_OUTPUT_DIR
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        sampler = StackSampler(self.interval, self.include_paths)
+        status = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            samples = sampler.stop()
+            self._write(scope, samples, time.perf_counter() - started, status.get("code"))
+
+    def _should_profile(self, scope) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        if self.secret:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return verify_profile_signature(self.secret, scope["method"], scope["path"], value.decode("latin-1"))
+        return False
+
+    def _write(self, scope, samples: Counter, elapsed: float, status_code: Optional[int]) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{status_code}"
+            f"-{elapsed * 1000:.0f}ms-{uuid.uuid4().hex[:8]}.collapsed"
+        )
+        path = os.path.join(self.output_dir, filename)
+        with open(path, "w") as fh:
+            for stack, count in samples.most_common():
+                fh.write(f"{stack} {count}\n")
+        return path
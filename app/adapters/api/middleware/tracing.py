@@ -0,0 +1,40 @@
+from app.infrastructure.telemetry.tracing import SPAN_KIND_SERVER, parse_traceparent, tracer
+
+TRACEPARENT_HEADER = b"traceparent"
+
+
+class TracingMiddleware:
+    """
+    Abre el span raíz de cada petición HTTP. Respeta la cabecera W3C traceparent
+    para continuar trazas iniciadas por otros servicios
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        remote_parent = None
+        for name, value in scope["headers"]:
+            if name == TRACEPARENT_HEADER:
+                remote_parent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        span = tracer.start_span(
+            f"{scope['method']} {scope['path']}",
+            SPAN_KIND_SERVER,
+            {"http.method": scope["method"], "http.target": scope["path"]},
+            remote_parent=remote_parent,
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500 and span.recording:
+                    span.set_error(f"HTTP {message['status']}")
+            await send(message)
+
+        with span:
+            await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.config.database import get_db
-from app.infrastructure.auth.jwt import Token
+from app.infrastructure.auth.jwt import Token, TokenIntrospectionRequest, require_introspection_client
 from app.adapters.controllers.auth_controller import AuthController
 from app.adapters.api.middleware.http_response import create_response
 
@@ -10,9 +11,14 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
 @router.post("/login", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     try:
-        token_data = AuthController.login(db, form_data.username, form_data.password)
+        client_ip = request.client.host if request.client else None
+        # bcrypt y, con la política block, la espera por hueco en el buffer de
+        # login_events bloquean: se ejecutan en el threadpool, no en el event loop
+        token_data = await run_in_threadpool(
+            AuthController.login, db, form_data.username, form_data.password, client_ip
+        )
         if not token_data:
             return create_response(
                 error={"message": "Incorrect email or password"},
@@ -23,4 +29,16 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         return create_response(
             error={"message": str(e)},
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/introspect", dependencies=[Depends(require_introspection_client)])
+def introspect_tokens(request: TokenIntrospectionRequest, db: Session = Depends(get_db)):
+    try:
+        results = AuthController.introspect(db, request.tokens)
+        return create_response(data={"results": results})
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
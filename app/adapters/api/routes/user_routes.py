@@ -1,15 +1,38 @@
-from fastapi import APIRouter, Depends, status
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from app.config.database import get_db
 from app.domain.entities import User
-from app.application.usecases.user_usecase import UserCreate, UserResponse
-from app.infrastructure.auth.jwt import get_current_active_user
+from app.domain.exceptions import EmailAlreadyRegisteredError
+from app.application.usecases.user_usecase import (
+    DEFAULT_USER_FIELD_SET, UserCreate, UserFieldSet, UserIds, UserResponse, UserUpdate, parse_user_fields
+)
+from app.infrastructure.auth.jwt import ensure_can_modify, get_current_active_user, get_current_admin_user
 from app.adapters.controllers.user_controller import UserController
 from app.adapters.api.middleware.http_response import create_response
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def user_fields(
+    fields: Optional[str] = Query(
+        None,
+        max_length=200,
+        description="Campos separados por comas: id, email, is_active, created_at, updated_at, last_login_at",
+    ),
+) -> UserFieldSet:
+    """
+    Conjunto de campos pedido con ?fields=; los conjuntos se construyen una vez y se reutilizan
+    """
+    if fields is None:
+        return DEFAULT_USER_FIELD_SET
+    try:
+        return parse_user_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
 def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
     try:
@@ -27,11 +50,71 @@ def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
 
+@router.get("/")
+def list_users(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    include_total: bool = Query(False),
+    field_set: UserFieldSet = Depends(user_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    try:
+        users = UserController.list_users(db, skip, limit, field_set)
+        items = field_set.list_adapter.dump_python(users, mode="json")
+        if not include_total:
+            return create_response(data=items)
+        total = UserController.count_users(db)
+        return create_response(data={"items": items, "total": total.value, "total_is_exact": total.is_exact})
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@router.get("/search")
+def search_users(
+    q: str = Query(..., min_length=1, max_length=254),
+    mode: Literal["prefix", "substring"] = Query("prefix"),
+    after: str = Query("", max_length=254),
+    limit: int = Query(50, ge=1, le=100),
+    field_set: UserFieldSet = Depends(user_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    try:
+        page = UserController.search_users(db, q, mode, after, limit, field_set)
+        return create_response(data={
+            "items": field_set.list_adapter.dump_python(page.items, mode="json"),
+            "next_after": page.next_after,
+            "mode": page.mode,
+        })
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @router.get("/me/")
-def read_users_me(current_user: User = Depends(get_current_active_user)):
+def read_users_me(
+    field_set: UserFieldSet = Depends(user_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
     try:
-        user_response = UserResponse.model_validate(current_user)
-        return create_response(data=user_response.model_dump())
+        # El principal de la autenticación ya trae id, email e is_active
+        if set(field_set.fields) <= set(UserResponse.model_fields):
+            user_response = field_set.adapter.validate_python(current_user)
+        else:
+            user_response = UserController.get_user_by_id(db, current_user.id, field_set)
+            if user_response is None:
+                return create_response(
+                    error={"message": "User not found"},
+                    status_code=status.HTTP_404_NOT_FOUND
+                )
+        return create_response(data=field_set.adapter.dump_python(user_response, mode="json"))
     except Exception as e:
         return create_response(
             error={"message": str(e)},
@@ -40,15 +123,84 @@ def read_users_me(current_user: User = Depends(get_current_active_user)):
 
 
 @router.get("/{user_id}")
-def read_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+def read_user(
+    user_id: int,
+    field_set: UserFieldSet = Depends(user_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
     try:
-        user = UserController.get_user_by_id(db, user_id)
+        user = UserController.get_user_by_id(db, user_id, field_set)
+        if user is None:
+            return create_response(
+                error={"message": "User not found"},
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        return create_response(data=field_set.adapter.dump_python(user, mode="json"))
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@router.patch("/{user_id}")
+def update_user(user_id: int, user_data: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+    ensure_can_modify(user_id, current_user)
+    try:
+        user = UserController.update_user(db, user_id, user_data)
         if user is None:
             return create_response(
                 error={"message": "User not found"},
                 status_code=status.HTTP_404_NOT_FOUND
             )
         return create_response(data=user.model_dump())
+    except EmailAlreadyRegisteredError:
+        return create_response(
+            error={"message": "Email already registered"},
+            status_code=status.HTTP_400_BAD_REQUEST
+        )
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_user(user_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)):
+    ensure_can_modify(user_id, current_user)
+    try:
+        if not UserController.delete_user(db, user_id):
+            return create_response(
+                error={"message": "User not found"},
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@router.post("/bulk/deactivate")
+def deactivate_users(user_ids: UserIds, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
+    try:
+        deactivated = UserController.deactivate_users(db, user_ids.ids)
+        return create_response(data={"ids": deactivated})
+    except Exception as e:
+        return create_response(
+            error={"message": str(e)},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@router.post("/bulk/delete")
+def delete_users(user_ids: UserIds, db: Session = Depends(get_db), current_user: User = Depends(get_current_admin_user)):
+    try:
+        deleted = UserController.delete_users(db, user_ids.ids)
+        return create_response(data={"ids": deleted})
     except Exception as e:
         return create_response(
             error={"message": str(e)},
@@ -1,23 +1,48 @@
 from datetime import timedelta
+from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 from app.config.settings import get_settings
-from app.infrastructure.auth.jwt import authenticate_user, create_access_token
+from app.infrastructure.auth.jwt import authenticate_user, create_access_token, introspect_tokens
+from app.infrastructure.auth.login_events import LoginEventRecorder
+from app.infrastructure.repositories.factory import user_repository_scope
 from app.domain.entities import User
+from app.infrastructure.telemetry.tracing import traced
 
 settings = get_settings()
 
 
+def _write_login_events(events: List[Dict[str, Any]]):
+    with user_repository_scope() as repository:
+        repository.record_logins(events)
+
+
+# Compartido por las peticiones del worker; el hilo de escritura se arranca en el lifespan
+login_events = LoginEventRecorder.from_settings(settings, writer=_write_login_events)
+
+
 class AuthController:
     @staticmethod
-    def login(db: Session, username: str, password: str):
+    @traced()
+    def login(db: Session, username: str, password: str, client_ip: Optional[str] = None):
         """
-        Autentica al usuario y genera un token JWT
+        Autentica al usuario y genera un token JWT. El intento se registra en
+        el buffer de login_events, sin escribir en la base de datos
         """
         user = authenticate_user(db, username, password)
+        if settings.LOGIN_EVENTS_ENABLED:
+            login_events.record(username, bool(user), user.id if user else None, client_ip)
         if not user:
             return None
         access_token_expires = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={"sub": user.email}, expires_delta=access_token_expires
         )
-        return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+        return {"access_token": access_token, "token_type": "bearer"}
+
+    @staticmethod
+    @traced()
+    def introspect(db: Session, tokens: List[str]) -> List[Dict[str, Any]]:
+        """
+        Devuelve el estado de cada token en el mismo orden en que se recibieron
+        """
+        return introspect_tokens(db, tokens)
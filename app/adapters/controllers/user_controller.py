@@ -1,7 +1,27 @@
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from app.infrastructure.repositories.user_repository import UserRepository
-from app.application.usecases.user_usecase import UserUseCase, UserCreate, UserUpdate, UserResponse
+from app.config.settings import get_settings
+from app.infrastructure.repositories.factory import get_user_repository, user_repository_scope
+from app.application.usecases.user_count import UserCountStrategy, UserTotal
+from pydantic import BaseModel
+from app.application.usecases.user_usecase import (
+    DEFAULT_USER_FIELD_SET, UserCreate, UserFieldSet, UserResponse, UserSearchPage, UserUpdate, UserUseCase
+)
+from app.infrastructure.telemetry.tracing import traced
+
+
+def _refresh_user_count() -> int:
+    with user_repository_scope() as repository:
+        return repository.count()
+
+
+settings = get_settings()
+# Compartida entre peticiones: guarda el último recuento exacto del proceso
+user_count_strategy = UserCountStrategy(
+    exact_threshold=settings.USER_COUNT_EXACT_THRESHOLD,
+    cache_ttl=settings.USER_COUNT_CACHE_TTL_SECONDS,
+    refresh=_refresh_user_count,
+)
 
 
 class UserController:
@@ -13,10 +33,11 @@ class UserController:
         """
         Obtiene una instancia del caso de uso de usuarios
         """
-        user_repository = UserRepository(db)
-        return UserUseCase(user_repository)
+        user_repository = get_user_repository(db)
+        return UserUseCase(user_repository, user_count_strategy)
     
     @staticmethod
+    @traced()
     def create_user(db: Session, user_data: UserCreate) -> Optional[UserResponse]:
         """
         Crea un nuevo usuario
@@ -25,14 +46,16 @@ class UserController:
         return usecase.create_user(user_data)
 
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[UserResponse]:
+    @traced()
+    def get_user_by_id(db: Session, user_id: int, field_set: UserFieldSet = DEFAULT_USER_FIELD_SET) -> Optional[BaseModel]:
         """
         Obtiene un usuario por su ID
         """
         usecase = UserController._get_usecase(db)
-        return usecase.get_user_by_id(user_id)
+        return usecase.get_user_by_id(user_id, field_set)
         
     @staticmethod
+    @traced()
     def get_user_by_email(db: Session, email: str) -> Optional[UserResponse]:
         """
         Obtiene un usuario por su email
@@ -41,6 +64,7 @@ class UserController:
         return usecase.get_user_by_email(email)
         
     @staticmethod
+    @traced()
     def update_user(db: Session, user_id: int, user_data: UserUpdate) -> Optional[UserResponse]:
         """
         Actualiza los datos de un usuario
@@ -49,6 +73,7 @@ class UserController:
         return usecase.update_user(user_id, user_data)
         
     @staticmethod
+    @traced()
     def delete_user(db: Session, user_id: int) -> bool:
         """
         Elimina un usuario
@@ -57,9 +82,51 @@ class UserController:
         return usecase.delete_user(user_id)
         
     @staticmethod
-    def list_users(db: Session, skip: int = 0, limit: int = 100) -> List[UserResponse]:
+    @traced()
+    def deactivate_users(db: Session, user_ids: List[int]) -> List[int]:
+        """
+        Desactiva varios usuarios
+        """
+        usecase = UserController._get_usecase(db)
+        return usecase.deactivate_users(user_ids)
+        
+    @staticmethod
+    @traced()
+    def delete_users(db: Session, user_ids: List[int]) -> List[int]:
+        """
+        Elimina varios usuarios
+        """
+        usecase = UserController._get_usecase(db)
+        return usecase.delete_users(user_ids)
+        
+    @staticmethod
+    @traced()
+    def list_users(
+        db: Session, skip: int = 0, limit: int = 100, field_set: UserFieldSet = DEFAULT_USER_FIELD_SET
+    ) -> List[BaseModel]:
         """
         Lista usuarios con paginación
         """
         usecase = UserController._get_usecase(db)
-        return usecase.list_users(skip, limit)
\ No newline at end of file
+        return usecase.list_users(skip, limit, field_set)
+        
+    @staticmethod
+    @traced()
+    def search_users(
+        db: Session, term: str, mode: str = "prefix", after: str = "", limit: int = 50,
+        field_set: UserFieldSet = DEFAULT_USER_FIELD_SET,
+    ) -> UserSearchPage:
+        """
+        Busca usuarios por prefijo o subcadena del email
+        """
+        usecase = UserController._get_usecase(db)
+        return usecase.search_users(term, mode, after, limit, field_set)
+        
+    @staticmethod
+    @traced()
+    def count_users(db: Session) -> UserTotal:
+        """
+        Total de usuarios, exacto o estimado
+        """
+        usecase = UserController._get_usecase(db)
+        return usecase.count_users()
@@ -0,0 +1,83 @@
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional, Tuple
+
+from app.domain.interfaces.repositories import UserRepositoryInterface
+
+logger = logging.getLogger(__name__)
+
+
+class UserTotal(NamedTuple):
+    value: int
+    is_exact: bool
+
+
+class UserCountStrategy:
+    """
+    Decide cómo obtener el total de usuarios para la paginación:
+
+    - Tablas pequeñas (por debajo de exact_threshold): count(*) exacto en cada petición.
+    - Tablas grandes: el último recuento exacto cacheado, que se recalcula en segundo
+      plano cuando caduca; mientras no exista, la estimación del planificador.
+
+    El tamaño se conoce por la estimación del motor o, si no la hay, por el último
+    recuento exacto
+    """
+    def __init__(
+        self,
+        exact_threshold: int = 100_000,
+        cache_ttl: float = 60.0,
+        refresh: Optional[Callable[[], int]] = None,
+        executor: Optional[Executor] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.exact_threshold = exact_threshold
+        self.cache_ttl = cache_ttl
+        self._refresh = refresh
+        self._executor = executor
+        self._clock = clock
+        self._cached: Optional[Tuple[int, float]] = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def total(self, repository: UserRepositoryInterface) -> UserTotal:
+        estimate = repository.estimate_count()
+        cached = self._cached
+        known_size = estimate if estimate is not None else (cached[0] if cached else None)
+
+        if known_size is None or known_size < self.exact_threshold:
+            exact = repository.count()
+            self._store(exact)
+            return UserTotal(exact, True)
+
+        if cached is None or self._clock() - cached[1] >= self.cache_ttl:
+            self._schedule_refresh()
+        if cached is not None:
+            return UserTotal(cached[0], False)
+        return UserTotal(estimate, False)
+
+    def _store(self, value: int):
+        self._cached = (value, self._clock())
+
+    def _schedule_refresh(self):
+        if self._refresh is None:
+            return
+        with self._lock:
+            # Un único recuento en curso aunque lleguen muchas peticiones a la vez
+            if self._refreshing:
+                return
+            self._refreshing = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-count")
+        self._executor.submit(self._run_refresh)
+
+    def _run_refresh(self):
+        try:
+            self._store(self._refresh())
+        except Exception:
+            logger.exception("Background user count refresh failed")
+        finally:
+            with self._lock:
+                self._refreshing = False
@@ -1,9 +1,13 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional, List
+from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, EmailStr, ConfigDict, TypeAdapter, create_model
+from typing import Any, Dict, NamedTuple, Optional, List, Tuple
 
+from app.application.usecases.user_count import UserCountStrategy, UserTotal
 from app.domain.entities import User
 from app.domain.interfaces.repositories import UserRepositoryInterface
 from app.infrastructure.auth.jwt import get_password_hash
+from app.infrastructure.telemetry.tracing import traced
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -14,6 +18,9 @@ class UserUpdate(BaseModel):
     password: Optional[str] = None
     is_active: Optional[bool] = None
 
+class UserIds(BaseModel):
+    ids: List[int]
+
 class UserResponse(BaseModel):
     id: int
     email: str
@@ -21,83 +28,199 @@ class UserResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+class UserSearchPage(NamedTuple):
+    items: List[BaseModel]
+    next_after: Optional[str]
+    mode: str
+
+
+class UserFieldSet(NamedTuple):
+    fields: Tuple[str, ...]
+    adapter: TypeAdapter
+    list_adapter: TypeAdapter
+
+
+# Los trigramas solo acotan la búsqueda por subcadena a partir de 3 caracteres;
+# con menos, el índice no filtra y se recorrería casi toda la tabla
+MIN_SUBSTRING_LENGTH = 3
+
+# Se construye una sola vez: valida y serializa listas completas en una sola llamada
+user_response_list_adapter = TypeAdapter(List[UserResponse])
+
+# Campos que se pueden pedir con ?fields=, en el orden en que se serializan.
+# hashed_password nunca se expone
+USER_FIELDS: Dict[str, Any] = {
+    "id": int,
+    "email": str,
+    "is_active": bool,
+    "created_at": Optional[datetime],
+    "updated_at": Optional[datetime],
+    "last_login_at": Optional[datetime],
+}
+DEFAULT_USER_FIELD_SET = UserFieldSet(
+    tuple(UserResponse.model_fields), TypeAdapter(UserResponse), user_response_list_adapter
+)
+
+
+@lru_cache(maxsize=64)
+def user_field_set(fields: Tuple[str, ...]) -> UserFieldSet:
+    """
+    Modelo y TypeAdapters de un conjunto de campos, construidos una sola vez
+    """
+    if fields == DEFAULT_USER_FIELD_SET.fields:
+        return DEFAULT_USER_FIELD_SET
+    model = create_model(
+        f"UserResponse_{'_'.join(fields)}",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (USER_FIELDS[name], ...) for name in fields},
+    )
+    return UserFieldSet(fields, TypeAdapter(model), TypeAdapter(List[model]))
+
+
+@lru_cache(maxsize=256)
+def parse_user_fields(value: str) -> UserFieldSet:
+    """
+    Convierte el parámetro fields ("email,id") en su conjunto de campos canónico;
+    lanza ValueError si pide campos desconocidos o ninguno
+    """
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - USER_FIELDS.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("At least one field is required")
+    return user_field_set(tuple(name for name in USER_FIELDS if name in requested))
+
+
+def _projection(field_set: UserFieldSet) -> Dict[str, Tuple[str, ...]]:
+    """
+    Argumentos de proyección para el repositorio; sin ellos usa sus sentencias de resumen
+    """
+    return {} if field_set is DEFAULT_USER_FIELD_SET else {"fields": field_set.fields}
+
+
+def _rows_as_dicts(rows) -> List[dict]:
+    """
+    Convierte filas proyectadas en dicts; validar dicts es mucho más rápido
+    que validar con from_attributes, que accede a cada columna por getattr
+    """
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    return [dict(zip(keys, row)) for row in rows]
+
+
 class UserUseCase:
     """
     Caso de uso para operaciones relacionadas con usuarios
     """
-    def __init__(self, user_repository: UserRepositoryInterface):
+    def __init__(self, user_repository: UserRepositoryInterface, count_strategy: Optional[UserCountStrategy] = None):
         self.user_repository = user_repository
+        self.count_strategy = count_strategy
     
+    @traced()
     def create_user(self, user_data: UserCreate) -> Optional[UserResponse]:
         """
         Crea un nuevo usuario
         """
-        # Verificar si el usuario ya existe
-        existing_user = self.user_repository.get_by_email(user_data.email)
-        if existing_user:
-            return None
-            
-        # Crear el usuario
-        user = User(
-            email=user_data.email,
-            hashed_password=get_password_hash(user_data.password)
+        # La restricción única del email detecta los duplicados en el mismo INSERT,
+        # sin una consulta previa y sin carreras entre registros concurrentes
+        created_user = self.user_repository.create_if_absent(
+            user_data.email, get_password_hash(user_data.password)
         )
-        created_user = self.user_repository.create(user)
+        if created_user is None:
+            return None
         return UserResponse.model_validate(created_user)
     
-    def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
+    @traced()
+    def get_user_by_id(self, user_id: int, field_set: UserFieldSet = DEFAULT_USER_FIELD_SET) -> Optional[BaseModel]:
         """
-        Obtiene un usuario por su ID
+        Obtiene un usuario por su ID con los campos del conjunto indicado
         """
-        user = self.user_repository.get_by_id(user_id)
+        user = self.user_repository.get_summary_by_id(user_id, **_projection(field_set))
         if user:
-            return UserResponse.model_validate(user)
+            return field_set.adapter.validate_python(user)
         return None
     
+    @traced()
     def get_user_by_email(self, email: str) -> Optional[UserResponse]:
         """
         Obtiene un usuario por su email
         """
-        user = self.user_repository.get_by_email(email)
+        user = self.user_repository.get_summary_by_email(email)
         if user:
             return UserResponse.model_validate(user)
         return None
         
+    @traced()
     def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[UserResponse]:
         """
-        Actualiza los datos de un usuario
+        Actualiza los datos de un usuario con una sola escritura.
+        Lanza EmailAlreadyRegisteredError si el nuevo email ya está en uso
         """
-        user = self.user_repository.get_by_id(user_id)
-        if not user:
-            return None
-            
         # Actualizar solo los campos proporcionados
-        if user_data.email is not None:
-            # Verificar que el nuevo email no esté en uso por otro usuario
-            if user_data.email != user.email:
-                existing_user = self.user_repository.get_by_email(user_data.email)
-                if existing_user and existing_user.id != user_id:
-                    return None  # Email ya en uso
-            user.email = user_data.email
-            
-        if user_data.password is not None:
-            user.hashed_password = get_password_hash(user_data.password)
+        values = user_data.model_dump(exclude_none=True)
+        password = values.pop("password", None)
+        if password is not None:
+            values["hashed_password"] = get_password_hash(password)
             
-        if user_data.is_active is not None:
-            user.is_active = user_data.is_active
-            
-        updated_user = self.user_repository.update(user)
+        updated_user = self.user_repository.update_fields(user_id, values)
+        if updated_user is None:
+            return None
         return UserResponse.model_validate(updated_user)
         
+    @traced()
     def delete_user(self, user_id: int) -> bool:
         """
         Elimina un usuario
         """
         return self.user_repository.delete(user_id)
         
-    def list_users(self, skip: int = 0, limit: int = 100) -> List[UserResponse]:
+    @traced()
+    def deactivate_users(self, user_ids: List[int]) -> List[int]:
+        """
+        Desactiva varios usuarios y devuelve los IDs afectados
+        """
+        return self.user_repository.deactivate_many(user_ids)
+        
+    @traced()
+    def delete_users(self, user_ids: List[int]) -> List[int]:
+        """
+        Elimina varios usuarios y devuelve los IDs eliminados
+        """
+        return self.user_repository.delete_many(user_ids)
+        
+    @traced()
+    def list_users(self, skip: int = 0, limit: int = 100, field_set: UserFieldSet = DEFAULT_USER_FIELD_SET) -> List[BaseModel]:
+        """
+        Lista usuarios con paginación y los campos del conjunto indicado
+        """
+        users = self.user_repository.list_summaries(skip, limit, **_projection(field_set))
+        return field_set.list_adapter.validate_python(_rows_as_dicts(users))
+        
+    @traced()
+    def search_users(
+        self, term: str, mode: str = "prefix", after: str = "", limit: int = 50,
+        field_set: UserFieldSet = DEFAULT_USER_FIELD_SET,
+    ) -> UserSearchPage:
+        """
+        Busca usuarios por prefijo o subcadena del email. Una subcadena demasiado corta
+        se busca como prefijo; el modo usado se devuelve junto con el cursor de la
+        siguiente página (None si no hay más)
+        """
+        if mode == "substring" and len(term) < MIN_SUBSTRING_LENGTH:
+            mode = "prefix"
+        rows = self.user_repository.search_summaries(term, mode == "substring", after, limit, **_projection(field_set))
+        items = field_set.list_adapter.validate_python(_rows_as_dicts(rows))
+        # El email siempre se proyecta, aunque no se haya pedido, porque es el cursor
+        next_after = rows[-1].email if len(rows) == limit else None
+        return UserSearchPage(items, next_after, mode)
+        
+    @traced()
+    def count_users(self) -> UserTotal:
         """
-        Lista usuarios con paginación
+        Total de usuarios para la paginación; exacto o estimado según la estrategia
         """
-        users = self.user_repository.list(skip, limit)
-        return [UserResponse.model_validate(user) for user in users]
\ No newline at end of file
+        if self.count_strategy is None:
+            return UserTotal(self.user_repository.count(), True)
+        return self.count_strategy.total(self.user_repository)
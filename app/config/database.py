@@ -1,16 +1,52 @@
+import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.config.settings import get_settings
+from app.config.settings import Settings, get_settings
+from app.infrastructure.datasources.circuit_breaker import CircuitBreaker, install_circuit_breaker
 
 settings = get_settings()
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def engine_options(settings: Settings) -> dict:
+    """
+    Opciones del engine: tamaño de la caché de sentencias compiladas y, con
+    psycopg 3, preparación en el servidor de las sentencias que se repiten
+    """
+    options = {"query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+    if make_url(settings.DATABASE_URL).get_driver_name() == "psycopg" and settings.DB_PREPARE_THRESHOLD is not None:
+        options["connect_args"] = {"prepare_threshold": settings.DB_PREPARE_THRESHOLD}
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings))
+# expire_on_commit=False: los repositorios confirman al terminar cada lectura para liberar
+# la conexión, y las entidades devueltas deben seguir siendo legibles sin volver a la base de datos
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
+db_breaker = CircuitBreaker.from_settings(settings)
+if settings.DB_BREAKER_ENABLED:
+    install_circuit_breaker(engine, db_breaker)
+
+
+def _dispose_engine_after_fork():
+    # Un worker creado con fork hereda los sockets del pool del proceso padre;
+    # se descartan sin cerrarlos para que el hijo abra sus propias conexiones
+    engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_dispose_engine_after_fork)
+
+
 def get_db():
+    # Con el circuito abierto la petición falla aquí (CircuitOpenError -> 503)
+    # sin esperar al pool ni al timeout de conexión
+    if settings.DB_BREAKER_ENABLED:
+        db_breaker.before_call()
     db = SessionLocal()
     try:
         yield db
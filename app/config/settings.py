@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 import os
 from functools import lru_cache
 
@@ -19,10 +19,107 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    JWT_KEY_ID: Optional[str] = None  # 'kid' de la clave activa
+    JWT_PRIVATE_KEY: Optional[str] = None  # PEM, para algoritmos RS*/ES*/PS*
+    JWT_PUBLIC_KEY: Optional[str] = None
+    JWT_VERIFICATION_KEYS: Dict[str, str] = {}  # kid -> clave anterior aún aceptada (rotación)
+    JWT_VERIFIED_CACHE_SIZE: int = 10000
+    
+    # Ids de los usuarios con permisos de administración (operaciones sobre otras
+    # cuentas y en bloque). Se asignan fuera de la API: el email lo elige el propio usuario
+    ADMIN_USER_IDS: List[int] = []
+    # Clientes autorizados a usar /auth/introspect con HTTP Basic: client_id -> secreto
+    INTROSPECTION_CLIENTS: Dict[str, str] = {}
     
     # Connection string
     DATABASE_URL: Optional[str] = None
     
+    # Caché de sentencias compiladas de SQLAlchemy y sentencias preparadas en el servidor
+    DB_QUERY_CACHE_SIZE: int = 500
+    # Circuit breaker de la base de datos
+    DB_BREAKER_ENABLED: bool = True
+    DB_BREAKER_WINDOW_SIZE: int = 20
+    DB_BREAKER_MINIMUM_CALLS: int = 10
+    DB_BREAKER_FAILURE_RATE: float = 0.5
+    DB_BREAKER_SLOW_CALL_SECONDS: float = 2.0
+    DB_BREAKER_SLOW_CALL_RATE: float = 0.8
+    DB_BREAKER_OPEN_SECONDS: float = 10.0
+    DB_BREAKER_HALF_OPEN_CALLS: int = 3
+    # Sharding: si se indican varias URLs, los usuarios se reparten entre ellas por hash del email
+    SHARD_DATABASE_URLS: List[str] = []
+    DB_PREPARE_THRESHOLD: Optional[int] = 5  # psycopg 3; None desactiva la preparación
+    
+    # Server (python -m app.serve)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: Optional[int] = None  # None: un worker por CPU disponible
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEPALIVE_TIMEOUT: int = 5
+    SERVER_LIMIT_CONCURRENCY: Optional[int] = None
+    
+    # Profiling por petición (desactivado por defecto)
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: Optional[str] = None  # clave HMAC de la cabecera X-Profile
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    
+    # Tracing
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_EXPORTER: str = "file"  # file | otlp
+    TRACING_FILE_PATH: str = "traces/spans.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json | text
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_ERROR_SAMPLING_WINDOW_SECONDS: float = 60.0
+    LOG_MAX_TRACEBACKS_PER_WINDOW: int = 20
+    ACCESS_LOG_ENABLED: bool = True
+    
+    # Migraciones
+    MIGRATION_LOCK_TIMEOUT: str = "5s"
+    MIGRATION_STATEMENT_TIMEOUT: str = "0"  # 0 = sin límite; CREATE INDEX CONCURRENTLY puede tardar
+    
+    # Totales del listado de usuarios
+    USER_COUNT_EXACT_THRESHOLD: int = 100000  # por encima se usa el recuento cacheado o estimado
+    USER_COUNT_CACHE_TTL_SECONDS: float = 60.0
+    
+    # Feed de cambios de usuarios (outbox + LISTEN/NOTIFY o sondeo) e invalidación de cachés
+    CHANGE_FEED_ENABLED: bool = True
+    CHANGE_FEED_POLL_INTERVAL_SECONDS: float = 1.0  # retraso máximo sin LISTEN/NOTIFY
+    CHANGE_FEED_RETENTION_SECONDS: float = 3600.0
+    CHANGE_FEED_GAP_TIMEOUT_SECONDS: float = 30.0  # espera máxima a un id saltado antes de vaciar la caché
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: float = 300.0  # 0 desactiva la caché
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+    INTROSPECT_MAX_TOKENS: int = 1000  # tokens por llamada a /auth/introspect
+    
+    # Registro diferido de intentos de login (login_events y users.last_login_at)
+    LOGIN_EVENTS_ENABLED: bool = True
+    LOGIN_EVENTS_BUFFER_SIZE: int = 10000  # eventos en memoria por worker
+    LOGIN_EVENTS_FLUSH_SIZE: int = 500
+    LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS: float = 1.0
+    LOGIN_EVENTS_OVERFLOW_POLICY: Literal["drop_newest", "drop_oldest", "block"] = "drop_oldest"
+    LOGIN_EVENTS_BLOCK_TIMEOUT_SECONDS: float = 0.05  # solo con la política block
+    
+    # Plazos por petición (segundos); 0 desactiva el plazo por defecto
+    REQUEST_TIMEOUT_SECONDS: float = 10.0
+    REQUEST_TIMEOUT_MAX_SECONDS: float = 30.0  # tope para la cabecera X-Request-Timeout
+    REQUEST_TIMEOUT_ROUTES: Dict[str, float] = {}  # prefijo de ruta -> plazo
+    
+    # Readiness
+    READINESS_INTERVAL_SECONDS: float = 5.0
+    READINESS_TIMEOUT_SECONDS: float = 2.0
+    READINESS_MAX_POOL_UTILIZATION: float = 0.9
+    READINESS_MAX_THREADPOOL_UTILIZATION: float = 0.9
+    
+    # Calentamiento al arrancar; readiness espera a que termine
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 5  # como mucho el tamaño del pool
+    WARMUP_TIMEOUT_SECONDS: float = 30.0
+    
     class Config:
         env_file = ".env"
         
@@ -1,14 +1,134 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import DDL, BigInteger, Column, Integer, String, Boolean, DateTime, Index, event, text
 from sqlalchemy.sql import func
 from app.config.database import Base
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Índice único de cobertura: en PostgreSQL las búsquedas de autenticación
+        # por email se resuelven con un index-only scan sin visitar el heap
+        Index(
+            "ix_users_email_covering",
+            "email",
+            unique=True,
+            postgresql_include=["id", "hashed_password", "is_active"],
+        ),
+        # El email es único sin distinguir mayúsculas, y la búsqueda por prefijo con
+        # paginación por email compara lower(email): en PostgreSQL un btree en collation
+        # "C" resuelve tanto el rango del prefijo como el ORDER BY del keyset; en SQLite
+        # la collation BINARY ya ordena por code points
+        Index("ix_users_email_lower", text('lower(email) COLLATE "C"'), unique=True).ddl_if(dialect="postgresql"),
+        Index("ix_users_email_lower", text("lower(email)"), unique=True).ddl_if(dialect="sqlite"),
+        # Búsqueda por subcadena con ILIKE '%...%' mediante trigramas (pg_trgm)
+        Index(
+            "ix_users_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True)
+    id = Column(Integer, primary_key=True)
+    email = Column(String)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Lo rellena en diferido el registro de logins; no dispara el feed de cambios
+    last_login_at = Column(DateTime(timezone=True), nullable=True)
+
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class UserChange(Base):
+    """
+    Outbox de cambios de usuarios: los triggers de users insertan una fila por cada
+    usuario actualizado o eliminado, con su id y su email anterior, para que los
+    workers invaliden sus cachés
+    """
+    __tablename__ = "user_changes"
+    # Sin AUTOINCREMENT, SQLite reutiliza los ids tras vaciar la tabla al podar y
+    # quedarían por detrás del cursor de los workers
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    email = Column(String)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class LoginEvent(Base):
+    """
+    Auditoría de intentos de login. Se escribe por lotes desde el buffer de cada
+    worker, así que created_at es el instante del intento y no el de la inserción.
+    user_id solo se conoce en los logins correctos
+    """
+    __tablename__ = "login_events"
+    __table_args__ = (
+        Index("ix_login_events_user_id_created_at", "user_id", "created_at"),
+        Index("ix_login_events_email_created_at", "email", "created_at"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, nullable=True)
+    email = Column(String, nullable=False)
+    succeeded = Column(Boolean, nullable=False)
+    ip_address = Column(String(45), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+# Solo los cambios que afectan a la autenticación generan eventos. Los triggers se
+# crean tras todas las tablas y de forma idempotente, porque create_all se ejecuta
+# en cada arranque
+_USER_CHANGE_TRIGGERS = {
+    "postgresql": [
+        """
+        CREATE OR REPLACE FUNCTION users_record_change() RETURNS trigger AS $$
+        DECLARE
+            change_id bigint;
+        BEGIN
+            INSERT INTO user_changes (user_id, email) VALUES (OLD.id, OLD.email) RETURNING id INTO change_id;
+            PERFORM pg_notify('user_changes', change_id::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'users_change_feed') THEN
+                CREATE TRIGGER users_change_feed
+                AFTER UPDATE OF email, hashed_password, is_active OR DELETE ON users
+                FOR EACH ROW EXECUTE FUNCTION users_record_change();
+            END IF;
+        END
+        $$
+        """,
+    ],
+    "sqlite": [
+        """
+        CREATE TRIGGER IF NOT EXISTS users_change_feed_update
+        AFTER UPDATE OF email, hashed_password, is_active ON users
+        BEGIN
+            INSERT INTO user_changes (user_id, email) VALUES (OLD.id, OLD.email);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS users_change_feed_delete
+        AFTER DELETE ON users
+        BEGIN
+            INSERT INTO user_changes (user_id, email) VALUES (OLD.id, OLD.email);
+        END
+        """,
+    ],
+}
+
+for _dialect, _statements in _USER_CHANGE_TRIGGERS.items():
+    for _statement in _statements:
+        event.listen(Base.metadata, "after_create", DDL(_statement).execute_if(dialect=_dialect))
@@ -0,0 +1,7 @@
+class EmailAlreadyRegisteredError(Exception):
+    """
+    El email ya pertenece a otro usuario
+    """
+    def __init__(self, email: str):
+        super().__init__(f"Email already registered: {email}")
+        self.email = email
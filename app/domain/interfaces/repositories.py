@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from abc import ABC, abstractmethod
+from sqlalchemy import Row
 from app.domain.entities import User
 
 class UserRepositoryInterface(ABC):
@@ -16,21 +17,89 @@ class UserRepositoryInterface(ABC):
         """Obtiene un usuario por su email"""
         pass
     
+    @abstractmethod
+    def get_auth_principal(self, email: str) -> Optional[Row]:
+        """Obtiene id, email, hashed_password e is_active de un usuario por su email"""
+        pass
+    
+    @abstractmethod
+    def get_summary_by_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Row]:
+        """Obtiene id, email e is_active (o los campos indicados) de un usuario por su ID"""
+        pass
+    
+    @abstractmethod
+    def get_summary_by_email(self, email: str) -> Optional[Row]:
+        """Obtiene id, email e is_active de un usuario por su email"""
+        pass
+    
+    @abstractmethod
+    def get_summaries_by_emails(self, emails: List[str]) -> List[Row]:
+        """Obtiene id, email e is_active de varios usuarios por sus emails"""
+        pass
+    
+    @abstractmethod
+    def list_summaries(self, skip: int = 0, limit: int = 100, fields: Optional[Tuple[str, ...]] = None) -> List[Row]:
+        """Lista id, email e is_active (o los campos indicados) de los usuarios con paginación"""
+        pass
+    
+    @abstractmethod
+    def search_summaries(
+        self, term: str, substring: bool = False, after: str = "", limit: int = 50,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Row]:
+        """Busca por prefijo o subcadena del email; id, email e is_active ordenados por email desde after"""
+        pass
+    
+    @abstractmethod
+    def count(self) -> int:
+        """Cuenta exactamente los usuarios"""
+        pass
+    
+    @abstractmethod
+    def estimate_count(self) -> Optional[int]:
+        """Estimación barata del número de usuarios; None si no hay estadísticas"""
+        pass
+    
     @abstractmethod
     def create(self, user: User) -> User:
         """Crea un nuevo usuario"""
         pass
     
+    @abstractmethod
+    def create_if_absent(self, email: str, hashed_password: str) -> Optional[Row]:
+        """Crea un usuario si el email no está registrado; devuelve None en caso contrario"""
+        pass
+    
     @abstractmethod
     def update(self, user: User) -> User:
         """Actualiza un usuario existente"""
         pass
     
+    @abstractmethod
+    def update_fields(self, user_id: int, values: Dict[str, Any]) -> Optional[Row]:
+        """Actualiza los campos indicados de un usuario; devuelve None si no existe"""
+        pass
+    
     @abstractmethod
     def delete(self, user_id: int) -> bool:
         """Elimina un usuario por su ID"""
         pass
     
+    @abstractmethod
+    def deactivate_many(self, user_ids: List[int]) -> List[int]:
+        """Desactiva varios usuarios y devuelve los IDs afectados"""
+        pass
+    
+    @abstractmethod
+    def delete_many(self, user_ids: List[int]) -> List[int]:
+        """Elimina varios usuarios y devuelve los IDs eliminados"""
+        pass
+    
+    @abstractmethod
+    def record_logins(self, events: List[Dict[str, Any]]) -> None:
+        """Guarda un lote de intentos de login y actualiza last_login_at de los correctos"""
+        pass
+    
     @abstractmethod
     def list(self, skip: int = 0, limit: int = 100) -> List[User]:
         """Lista usuarios con paginación"""
@@ -1,19 +1,32 @@
+import hmac
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from jose import JWTError
 from passlib.context import CryptContext
-from typing import Optional
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import HTTPBasic, HTTPBasicCredentials, OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.config.settings import get_settings
 from app.config.database import get_db
 from app.domain.entities import User
-from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.auth.principal_cache import PrincipalCache
+from app.infrastructure.auth.token_verifier import JWTKeyRing, TokenExpiredError
+from app.infrastructure.datasources.deadlines import check_deadline
+from app.infrastructure.repositories.factory import get_user_repository
+from app.infrastructure.telemetry.tracing import traced, tracer
 
 settings = get_settings()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Introspección: credenciales de cliente (Basic) o un token con el scope 'introspect'
+introspection_basic = HTTPBasic(auto_error=False)
+introspection_bearer = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+INTROSPECT_SCOPE = "introspect"
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Las claves se preparan una sola vez al importar el módulo
+key_ring = JWTKeyRing.from_settings(settings)
+# Invalidada por el feed de cambios de usuarios (suscrito en main)
+principal_cache = PrincipalCache.from_settings(settings)
 
 
 class Token(BaseModel):
@@ -25,14 +38,24 @@ class TokenData(BaseModel):
     email: Optional[str] = None
 
 
+class TokenIntrospectionRequest(BaseModel):
+    tokens: List[str] = Field(..., min_length=1, max_length=settings.INTROSPECT_MAX_TOKENS)
+
+
+@traced()
 def verify_password(plain_password, hashed_password):
+    # bcrypt cuesta cientos de ms: no se empieza si la petición ya ha vencido
+    check_deadline()
     return pwd_context.verify(plain_password, hashed_password)
 
 
+@traced()
 def get_password_hash(password):
+    check_deadline()
     return pwd_context.hash(password)
 
 
+@traced()
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -40,13 +63,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
+@traced()
 def authenticate_user(db: Session, email: str, password: str):
-    user_repo = UserRepository(db)
-    user = user_repo.get_by_email(email)
+    user_repo = get_user_repository(db)
+    user = user_repo.get_auth_principal(email)
     if not user:
         return False
     if not verify_password(password, user.hashed_password):
@@ -61,22 +85,131 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
+        with tracer.start_span("jwt.decode"):
+            payload = key_ring.decode(token)
+        email = payload.get("sub")
+        if not isinstance(email, str):
             raise credentials_exception
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
     
-    user_repo = UserRepository(db)
-    user = user_repo.get_by_email(email=token_data.email)
+    user = principal_cache.get(token_data.email)
     if user is None:
-        raise credentials_exception
+        generation = principal_cache.generation
+        user_repo = get_user_repository(db)
+        user = user_repo.get_auth_principal(token_data.email)
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(token_data.email, user, generation)
     return user
 
 
+@traced()
+def introspect_tokens(db: Session, tokens: List[str]) -> List[Dict[str, Any]]:
+    """
+    Verifica muchos tokens de una vez y devuelve, en el mismo orden, su estado:
+    active, inactive (usuario desactivado o inexistente), expired o invalid.
+    Los tokens repetidos se verifican una sola vez y todos los usuarios que no están
+    en la caché de principals se resuelven con una única consulta
+    """
+    claims_by_token: Dict[str, Optional[Dict[str, Any]]] = {}
+    statuses: Dict[str, str] = {}
+    with tracer.start_span("jwt.decode_many"):
+        for token in dict.fromkeys(tokens):
+            try:
+                claims = key_ring.decode(token)
+            except TokenExpiredError:
+                statuses[token] = "expired"
+                continue
+            except JWTError:
+                statuses[token] = "invalid"
+                continue
+            if not isinstance(claims.get("sub"), str):
+                statuses[token] = "invalid"
+                continue
+            claims_by_token[token] = claims
+
+    principals = {}
+    missing = []
+    for email in {claims["sub"] for claims in claims_by_token.values()}:
+        principal = principal_cache.get(email)
+        if principal is None:
+            missing.append(email)
+        else:
+            principals[email] = principal
+    if missing:
+        for summary in get_user_repository(db).get_summaries_by_emails(missing):
+            principals[summary.email] = summary
+
+    results = {}
+    for token, claims in claims_by_token.items():
+        principal = principals.get(claims["sub"])
+        active = principal is not None and bool(principal.is_active)
+        results[token] = {
+            "active": active,
+            "status": "active" if active else "inactive",
+            "sub": claims["sub"],
+            "user_id": principal.id if principal is not None else None,
+            "exp": claims.get("exp"),
+        }
+    for token, token_status in statuses.items():
+        results[token] = {"active": False, "status": token_status}
+    return [results[token] for token in tokens]
+
+
+async def require_introspection_client(
+    credentials: Optional[HTTPBasicCredentials] = Depends(introspection_basic),
+    token: Optional[str] = Depends(introspection_bearer),
+) -> str:
+    """
+    Autentica a quien llama a la introspección: un cliente de INTROSPECTION_CLIENTS
+    por HTTP Basic o un token con el scope 'introspect'. Devuelve el id del cliente
+    o el 'sub' del token
+    """
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Basic, Bearer"},
+    )
+    if credentials is not None:
+        secret = settings.INTROSPECTION_CLIENTS.get(credentials.username)
+        # Se compara igualmente con un client_id desconocido para no delatar cuáles existen
+        expected = (secret or "").encode()
+        if not hmac.compare_digest(credentials.password.encode(), expected) or secret is None:
+            raise unauthorized
+        return credentials.username
+    if token is None:
+        raise unauthorized
+    try:
+        claims = key_ring.decode(token)
+    except JWTError:
+        raise unauthorized
+    scopes = claims.get("scope")
+    if not isinstance(claims.get("sub"), str) or not isinstance(scopes, str) or INTROSPECT_SCOPE not in scopes.split():
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return claims["sub"]
+
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+def is_admin(user) -> bool:
+    return user.id in settings.ADMIN_USER_IDS
+
+
+def ensure_can_modify(user_id: int, current_user) -> None:
+    """
+    Un usuario solo puede modificar o eliminar su propia cuenta, salvo los administradores
+    """
+    if user_id != current_user.id and not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+
+async def get_current_admin_user(current_user: User = Depends(get_current_active_user)):
+    if not is_admin(current_user):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     return current_user
\ No newline at end of file
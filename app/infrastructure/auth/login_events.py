@@ -0,0 +1,159 @@
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from app.config.settings import Settings
+from app.infrastructure.telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DROP_NEWEST = "drop_newest"
+DROP_OLDEST = "drop_oldest"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_NEWEST, DROP_OLDEST, BLOCK)
+
+login_events_recorded = metrics.counter("login_events_recorded_total", "Intentos de login añadidos al buffer")
+login_events_dropped = metrics.counter("login_events_dropped_total", "Intentos de login descartados")
+login_events_flushed = metrics.counter("login_events_flushed_total", "Intentos de login escritos en la base de datos")
+login_events_flush_errors = metrics.counter("login_events_flush_errors_total", "Lotes de logins que fallaron al escribirse")
+
+
+class LoginEventRecorder:
+    """
+    Buffer acotado de intentos de login con escritura diferida. record() solo añade
+    el evento a una cola en memoria; un hilo en segundo plano la vacía por lotes
+    cuando llega a flush_size eventos o cada flush_interval segundos.
+
+    Con el buffer lleno se aplica overflow_policy:
+
+    - drop_newest: se descarta el evento nuevo.
+    - drop_oldest: se descarta el evento más antiguo del buffer.
+    - block: el login espera hasta block_timeout a que haya hueco y, si no, se
+      descarta el evento nuevo.
+
+    Un lote que falla vuelve al buffer mientras quepa y se reintenta en el siguiente
+    ciclo. Al parar se escribe lo que quede
+    """
+    def __init__(
+        self,
+        writer: Callable[[List[Dict[str, Any]]], None],
+        buffer_size: int = 10000,
+        flush_size: int = 500,
+        flush_interval: float = 1.0,
+        overflow_policy: str = DROP_OLDEST,
+        block_timeout: float = 0.05,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown login events overflow policy: {overflow_policy}")
+        self._writer = writer
+        self.buffer_size = buffer_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._flush_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings, writer: Callable[[List[Dict[str, Any]]], None]) -> "LoginEventRecorder":
+        return cls(
+            writer,
+            buffer_size=settings.LOGIN_EVENTS_BUFFER_SIZE,
+            flush_size=settings.LOGIN_EVENTS_FLUSH_SIZE,
+            flush_interval=settings.LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS,
+            overflow_policy=settings.LOGIN_EVENTS_OVERFLOW_POLICY,
+            block_timeout=settings.LOGIN_EVENTS_BLOCK_TIMEOUT_SECONDS,
+        )
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def record(self, email: str, succeeded: bool, user_id: Optional[int] = None, ip_address: Optional[str] = None):
+        """
+        Añade un intento al buffer sin tocar la base de datos
+        """
+        event = {
+            "user_id": user_id,
+            "email": email,
+            "succeeded": succeeded,
+            "ip_address": ip_address,
+            "created_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            if len(self._buffer) >= self.buffer_size:
+                if self.overflow_policy == DROP_OLDEST:
+                    self._buffer.popleft()
+                    login_events_dropped.inc(policy=DROP_OLDEST)
+                elif self.overflow_policy == BLOCK:
+                    self._flush_requested.set()
+                    if not self._not_full.wait_for(lambda: len(self._buffer) < self.buffer_size, self.block_timeout):
+                        login_events_dropped.inc(policy=BLOCK)
+                        return
+                else:
+                    login_events_dropped.inc(policy=DROP_NEWEST)
+                    return
+            self._buffer.append(event)
+            size = len(self._buffer)
+        login_events_recorded.inc()
+        if size >= self.flush_size:
+            self._flush_requested.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="login-events", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._flush_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 10)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            if not self._stop.is_set():
+                self.flush()
+
+    def flush(self) -> int:
+        """
+        Escribe el buffer en lotes de flush_size y devuelve cuántos eventos se escribieron
+        """
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.flush_size, len(self._buffer)))]
+                self._not_full.notify_all()
+            if not batch:
+                return written
+            try:
+                self._writer(batch)
+            except Exception:
+                login_events_flush_errors.inc()
+                logger.exception("Failed to write login events", extra={"events": len(batch)})
+                self._requeue(batch)
+                return written
+            written += len(batch)
+            login_events_flushed.inc(len(batch))
+            if len(batch) < self.flush_size:
+                return written
+
+    def _requeue(self, batch: List[Dict[str, Any]]):
+        with self._lock:
+            room = self.buffer_size - len(self._buffer)
+            # Se conservan los más recientes del lote fallido si no cabe entero
+            kept = batch[-room:] if room > 0 else []
+            self._buffer.extendleft(reversed(kept))
+            if len(kept) < len(batch):
+                login_events_dropped.inc(len(batch) - len(kept), policy="flush_error")
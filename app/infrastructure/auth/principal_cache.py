@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config.settings import Settings
+from app.infrastructure.datasources.change_feed import UserChangeEvent
+from app.infrastructure.telemetry.metrics import metrics
+
+principal_cache_lookups = metrics.counter("auth_principal_cache_total", "Consultas a la caché de principals")
+
+
+class PrincipalCache:
+    """
+    Caché acotada (LRU) de los principals de autenticación por email. Las entradas
+    caducan tras ttl segundos, pero lo normal es que las elimine antes el feed de
+    cambios (invalidate), de modo que el TTL puede ser largo sin servir un is_active
+    obsoleto más allá del retraso del feed. Con ttl 0 la caché está desactivada
+    """
+    def __init__(self, ttl: float = 300.0, max_size: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._emails_by_id: Dict[int, str] = {}
+        # Aumenta con cada invalidación: una lectura que empezó antes no se guarda
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "PrincipalCache":
+        # Sin feed de cambios no hay invalidación entre workers: no se cachea
+        ttl = settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS if settings.CHANGE_FEED_ENABLED else 0
+        return cls(ttl=ttl, max_size=settings.AUTH_PRINCIPAL_CACHE_SIZE)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, email: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and self._clock() < entry[1]:
+                # LRU: los principals en uso no son los primeros en descartarse
+                self._entries.move_to_end(email)
+            else:
+                entry = None
+        if entry is None:
+            principal_cache_lookups.inc(result="miss")
+            return None
+        principal_cache_lookups.inc(result="hit")
+        return entry[0]
+
+    def put(self, email: str, principal: Any, generation: int):
+        """
+        Guarda el principal leído de la base de datos si no ha habido invalidaciones
+        desde que se tomó 'generation' (la lectura podría estar obsoleta)
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[email] = (principal, self._clock() + self.ttl)
+            self._entries.move_to_end(email)
+            self._emails_by_id[principal.id] = email
+            while len(self._entries) > self.max_size:
+                self._forget(*self._entries.popitem(last=False))
+
+    def invalidate(self, changes: Optional[List[UserChangeEvent]]):
+        """
+        Elimina los usuarios cambiados, por id y por su email anterior; con None vacía la caché
+        """
+        with self._lock:
+            self._generation += 1
+            if changes is None:
+                self._entries.clear()
+                self._emails_by_id.clear()
+                return
+            for change in changes:
+                emails = {change.email, self._emails_by_id.pop(change.user_id, None)}
+                for email in emails:
+                    entry = self._entries.pop(email, None) if email is not None else None
+                    if entry is not None:
+                        self._forget(email, entry)
+
+    def _forget(self, email: str, entry: Tuple[Any, float]):
+        user_id = entry[0].id
+        if self._emails_by_id.get(user_id) == email:
+            del self._emails_by_id[user_id]
@@ -0,0 +1,187 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from calendar import timegm
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from jose import JWTError, jwk
+
+from app.config.settings import Settings
+
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+_TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+class TokenVerificationError(JWTError):
+    """
+    El token no es válido: formato, algoritmo, clave o firma incorrectos
+    """
+
+
+class TokenExpiredError(TokenVerificationError):
+    """
+    La firma es válida pero el token ha expirado
+    """
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        return timegm(value.utctimetuple())
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class PreparedKey:
+    """
+    Clave lista para firmar/verificar: el material se procesa una sola vez
+    """
+    __slots__ = ("kid", "algorithm", "sign", "verify")
+
+    def __init__(self, kid: Optional[str], algorithm: str,
+                 sign: Optional[Callable[[bytes], bytes]], verify: Callable[[bytes, bytes], bool]):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.sign = sign
+        self.verify = verify
+
+    @classmethod
+    def from_material(cls, kid: Optional[str], algorithm: str, material: str, private: bool = False) -> "PreparedKey":
+        if algorithm in _HMAC_DIGESTS:
+            secret = material.encode()
+            digest = _HMAC_DIGESTS[algorithm]
+
+            def sign(message: bytes) -> bytes:
+                return hmac.new(secret, message, digest).digest()
+
+            def verify(message: bytes, signature: bytes) -> bool:
+                return hmac.compare_digest(sign(message), signature)
+
+            return cls(kid, algorithm, sign, verify)
+
+        # RS*/ES*/PS*: el PEM se parsea aquí y no en cada verificación
+        key = jwk.construct(material, algorithm)
+        if private:
+            public = key.public_key()
+            return cls(kid, algorithm, key.sign, public.verify)
+        return cls(kid, algorithm, None, key.verify)
+
+
+class JWTKeyRing:
+    """
+    Firma y verifica JWT con claves preparadas una sola vez, selecciona la clave
+    de verificación por 'kid' (rotación de claves) y guarda en una caché acotada
+    los tokens ya verificados hasta su 'exp'
+    """
+    def __init__(self, algorithm: str, signing_key: PreparedKey,
+                 verification_keys: Dict[Optional[str], PreparedKey], cache_size: int = 10000):
+        self.algorithm = algorithm
+        self.signing_key = signing_key
+        self.verification_keys = verification_keys
+        self.cache_size = cache_size
+        header = {"alg": algorithm, "typ": "JWT"}
+        if signing_key.kid:
+            header["kid"] = signing_key.kid
+        self._header_segment = _b64encode(json.dumps(header, separators=(",", ":")).encode())
+        self._headers: Dict[str, PreparedKey] = {}
+        self._cache: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "JWTKeyRing":
+        algorithm = settings.JWT_ALGORITHM
+        kid = settings.JWT_KEY_ID
+        if algorithm in _HMAC_DIGESTS:
+            signing_key = PreparedKey.from_material(kid, algorithm, settings.JWT_SECRET_KEY)
+        else:
+            signing_key = PreparedKey.from_material(kid, algorithm, settings.JWT_PRIVATE_KEY, private=True)
+            if settings.JWT_PUBLIC_KEY:
+                signing_key.verify = PreparedKey.from_material(kid, algorithm, settings.JWT_PUBLIC_KEY).verify
+        verification_keys = {kid: signing_key}
+        for previous_kid, material in settings.JWT_VERIFICATION_KEYS.items():
+            verification_keys[previous_kid] = PreparedKey.from_material(previous_kid, algorithm, material)
+        return cls(algorithm, signing_key, verification_keys, settings.JWT_VERIFIED_CACHE_SIZE)
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        payload_segment = _b64encode(json.dumps(claims, separators=(",", ":"), default=_json_default).encode())
+        signing_input = self._header_segment + b"." + payload_segment
+        signature = _b64encode(self.signing_key.sign(signing_input))
+        return (signing_input + b"." + signature).decode()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(token)
+            if cached is not None:
+                claims, expires_at = cached
+                if now < expires_at:
+                    # LRU: los tokens en uso no son los primeros en descartarse
+                    self._cache.move_to_end(token)
+                    return claims
+                del self._cache[token]
+        if cached is not None:
+            raise TokenExpiredError("Signature has expired.")
+
+        claims = self._verify(token, now)
+        expires_at = claims.get("exp")
+        if isinstance(expires_at, (int, float)) and self.cache_size:
+            with self._lock:
+                self._cache[token] = (claims, expires_at)
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return claims
+
+    def _verify(self, token: str, now: float) -> Dict[str, Any]:
+        try:
+            header_segment, payload_segment, signature_segment = token.split(".")
+        except (AttributeError, ValueError):
+            raise TokenVerificationError("Not enough segments")
+
+        key = self._key_for_header(header_segment)
+        try:
+            signature = _b64decode(signature_segment)
+            if not key.verify(f"{header_segment}.{payload_segment}".encode(), signature):
+                raise TokenVerificationError("Signature verification failed.")
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, TypeError):
+            raise TokenVerificationError("Invalid token encoding")
+        if not isinstance(claims, dict):
+            raise TokenVerificationError("Invalid payload")
+
+        for claim in _TIME_CLAIMS:
+            if claim in claims and not isinstance(claims[claim], (int, float)):
+                raise TokenVerificationError(f"Invalid {claim} claim")
+        if "exp" in claims and now >= claims["exp"]:
+            raise TokenExpiredError("Signature has expired.")
+        if "nbf" in claims and now < claims["nbf"]:
+            raise TokenVerificationError("The token is not yet valid (nbf)")
+        return claims
+
+    def _key_for_header(self, header_segment: str) -> PreparedKey:
+        # La cabecera se repite en todos los tokens de una misma clave: se resuelve una vez
+        key = self._headers.get(header_segment)
+        if key is not None:
+            return key
+        try:
+            header = json.loads(_b64decode(header_segment))
+        except (ValueError, TypeError):
+            raise TokenVerificationError("Invalid header")
+        if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+            raise TokenVerificationError("The specified alg value is not allowed")
+        key = self.verification_keys.get(header.get("kid"))
+        if key is None:
+            raise TokenVerificationError("Unknown signing key")
+        if len(self._headers) < 64:
+            self._headers[header_segment] = key
+        return key
@@ -0,0 +1,234 @@
+import logging
+import select as selectors
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import NullPool
+
+from app.config.settings import Settings
+from app.domain.entities import UserChange
+from app.infrastructure.telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "user_changes"
+
+change_events = metrics.counter("user_change_feed_events_total", "Cambios de usuarios recibidos del feed")
+change_feed_errors = metrics.counter("user_change_feed_errors_total", "Errores leyendo el feed de cambios")
+change_feed_gaps = metrics.counter("user_change_feed_gaps_total", "Huecos de ids del feed por resultado")
+
+
+class UserChangeEvent(NamedTuple):
+    user_id: int
+    email: Optional[str]
+
+
+# Recibe los cambios leídos, o None si pudieron perderse y hay que vaciar la caché
+ChangeListener = Callable[[Optional[List[UserChangeEvent]]], None]
+
+
+class UserChangeFeed:
+    """
+    Lee en segundo plano la tabla user_changes y avisa a los suscriptores de los
+    usuarios modificados o eliminados desde cualquier worker o nodo.
+
+    La tabla es la fuente de verdad: cada worker guarda el último id leído y consulta
+    las filas posteriores. En PostgreSQL el trigger hace además pg_notify y el hilo
+    espera con LISTEN, así que los cambios llegan casi al instante; en otros motores
+    se consulta cada poll_interval segundos, que es el retraso máximo. Tras un error
+    de conexión se avisa con None porque pueden haberse perdido cambios.
+
+    Los ids se asignan al insertar, no al confirmar: una transacción con un id menor
+    puede confirmarse después de leer uno mayor. Los ids saltados se vuelven a
+    consultar en cada ciclo durante gap_timeout segundos; si un hueco no se llena en
+    ese tiempo (transacción larga o revertida), o hay demasiados, se avisa con None.
+    El hilo usa su propia conexión, fuera del pool de la aplicación
+    """
+    def __init__(
+        self,
+        engine: Engine,
+        poll_interval: float = 1.0,
+        retention_seconds: float = 3600.0,
+        batch_size: int = 1000,
+        map_user_id: Callable[[int], int] = lambda user_id: user_id,
+        gap_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._engine = create_engine(engine.url, poolclass=NullPool)
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        # Permite traducir ids locales de un shard a ids globales
+        self._map_user_id = map_user_id
+        self._listeners: List[ChangeListener] = []
+        self.gap_timeout = gap_timeout
+        self._clock = clock
+        self._cursor: Optional[int] = None
+        # id saltado -> instante en que se detectó el hueco
+        self._gaps: Dict[int, float] = {}
+        self._last_prune = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_settings(cls, engine: Engine, settings: Settings, **kw) -> "UserChangeFeed":
+        return cls(
+            engine,
+            poll_interval=settings.CHANGE_FEED_POLL_INTERVAL_SECONDS,
+            retention_seconds=settings.CHANGE_FEED_RETENTION_SECONDS,
+            gap_timeout=settings.CHANGE_FEED_GAP_TIMEOUT_SECONDS,
+            **kw,
+        )
+
+    def subscribe(self, listener: ChangeListener):
+        self._listeners.append(listener)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="user-change-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 5)
+            self._thread = None
+        self._engine.dispose()
+
+    def _run(self):
+        backoff = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                with self._engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                    listening = self._listen(conn)
+                    if self._cursor is None:
+                        # Al arrancar no hay nada cacheado: se empieza por el final
+                        self._cursor = conn.execute(select(func.coalesce(func.max(UserChange.id), 0))).scalar()
+                    backoff = self.poll_interval
+                    while not self._stop.is_set():
+                        self.poll(conn)
+                        self._wait(conn, listening)
+            except Exception:
+                change_feed_errors.inc()
+                logger.exception("User change feed failed; caches will be cleared")
+                self._publish(None)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+
+    def _listen(self, conn: Connection) -> bool:
+        if conn.dialect.name != "postgresql":
+            return False
+        conn.exec_driver_sql(f"LISTEN {CHANNEL}")
+        return True
+
+    def _wait(self, conn: Connection, listening: bool):
+        if not listening:
+            self._stop.wait(self.poll_interval)
+            return
+        dbapi_connection = conn.connection.dbapi_connection
+        # Se despierta con el primer NOTIFY o, como mucho, tras poll_interval
+        if callable(getattr(dbapi_connection, "notifies", None)):
+            # psycopg 3
+            for _ in dbapi_connection.notifies(timeout=self.poll_interval, stop_after=1):
+                pass
+            return
+        selectors.select([dbapi_connection], [], [], self.poll_interval)
+        dbapi_connection.poll()
+        dbapi_connection.notifies.clear()
+
+    def poll(self, conn: Connection) -> int:
+        """
+        Lee los cambios posteriores al cursor, avisa a los suscriptores y, de vez en
+        cuando, elimina las filas más antiguas que la retención. Devuelve cuántos leyó
+        """
+        if self._cursor is None:
+            self._cursor = 0
+        read = self._poll_gaps(conn)
+        while True:
+            rows = conn.execute(
+                select(UserChange.id, UserChange.user_id, UserChange.email)
+                .where(UserChange.id > self._cursor)
+                .order_by(UserChange.id)
+                .limit(self.batch_size)
+            ).all()
+            if not rows:
+                break
+            self._track_gaps(rows)
+            self._cursor = rows[-1].id
+            read += len(rows)
+            self._publish([UserChangeEvent(self._map_user_id(row.user_id), row.email) for row in rows])
+            if len(rows) < self.batch_size:
+                break
+        self._expire_gaps()
+        change_events.inc(read)
+        self._prune(conn)
+        return read
+
+    def _track_gaps(self, rows):
+        now = self._clock()
+        expected = self._cursor + 1
+        for row in rows:
+            if row.id - expected + len(self._gaps) > self.batch_size:
+                # Demasiados ids saltados (p. ej. un salto de la secuencia): no se
+                # pueden seguir uno a uno y se vacía la caché
+                change_feed_gaps.inc(result="overflow")
+                self._gaps.clear()
+                self._publish(None)
+            else:
+                for missing in range(expected, row.id):
+                    self._gaps[missing] = now
+            expected = row.id + 1
+
+    def _poll_gaps(self, conn: Connection) -> int:
+        """
+        Vuelve a consultar los ids saltados por si su transacción ya se confirmó
+        """
+        if not self._gaps:
+            return 0
+        rows = conn.execute(
+            select(UserChange.id, UserChange.user_id, UserChange.email)
+            .where(UserChange.id.in_(list(self._gaps)))
+            .order_by(UserChange.id)
+        ).all()
+        if not rows:
+            return 0
+        for row in rows:
+            del self._gaps[row.id]
+        change_feed_gaps.inc(len(rows), result="filled")
+        self._publish([UserChangeEvent(self._map_user_id(row.user_id), row.email) for row in rows])
+        return len(rows)
+
+    def _expire_gaps(self):
+        cutoff = self._clock() - self.gap_timeout
+        expired = [gap for gap, seen_at in self._gaps.items() if seen_at <= cutoff]
+        if not expired:
+            return
+        for gap in expired:
+            del self._gaps[gap]
+        # Lo normal es una transacción revertida, pero no se puede distinguir de
+        # una muy larga: se vacía la caché para no servir datos obsoletos
+        change_feed_gaps.inc(len(expired), result="expired")
+        self._publish(None)
+
+    def _prune(self, conn: Connection):
+        now = datetime.now(timezone.utc)
+        if (now.timestamp() - self._last_prune) < self.retention_seconds / 10:
+            return
+        self._last_prune = now.timestamp()
+        # Todos los workers podan y es idempotente. Un worker que haya estado
+        # desconectado más que la retención ya vació su caché al reconectar
+        cutoff = now - timedelta(seconds=self.retention_seconds)
+        conn.execute(delete(UserChange).where(UserChange.changed_at < cutoff))
+
+    def _publish(self, changes: Optional[List[UserChangeEvent]]):
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception:
+                logger.exception("User change listener failed")
@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config.settings import Settings
+from app.infrastructure.telemetry.metrics import metrics
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+transitions = metrics.counter("db_circuit_breaker_transitions_total", "Cambios de estado del circuit breaker")
+rejections = metrics.counter("db_circuit_breaker_rejections_total", "Peticiones rechazadas con el circuito abierto")
+
+
+class CircuitOpenError(Exception):
+    """
+    El circuito está abierto: la base de datos se considera no disponible
+    """
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con ventana deslizante de las últimas N llamadas.
+
+    - closed: las llamadas pasan; si en la ventana la tasa de errores o de llamadas
+      lentas supera su umbral (con un mínimo de llamadas), se abre.
+    - open: las llamadas se rechazan sin tocar la base de datos durante open_seconds.
+    - half_open: se admiten hasta half_open_calls llamadas de prueba; si todas van
+      bien se cierra, y al primer error o llamada lenta vuelve a abrirse.
+    """
+    def __init__(
+        self,
+        name: str = "database",
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 2.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 10.0,
+        half_open_calls: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.minimum_calls = minimum_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self._window = deque(maxlen=window_size)  # (fallida, lenta)
+        self._state = CLOSED
+        self._changed_at = 0.0
+        self._half_open_admitted = 0
+        self._half_open_succeeded = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings, name: str = "database") -> "CircuitBreaker":
+        return cls(
+            name=name,
+            window_size=settings.DB_BREAKER_WINDOW_SIZE,
+            minimum_calls=settings.DB_BREAKER_MINIMUM_CALLS,
+            failure_rate_threshold=settings.DB_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.DB_BREAKER_SLOW_CALL_SECONDS,
+            slow_call_rate_threshold=settings.DB_BREAKER_SLOW_CALL_RATE,
+            open_seconds=settings.DB_BREAKER_OPEN_SECONDS,
+            half_open_calls=settings.DB_BREAKER_HALF_OPEN_CALLS,
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    def _advance(self):
+        if self._state == OPEN and self._clock() - self._changed_at >= self.open_seconds:
+            self._transition(HALF_OPEN)
+        elif (
+            self._state == HALF_OPEN
+            and self._half_open_admitted >= self.half_open_calls
+            and self._clock() - self._changed_at >= self.open_seconds
+        ):
+            # Las pruebas admitidas no llegaron a la base de datos: se permiten otras
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state: str):
+        self._changed_at = self._clock()
+        self._half_open_admitted = 0
+        self._half_open_succeeded = 0
+        self._window.clear()
+        if state != self._state:
+            transitions.inc(to_state=state)
+        self._state = state
+
+    def before_call(self):
+        """
+        Lanza CircuitOpenError si la llamada no debe intentarse
+        """
+        with self._lock:
+            self._advance()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._half_open_admitted < self.half_open_calls:
+                self._half_open_admitted += 1
+                return
+            retry_after = max(self.open_seconds - (self._clock() - self._changed_at), 0.0)
+        rejections.inc()
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self, duration: float):
+        self._record(failed=False, slow=duration >= self.slow_call_seconds)
+
+    def record_failure(self):
+        self._record(failed=True, slow=False)
+
+    def _record(self, failed: bool, slow: bool):
+        with self._lock:
+            self._advance()
+            if self._state == OPEN:
+                return
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._transition(OPEN)
+                else:
+                    self._half_open_succeeded += 1
+                    if self._half_open_succeeded >= self.half_open_calls:
+                        self._transition(CLOSED)
+                return
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if calls < self.minimum_calls:
+                return
+            failures = sum(1 for outcome in self._window if outcome[0])
+            slow_calls = sum(1 for outcome in self._window if outcome[1])
+            if failures / calls >= self.failure_rate_threshold or slow_calls / calls >= self.slow_call_rate_threshold:
+                self._transition(OPEN)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            self._advance()
+            calls = len(self._window)
+            return {
+                "state": self._state,
+                "calls": calls,
+                "failure_rate": round(sum(1 for o in self._window if o[0]) / calls, 4) if calls else None,
+                "slow_call_rate": round(sum(1 for o in self._window if o[1]) / calls, 4) if calls else None,
+            }
+
+
+# SQLSTATE de una sentencia cancelada (statement_timeout o plazo de la petición)
+_QUERY_CANCELED = "57014"
+
+
+def _is_cancellation(error: BaseException) -> bool:
+    """
+    La sentencia se interrumpió por su plazo: la base de datos responde
+    """
+    if getattr(error, "pgcode", None) == _QUERY_CANCELED or getattr(error, "sqlstate", None) == _QUERY_CANCELED:
+        return True
+    # SQLite: el progress handler del plazo interrumpe la sentencia
+    return "interrupted" in str(error)
+
+
+def install_circuit_breaker(engine: Engine, breaker: CircuitBreaker):
+    """
+    Alimenta el breaker con cada sentencia ejecutada (duración) y con los fallos a
+    nivel de conexión: desconexiones, errores al conectar y esperas agotadas del
+    pool. Los errores de SQL o de integridad y las sentencias canceladas por el
+    plazo de la petición no cuentan: el plazo lo fija el cliente con
+    X-Request-Timeout y no debe poder abrir el circuito
+    """
+    metrics.gauge(
+        f"db_circuit_breaker_state_{breaker.name}",
+        "Estado del circuit breaker: 0 cerrado, 1 semiabierto, 2 abierto",
+        function=lambda: _STATE_VALUES[breaker.state],
+    )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["breaker_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("breaker_started_at", None)
+        if started is not None:
+            breaker.record_success(time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        if context.connection is not None:
+            context.connection.info.pop("breaker_started_at", None)
+        if _is_cancellation(context.original_exception):
+            return
+        connect_failed = context.connection is None and isinstance(
+            context.sqlalchemy_exception, (OperationalError, InterfaceError)
+        )
+        if context.is_disconnect or connect_failed:
+            breaker.record_failure()
+
+    # La espera agotada del pool no pasa por handle_error: se envuelve la obtención
+    # de la conexión en la propia instancia, que sobrevive a engine.dispose()
+    raw_connection = engine.raw_connection
+
+    def _raw_connection():
+        try:
+            return raw_connection()
+        except PoolTimeoutError:
+            breaker.record_failure()
+            raise
+
+    engine.raw_connection = _raw_connection
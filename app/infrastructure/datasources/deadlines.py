@@ -0,0 +1,123 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Instante (time.monotonic) en que vence la petición en curso; None si no tiene plazo.
+# Las contextvars se copian al threadpool, así que el plazo llega a los endpoints síncronos
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+# Cada cuántas instrucciones de la VM de SQLite se comprueba el plazo
+_SQLITE_PROGRESS_STEPS = 1000
+
+
+class DeadlineExceededError(Exception):
+    """
+    El plazo de la petición ha vencido antes de terminar el trabajo
+    """
+
+
+def remaining() -> Optional[float]:
+    """
+    Segundos que le quedan a la petición en curso, o None si no tiene plazo
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline():
+    """
+    Lanza DeadlineExceededError si el plazo de la petición ya ha vencido
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceededError("Request deadline exceeded")
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Fija el plazo de lo que se ejecute dentro del bloque. Un plazo exterior más
+    corto prevalece sobre el nuevo
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+    token = _deadline.set(expires_at)
+    try:
+        yield expires_at
+    finally:
+        _deadline.reset(token)
+
+
+# Límite ya fijado en la transacción en curso (ms), guardado en conn.info
+_TIMEOUT_KEY = "deadline_statement_timeout_ms"
+
+
+def _statement_timeout_to_set(info: dict, timeout_ms: int) -> Optional[int]:
+    """
+    Devuelve el statement_timeout que hay que fijar, o None si el de la transacción
+    sigue valiendo. Solo se vuelve a fijar cuando el plazo restante baja de la mitad
+    del ya fijado, así que una transacción hace como mucho unos pocos set_config
+    """
+    current = info.get(_TIMEOUT_KEY)
+    if current is not None and timeout_ms * 2 > current:
+        return None
+    info[_TIMEOUT_KEY] = timeout_ms
+    return timeout_ms
+
+
+def install_statement_timeouts(engine: Engine):
+    """
+    Traduce el plazo restante de la petición en un límite por sentencia:
+    set_config('statement_timeout', ..., true) en PostgreSQL, una vez por transacción
+    mientras el plazo restante no baje de la mitad del ya fijado, y un progress
+    handler que interrumpe la consulta en SQLite. Sin plazo no se hace nada.
+    set_config es una función y acepta parámetros enlazados en el servidor (psycopg 3
+    con prepare_threshold), a diferencia de SET
+    """
+    dialect = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        deadline_at = _deadline.get()
+        if deadline_at is None:
+            return
+        left = deadline_at - time.monotonic()
+        if left <= 0:
+            raise DeadlineExceededError("Request deadline exceeded before executing statement")
+        if dialect == "postgresql":
+            timeout_ms = _statement_timeout_to_set(conn.info, max(int(left * 1000), 1))
+            if timeout_ms is not None:
+                cursor.execute("SELECT set_config('statement_timeout', %s, true)", (str(timeout_ms),))
+        elif dialect == "sqlite":
+            # Un valor distinto de cero devuelto por el handler interrumpe la sentencia
+            conn.connection.dbapi_connection.set_progress_handler(
+                lambda: time.monotonic() >= deadline_at, _SQLITE_PROGRESS_STEPS
+            )
+            conn.info["deadline_progress_handler"] = True
+
+    def _clear_progress_handler(conn):
+        if conn is not None and conn.info.pop("deadline_progress_handler", False):
+            conn.connection.dbapi_connection.set_progress_handler(None, 0)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _clear_progress_handler(conn)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        _clear_progress_handler(context.connection)
+
+    # set_config(..., true) dura lo que la transacción
+    def _forget_statement_timeout(conn, *args):
+        conn.info.pop(_TIMEOUT_KEY, None)
+
+    for name in ("commit", "rollback", "rollback_savepoint"):
+        event.listen(engine, name, _forget_statement_timeout)
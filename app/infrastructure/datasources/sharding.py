@@ -0,0 +1,109 @@
+import contextvars
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Iterator, List, Sequence, Tuple, TypeVar
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config.database import engine_options
+from app.config.settings import Settings, get_settings
+
+T = TypeVar("T")
+
+# El shard va codificado en los bits bajos del id global: id = id_local * 1024 + shard.
+# Con la columna INTEGER caben ~2,1 millones de usuarios por shard; por encima hay
+# que ampliar users.id a BIGINT
+MAX_SHARDS = 1024
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+class ShardSet:
+    """
+    Conjunto de bases de datos entre las que se reparten los usuarios. Cada shard
+    tiene su propio engine y pool; el shard de un usuario se decide con un hash
+    estable de su email normalizado y queda codificado en su id
+    """
+    def __init__(self, engines: Sequence[Engine]):
+        if not 0 < len(engines) <= MAX_SHARDS:
+            raise ValueError(f"Between 1 and {MAX_SHARDS} shards are supported")
+        self.engines = list(engines)
+        self._sessionmakers = [
+            sessionmaker(bind=engine, autoflush=False, expire_on_commit=False) for engine in self.engines
+        ]
+        self._executor = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ShardSet":
+        return cls([create_engine(url, **engine_options(settings)) for url in settings.SHARD_DATABASE_URLS])
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def shard_for_email(self, email: str) -> int:
+        # blake2b y no hash(): el resultado no puede variar entre procesos ni versiones
+        digest = hashlib.blake2b(normalize_email(email).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big") % len(self.engines)
+
+    @staticmethod
+    def to_global_id(shard: int, local_id: int) -> int:
+        return local_id * MAX_SHARDS + shard
+
+    def split_id(self, global_id: int) -> Tuple[int, int]:
+        """
+        Devuelve (shard, id local); lanza KeyError si el shard no existe
+        """
+        shard, local_id = global_id % MAX_SHARDS, global_id // MAX_SHARDS
+        if shard >= len(self.engines) or local_id <= 0:
+            raise KeyError(global_id)
+        return shard, local_id
+
+    @contextmanager
+    def session(self, shard: int) -> Iterator[Session]:
+        """
+        Sesión de corta duración: la conexión vuelve al pool del shard al salir
+        """
+        session = self._sessionmakers[shard]()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def map(self, fn: Callable[[int], T], shards: Sequence[int] = None) -> List[T]:
+        """
+        Ejecuta fn(shard) en paralelo en los shards indicados (todos por defecto).
+        Cada tarea corre en una copia del contexto de quien llama, así que el plazo
+        de la petición y el span en curso llegan también a los hilos del executor
+        """
+        shards = range(len(self.engines)) if shards is None else shards
+        if len(shards) == 1:
+            return [fn(shards[0])]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.engines), thread_name_prefix="shard")
+        # Un Context no puede estar activo en dos hilos a la vez: una copia por tarea
+        futures = [self._executor.submit(contextvars.copy_context().run, fn, shard) for shard in shards]
+        return [future.result() for future in futures]
+
+    def dispose(self, close: bool = True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+        if close and self._executor is not None:
+            self._executor.shutdown(wait=False)
+        # Tras un fork los hilos del executor no existen en el hijo
+        self._executor = None
+
+
+@lru_cache()
+def get_shard_set() -> ShardSet:
+    shard_set = ShardSet.from_settings(get_settings())
+    if hasattr(os, "register_at_fork"):
+        # Igual que el engine principal: cada worker abre sus propias conexiones
+        os.register_at_fork(after_in_child=lambda: shard_set.dispose(close=False))
+    return shard_set
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import anyio.to_thread
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config.settings import Settings
+from app.infrastructure.datasources.circuit_breaker import OPEN, CircuitBreaker
+from app.infrastructure.health.warmup import WarmUp
+from app.infrastructure.telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+readiness_probes = metrics.counter("readiness_probe_total", "Sondeos de readiness por resultado")
+
+
+class ReadinessProber:
+    """
+    Comprueba en segundo plano, a intervalo fijo, la conexión a la base de datos,
+    el estado del circuit breaker, la saturación del pool y la del threadpool donde se ejecutan los endpoints
+    síncronos y el hashing de contraseñas. /ready solo lee el último resultado,
+    así que su coste no depende de cuántas veces se consulte. Mientras dure el
+    calentamiento inicial la instancia no está lista
+    """
+    def __init__(self, engine: Engine, settings: Settings, breaker: Optional[CircuitBreaker] = None,
+                 warmup: Optional[WarmUp] = None):
+        self.engine = engine
+        self.breaker = breaker
+        self.warmup = warmup
+        self.interval = settings.READINESS_INTERVAL_SECONDS
+        self.timeout = settings.READINESS_TIMEOUT_SECONDS
+        self.max_pool_utilization = settings.READINESS_MAX_POOL_UTILIZATION
+        self.max_threadpool_utilization = settings.READINESS_MAX_THREADPOOL_UTILIZATION
+        # Si el prober se bloquea o muere, el resultado caduca y la instancia deja de estar lista
+        self.stale_after = self.interval * 3
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.probe()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.probe()
+            except Exception:
+                logger.exception("Readiness probe failed")
+
+    async def probe(self) -> Dict[str, Any]:
+        checks = {
+            "database": await self._check_database(),
+            "pool": self._check_pool(),
+            "threadpool": self._check_threadpool(),
+        }
+        if self.breaker is not None:
+            breaker = self.breaker.snapshot()
+            checks["circuit_breaker"] = {"ok": breaker["state"] != OPEN, **breaker}
+        ready = all(check["ok"] for check in checks.values())
+        readiness_probes.inc(result="ready" if ready else "not_ready")
+        self._result = {"status": "ready" if ready else "not_ready", "checks": checks}
+        self._checked_at = time.monotonic()
+        return self._result
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Último resultado del sondeo, sin tocar la base de datos
+        """
+        if self.warmup is not None and not self.warmup.finished:
+            return {"status": "not_ready", "reason": "warm-up in progress"}
+        if self._result is None:
+            return {"status": "not_ready", "reason": "no probe has completed yet"}
+        age = time.monotonic() - self._checked_at
+        if age > self.stale_after:
+            return {"status": "not_ready", "reason": "probe result is stale", "age_seconds": round(age, 3)}
+        return {**self._result, "age_seconds": round(age, 3)}
+
+    async def _check_database(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(anyio.to_thread.run_sync(self._ping), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"timed out after {self.timeout}s"}
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 3)}
+
+    def _ping(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    def _check_pool(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        # Solo QueuePool con overflow acotado tiene un límite de conexiones
+        if not hasattr(pool, "size") or getattr(pool, "_max_overflow", -1) < 0:
+            return {"ok": True}
+        capacity = pool.size() + pool._max_overflow
+        in_use = pool.checkedout()
+        utilization = in_use / capacity if capacity else 0.0
+        return {"ok": utilization < self.max_pool_utilization, "in_use": in_use, "capacity": capacity}
+
+    def _check_threadpool(self) -> Dict[str, Any]:
+        # El limitador por defecto de anyio es el que usan los endpoints síncronos y
+        # run_in_threadpool, por donde pasa el bcrypt del login
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        in_use = limiter.borrowed_tokens
+        capacity = limiter.total_tokens
+        utilization = in_use / capacity if capacity else 0.0
+        return {
+            "ok": utilization < self.max_threadpool_utilization,
+            "in_use": in_use,
+            "capacity": capacity,
+            "waiting": limiter.statistics().tasks_waiting,
+        }
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import anyio.to_thread
+from passlib.context import CryptContext
+from pydantic import TypeAdapter
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config.settings import Settings
+from app.infrastructure.auth.token_verifier import JWTKeyRing
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.telemetry.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+warmup_duration = metrics.histogram("warmup_seconds", "Duración total del calentamiento inicial")
+warmup_errors = metrics.counter("warmup_errors_total", "Pasos del calentamiento inicial que fallaron")
+
+# Email que no puede existir (dominio reservado): las consultas no devuelven filas
+_WARMUP_EMAIL = "warmup@warmup.invalid"
+
+
+def warm_pool(engine: Engine, connections: int) -> int:
+    """
+    Abre a la vez hasta 'connections' conexiones (como mucho el tamaño del pool) y
+    las devuelve al pool, que las conserva abiertas para las primeras peticiones.
+    Devuelve cuántas se abrieron
+    """
+    pool = engine.pool
+    if hasattr(pool, "size"):
+        connections = min(connections, pool.size())
+    with ExitStack() as stack:
+        for _ in range(connections):
+            conn = stack.enter_context(engine.connect())
+            conn.execute(text("SELECT 1"))
+    return connections
+
+
+def warm_statements(engine: Engine):
+    """
+    Ejecuta una vez las sentencias preconstruidas de las rutas calientes con claves
+    que no existen, de modo que quedan compiladas en la caché del engine. Solo
+    lecturas por índice y la estimación del planificador: el count(*) exacto
+    recorrería la tabla entera en cada arranque, y por shard
+    """
+    with Session(engine) as session:
+        repository = UserRepository(session)
+        repository.get_auth_principal(_WARMUP_EMAIL)
+        repository.get_by_email(_WARMUP_EMAIL)
+        repository.get_by_id(0)
+        repository.get_summary_by_id(0)
+        repository.get_summary_by_email(_WARMUP_EMAIL)
+        repository.get_summaries_by_emails([_WARMUP_EMAIL])
+        repository.list_summaries(0, 1)
+        repository.search_summaries(_WARMUP_EMAIL, limit=1)
+        repository.estimate_count()
+
+
+def warm_serializers(samples: Iterable[Tuple[TypeAdapter, Any]]):
+    """
+    Valida y serializa un ejemplo con cada adaptador, en Python y en JSON
+    """
+    for adapter, sample in samples:
+        value = adapter.validate_python(sample)
+        adapter.dump_python(value, mode="json")
+        adapter.dump_json(value)
+
+
+def warm_password_hashing(context: CryptContext):
+    """
+    Carga el backend de bcrypt; passlib lo elige y comprueba en el primer uso
+    """
+    context.handler().get_backend()
+
+
+def warm_tokens(key_ring: JWTKeyRing):
+    """
+    Firma y verifica un token de corta duración con la clave actual
+    """
+    key_ring.decode(key_ring.encode({"sub": _WARMUP_EMAIL, "exp": int(time.time()) + 60}))
+
+
+class WarmUp:
+    """
+    Pasos de calentamiento que se ejecutan una vez al arrancar, en un hilo, para que
+    las primeras peticiones no paguen la apertura de conexiones, la compilación de
+    sentencias ni la carga de backends. Un paso que falla se registra y no impide
+    los siguientes; pasado 'timeout' se da por terminado aunque siga en curso.
+    Readiness no informa de que la instancia está lista hasta que termina
+    """
+    def __init__(self, steps: Dict[str, Callable[[], Any]], timeout: float = 30.0, enabled: bool = True):
+        self.steps = steps
+        self.timeout = timeout
+        self.enabled = enabled
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._finished = threading.Event()
+        if not enabled:
+            self._finished.set()
+
+    @classmethod
+    def from_settings(cls, settings: Settings, steps: Dict[str, Callable[[], Any]]) -> "WarmUp":
+        return cls(steps, timeout=settings.WARMUP_TIMEOUT_SECONDS, enabled=settings.WARMUP_ENABLED)
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    async def run(self):
+        if self.finished:
+            return
+        try:
+            with anyio.move_on_after(self.timeout) as scope:
+                await anyio.to_thread.run_sync(self._run_steps, abandon_on_cancel=True)
+            if scope.cancelled_caught:
+                logger.warning("Warm-up timed out; serving with a partially warm instance",
+                               extra={"timeout": self.timeout})
+        finally:
+            self._finished.set()
+
+    def _run_steps(self):
+        started_all = time.perf_counter()
+        for name, step in self.steps.items():
+            started = time.perf_counter()
+            try:
+                result = step()
+            except Exception as e:
+                warmup_errors.inc(step=name)
+                logger.exception("Warm-up step failed", extra={"step": name})
+                self.results[name] = {"ok": False, "error": type(e).__name__}
+                continue
+            elapsed = time.perf_counter() - started
+            self.results[name] = {"ok": True, "seconds": round(elapsed, 4)}
+            if result is not None:
+                self.results[name]["result"] = result
+        warmup_duration.observe(time.perf_counter() - started_all)
+        logger.info("Warm-up finished", extra={"steps": self.results})
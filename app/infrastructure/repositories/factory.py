@@ -0,0 +1,31 @@
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy.orm import Session
+from app.config.settings import get_settings
+from app.domain.interfaces.repositories import UserRepositoryInterface
+from app.infrastructure.repositories.user_repository import UserRepository
+
+
+def get_user_repository(db: Session) -> UserRepositoryInterface:
+    """
+    Devuelve el repositorio de usuarios según la configuración: con SHARD_DATABASE_URLS
+    los usuarios se reparten entre esas bases de datos y la sesión de la petición no se usa
+    """
+    if get_settings().SHARD_DATABASE_URLS:
+        from app.infrastructure.datasources.sharding import get_shard_set
+        from app.infrastructure.repositories.sharded_user_repository import ShardedUserRepository
+        return ShardedUserRepository(get_shard_set())
+    return UserRepository(db)
+
+
+@contextmanager
+def user_repository_scope() -> Iterator[UserRepositoryInterface]:
+    """
+    Repositorio con sesión propia para trabajo fuera de una petición (tareas en segundo plano)
+    """
+    from app.config.database import SessionLocal
+    db = SessionLocal()
+    try:
+        yield get_user_repository(db)
+    finally:
+        db.close()
@@ -0,0 +1,346 @@
+import heapq
+import logging
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.domain.entities import User
+from app.domain.exceptions import EmailAlreadyRegisteredError
+from app.domain.interfaces.repositories import UserRepositoryInterface
+from app.infrastructure.datasources.sharding import ShardSet
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.telemetry.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+_MOVED_COLUMNS = (User.hashed_password, User.is_active, User.created_at)
+
+
+@lru_cache(maxsize=32)
+def _row_type(fields: Tuple[str, ...]):
+    return namedtuple("ShardRow", fields)
+
+
+def _globalize_row(row, shard: int):
+    """
+    Copia de una fila proyectada con el id local sustituido por el global
+    """
+    if row is None:
+        return None
+    values = row._asdict()
+    values["id"] = ShardSet.to_global_id(shard, values["id"])
+    return _row_type(tuple(values))(**values)
+
+
+def _globalize_user(session: Session, user: Optional[User], shard: int) -> Optional[User]:
+    """
+    Separa la entidad de su sesión y le asigna el id global; el objeto
+    devuelto no está ligado a ningún shard
+    """
+    if user is None:
+        return None
+    session.expunge(user)
+    user.id = ShardSet.to_global_id(shard, user.id)
+    return user
+
+
+class ShardedUserRepository(UserRepositoryInterface):
+    """
+    Repositorio de usuarios repartidos entre varias bases de datos. El shard se elige
+    con un hash estable del email normalizado y queda codificado en el id, así que las
+    operaciones por id o por email van a un único shard; solo el listado consulta todos.
+    Cada operación usa una sesión de corta duración sobre el pool del shard
+    """
+    def __init__(self, shards: ShardSet):
+        self.shards = shards
+
+    def _shard_repository(self, session: Session) -> UserRepository:
+        return UserRepository(session)
+
+    def _split_id(self, user_id: int) -> Optional[Tuple[int, int]]:
+        try:
+            return self.shards.split_id(user_id)
+        except KeyError:
+            return None
+
+    @traced()
+    def get_by_id(self, user_id: int) -> Optional[User]:
+        """
+        Obtiene un usuario por su ID
+        """
+        location = self._split_id(user_id)
+        if location is None:
+            return None
+        shard, local_id = location
+        with self.shards.session(shard) as session:
+            return _globalize_user(session, self._shard_repository(session).get_by_id(local_id), shard)
+
+    @traced()
+    def get_by_email(self, email: str) -> Optional[User]:
+        """
+        Obtiene un usuario por su email
+        """
+        shard = self.shards.shard_for_email(email)
+        with self.shards.session(shard) as session:
+            return _globalize_user(session, self._shard_repository(session).get_by_email(email), shard)
+
+    @traced()
+    def get_auth_principal(self, email: str):
+        """
+        Obtiene las columnas que necesita la autenticación del shard del email
+        """
+        shard = self.shards.shard_for_email(email)
+        with self.shards.session(shard) as session:
+            return _globalize_row(self._shard_repository(session).get_auth_principal(email), shard)
+
+    @traced()
+    def get_summary_by_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None):
+        """
+        Obtiene id, email e is_active (o los campos indicados) de un usuario por su ID
+        """
+        location = self._split_id(user_id)
+        if location is None:
+            return None
+        shard, local_id = location
+        with self.shards.session(shard) as session:
+            return _globalize_row(self._shard_repository(session).get_summary_by_id(local_id, fields), shard)
+
+    @traced()
+    def get_summary_by_email(self, email: str):
+        """
+        Obtiene id, email e is_active de un usuario por su email
+        """
+        shard = self.shards.shard_for_email(email)
+        with self.shards.session(shard) as session:
+            return _globalize_row(self._shard_repository(session).get_summary_by_email(email), shard)
+
+    @traced()
+    def get_summaries_by_emails(self, emails: List[str]) -> List:
+        """
+        Agrupa los emails por shard y hace una consulta por shard implicado
+        """
+        emails_by_shard = defaultdict(list)
+        for email in emails:
+            emails_by_shard[self.shards.shard_for_email(email)].append(email)
+        if not emails_by_shard:
+            return []
+
+        def fetch(shard: int) -> List:
+            with self.shards.session(shard) as session:
+                rows = self._shard_repository(session).get_summaries_by_emails(emails_by_shard[shard])
+                return [_globalize_row(row, shard) for row in rows]
+
+        return [row for rows in self.shards.map(fetch, list(emails_by_shard)) for row in rows]
+
+    @traced()
+    def list_summaries(self, skip: int = 0, limit: int = 100, fields: Optional[Tuple[str, ...]] = None) -> List:
+        """
+        Lista usuarios ordenados por id global. Cada shard devuelve sus primeras
+        skip + limit filas ya ordenadas y se mezclan; el coste crece con el offset
+        """
+        def fetch(shard: int) -> List:
+            with self.shards.session(shard) as session:
+                rows = self._shard_repository(session).list_summaries(0, skip + limit, fields)
+                return [_globalize_row(row, shard) for row in rows]
+
+        merged = heapq.merge(*self.shards.map(fetch), key=lambda row: row.id)
+        return list(merged)[skip:skip + limit]
+
+    @traced()
+    def list(self, skip: int = 0, limit: int = 100) -> List[User]:
+        """
+        Lista usuarios ordenados por id global consultando todos los shards
+        """
+        def fetch(shard: int) -> List[User]:
+            with self.shards.session(shard) as session:
+                users = self._shard_repository(session).list(0, skip + limit)
+                return [_globalize_user(session, user, shard) for user in users]
+
+        merged = heapq.merge(*self.shards.map(fetch), key=lambda user: user.id)
+        return list(merged)[skip:skip + limit]
+
+    @traced()
+    def search_summaries(
+        self, term: str, substring: bool = False, after: str = "", limit: int = 50,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List:
+        """
+        Busca en todos los shards con el mismo keyset y mezcla los resultados por email;
+        cada shard aporta como mucho limit filas
+        """
+        def fetch(shard: int) -> List:
+            with self.shards.session(shard) as session:
+                rows = self._shard_repository(session).search_summaries(term, substring, after, limit, fields)
+                return [_globalize_row(row, shard) for row in rows]
+
+        # Mismo orden que el keyset de cada shard: lower(email)
+        merged = heapq.merge(*self.shards.map(fetch), key=lambda row: row.email.lower())
+        return list(merged)[:limit]
+
+    @traced()
+    def count(self) -> int:
+        """
+        Suma los recuentos exactos de todos los shards
+        """
+        def count(shard: int) -> int:
+            with self.shards.session(shard) as session:
+                return self._shard_repository(session).count()
+
+        return sum(self.shards.map(count))
+
+    @traced()
+    def estimate_count(self) -> Optional[int]:
+        """
+        Suma las estimaciones de los shards; None si alguno no tiene estadísticas
+        """
+        def estimate(shard: int) -> Optional[int]:
+            with self.shards.session(shard) as session:
+                return self._shard_repository(session).estimate_count()
+
+        estimates = self.shards.map(estimate)
+        return None if None in estimates else sum(estimates)
+
+    @traced()
+    def create(self, user: User) -> User:
+        """
+        Crea un nuevo usuario en el shard de su email
+        """
+        shard = self.shards.shard_for_email(user.email)
+        with self.shards.session(shard) as session:
+            return _globalize_user(session, self._shard_repository(session).create(user), shard)
+
+    @traced()
+    def create_if_absent(self, email: str, hashed_password: str):
+        """
+        Crea un usuario en el shard de su email; la restricción única de ese shard
+        basta para detectar duplicados porque un mismo email siempre va al mismo shard
+        """
+        shard = self.shards.shard_for_email(email)
+        with self.shards.session(shard) as session:
+            created = self._shard_repository(session).create_if_absent(email, hashed_password)
+            if isinstance(created, User):
+                return _globalize_user(session, created, shard)
+            return _globalize_row(created, shard)
+
+    @traced()
+    def update(self, user: User) -> User:
+        """
+        Guarda los cambios de un usuario obtenido de este repositorio
+        """
+        updated = self.update_fields(
+            user.id, {"email": user.email, "hashed_password": user.hashed_password, "is_active": user.is_active}
+        )
+        return self.get_by_id(updated.id) if updated is not None else None
+
+    @traced()
+    def update_fields(self, user_id: int, values: Dict[str, Any]):
+        """
+        Actualiza los campos indicados. Si el nuevo email corresponde a otro shard,
+        el usuario se mueve a ese shard y recibe un id nuevo, que es el que se devuelve
+        """
+        location = self._split_id(user_id)
+        if location is None:
+            return None
+        shard, local_id = location
+        email = values.get("email")
+        if email is not None and self.shards.shard_for_email(email) != shard:
+            return self._move(shard, local_id, values)
+        with self.shards.session(shard) as session:
+            return _globalize_row(self._shard_repository(session).update_fields(local_id, values), shard)
+
+    def _move(self, shard: int, local_id: int, values: Dict[str, Any]):
+        """
+        Copia el usuario al shard de su nuevo email y lo elimina del actual. No es
+        atómico entre bases de datos: si falla el borrado queda una copia huérfana
+        en el shard de origen, que se registra para limpiarla
+        """
+        with self.shards.session(shard) as session:
+            current = session.execute(
+                select(*_MOVED_COLUMNS).where(User.id == local_id)
+            ).first()
+        if current is None:
+            return None
+
+        target = self.shards.shard_for_email(values["email"])
+        row = {**current._asdict(), **values}
+        with self.shards.session(target) as session:
+            repository = self._shard_repository(session)
+            created = repository.create_if_absent(row["email"], row["hashed_password"])
+            if created is None:
+                raise EmailAlreadyRegisteredError(row["email"])
+            moved = repository.update_fields(
+                created.id, {"is_active": row["is_active"], "created_at": row["created_at"]}
+            )
+
+        try:
+            with self.shards.session(shard) as session:
+                self._shard_repository(session).delete_many([local_id])
+        except Exception:
+            logger.exception(
+                "Orphan user row left after shard move",
+                extra={"shard": shard, "local_id": local_id, "target_shard": target},
+            )
+        return _globalize_row(moved, target)
+
+    @traced()
+    def delete(self, user_id: int) -> bool:
+        """
+        Elimina un usuario por su ID
+        """
+        return len(self.delete_many([user_id])) > 0
+
+    @traced()
+    def record_logins(self, events: List[Dict[str, Any]]):
+        """
+        Guarda cada intento en el shard de su email, con el id local del usuario
+        """
+        events_by_shard = defaultdict(list)
+        for event in events:
+            shard = self.shards.shard_for_email(event["email"])
+            location = self._split_id(event["user_id"]) if event.get("user_id") is not None else None
+            local_id = location[1] if location is not None and location[0] == shard else None
+            events_by_shard[shard].append({**event, "user_id": local_id})
+        if not events_by_shard:
+            return
+
+        def run(shard: int):
+            with self.shards.session(shard) as session:
+                self._shard_repository(session).record_logins(events_by_shard[shard])
+
+        self.shards.map(run, list(events_by_shard))
+
+    @traced()
+    def deactivate_many(self, user_ids: List[int]) -> List[int]:
+        """
+        Desactiva varios usuarios con un UPDATE por shard implicado
+        """
+        return self._per_shard(user_ids, lambda repository, ids: repository.deactivate_many(ids))
+
+    @traced()
+    def delete_many(self, user_ids: List[int]) -> List[int]:
+        """
+        Elimina varios usuarios con un DELETE por shard implicado
+        """
+        return self._per_shard(user_ids, lambda repository, ids: repository.delete_many(ids))
+
+    def _per_shard(self, user_ids: List[int], operation) -> List[int]:
+        """
+        Agrupa los IDs por shard, aplica la operación en cada uno y devuelve los IDs globales afectados
+        """
+        local_ids = defaultdict(list)
+        for user_id in user_ids:
+            location = self._split_id(user_id)
+            if location is not None:
+                local_ids[location[0]].append(location[1])
+        if not local_ids:
+            return []
+
+        def run(shard: int) -> List[int]:
+            with self.shards.session(shard) as session:
+                affected = operation(self._shard_repository(session), local_ids[shard])
+            return [ShardSet.to_global_id(shard, local_id) for local_id in affected]
+
+        return [user_id for affected in self.shards.map(run, list(local_ids)) for user_id in affected]
@@ -1,7 +1,133 @@
-from typing import List, Optional
+import sys
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Row, bindparam, collate, delete, func, insert, or_, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.domain.entities import User
+from app.domain.entities import LoginEvent, User
+from app.domain.exceptions import EmailAlreadyRegisteredError
 from app.domain.interfaces.repositories import UserRepositoryInterface
+from app.infrastructure.telemetry.tracing import traced
+
+# Dialectos que soportan INSERT ... ON CONFLICT DO NOTHING
+_ON_CONFLICT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+# Columnas de las lecturas proyectadas y de lo que devuelven las escrituras set-based
+_SUMMARY_COLUMNS = (User.id, User.email, User.is_active)
+
+# Sentencias de las consultas frecuentes, construidas una sola vez con parámetros
+# nombrados: no se reconstruyen en cada llamada y siempre comparten la misma
+# entrada en la caché de compilación de SQLAlchemy
+_GET_BY_ID = select(User).where(User.id == bindparam("user_id"))
+_GET_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+_GET_AUTH_PRINCIPAL = (
+    select(User.id, User.email, User.hashed_password, User.is_active)
+    .where(User.email == bindparam("email"))
+)
+_GET_SUMMARY_BY_ID = select(*_SUMMARY_COLUMNS).where(User.id == bindparam("user_id"))
+_GET_SUMMARY_BY_EMAIL = select(*_SUMMARY_COLUMNS).where(User.email == bindparam("email"))
+_GET_SUMMARIES_BY_EMAILS = select(*_SUMMARY_COLUMNS).where(User.email.in_(bindparam("emails", expanding=True)))
+_LIST = select(User).order_by(User.id).offset(bindparam("skip")).limit(bindparam("limit"))
+_LIST_SUMMARIES = (
+    select(*_SUMMARY_COLUMNS).order_by(User.id).offset(bindparam("skip")).limit(bindparam("limit"))
+)
+_COUNT = select(func.count()).select_from(User)
+# reltuples es la estimación del planificador, mantenida por VACUUM/ANALYZE; vale -1
+# si la tabla nunca se ha analizado
+_ESTIMATE_COUNT = text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)")
+# Un UPDATE de Core ejecutado con executemany (sobre la tabla, no la entidad, para evitar
+# el bulk update por clave primaria del ORM); no retrocede si otro worker ya guardó un
+# login posterior
+_users = User.__table__
+_SET_LAST_LOGIN = (
+    update(_users)
+    .where(
+        _users.c.id == bindparam("user_id"),
+        or_(_users.c.last_login_at.is_(None), _users.c.last_login_at < bindparam("login_at")),
+    )
+    # Sin updated_at explícito se aplicaría su onupdate: un login no es una edición del perfil
+    .values(last_login_at=bindparam("login_at"), updated_at=_users.c.updated_at)
+)
+_CREATE_IF_ABSENT = {
+    dialect: insert(User)
+    # Sin columnas de conflicto: el duplicado puede saltar en el índice único de
+    # email o en el de lower(email)
+    .on_conflict_do_nothing()
+    .returning(User.id, User.email, User.is_active, User.created_at)
+    for dialect, insert in _ON_CONFLICT_INSERTS.items()
+}
+
+
+def _projection(fields: Optional[Tuple[str, ...]], required: Tuple[str, ...] = ("id",)) -> tuple:
+    """
+    Columnas de una lectura proyectada: las de resumen si no se piden campos y, si
+    no, los campos pedidos más los que la consulta necesita (id para fusionar
+    shards, email para el cursor de la búsqueda)
+    """
+    if fields is None:
+        return _SUMMARY_COLUMNS
+    return tuple(getattr(User, name) for name in dict.fromkeys(required + fields))
+
+
+@lru_cache(maxsize=128)
+def _projected_statement(kind: str, fields: Tuple[str, ...]):
+    """
+    Sentencias con una proyección a medida, construidas una vez por conjunto de campos
+    """
+    stmt = select(*_projection(fields))
+    if kind == "by_id":
+        return stmt.where(User.id == bindparam("user_id"))
+    return stmt.order_by(User.id).offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+_LIKE_ESCAPE = "/"
+
+
+def _escape_like(term: str) -> str:
+    """
+    Escapa los comodines de LIKE para buscar el término literalmente
+    """
+    return term.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2).replace("%", _LIKE_ESCAPE + "%").replace("_", _LIKE_ESCAPE + "_")
+
+
+def _prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    Menor cadena mayor que todas las que empiezan por el prefijo en orden de code
+    points (el de la collation "C" y BINARY): el prefijo con su último carácter
+    incrementado. None si no existe tal cota
+    """
+    stripped = prefix.rstrip(chr(sys.maxunicode))
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+
+@lru_cache(maxsize=128)
+def _search_statement(dialect: str, substring: bool, bounded: bool, fields: Optional[Tuple[str, ...]] = None):
+    """
+    Sentencia de búsqueda por email con paginación keyset (lower(email) > :after),
+    construida una vez por combinación. Los dos modos ignoran mayúsculas: el prefijo
+    es un rango sobre lower(email) y la subcadena un ILIKE. El orden y las
+    comparaciones usan la collation "C" en PostgreSQL para que coincidan con
+    ix_users_email_lower y con el orden de Python
+    """
+    email = func.lower(User.email)
+    if dialect == "postgresql":
+        email = collate(email, "C")
+    stmt = select(*_projection(fields, ("id", "email"))).where(email > bindparam("after"))
+    if substring:
+        # En PostgreSQL, ILIKE '%...%' sobre ix_users_email_trgm
+        stmt = stmt.where(User.email.icontains(bindparam("term"), escape=_LIKE_ESCAPE))
+    else:
+        # Un prefijo es un rango del índice: [prefijo, cota superior)
+        stmt = stmt.where(email >= bindparam("term"))
+        if bounded:
+            stmt = stmt.where(email < bindparam("upper"))
+    return stmt.order_by(email).limit(bindparam("limit"))
 
 
 class UserRepository(UserRepositoryInterface):
@@ -11,18 +137,128 @@ class UserRepository(UserRepositoryInterface):
     def __init__(self, db: Session):
         self.db = db
     
+    def _release_connection(self):
+        """
+        Termina la transacción de lectura en cuanto la consulta se ha materializado:
+        la conexión vuelve al pool sin esperar a que se serialice y envíe la respuesta.
+        La sesión vuelve a pedir una conexión solo si se ejecuta otra consulta
+        """
+        self.db.commit()
+    
+    @traced()
     def get_by_id(self, user_id: int) -> Optional[User]:
         """
         Obtiene un usuario por su ID
         """
-        return self.db.query(User).filter(User.id == user_id).first()
+        user = self.db.execute(_GET_BY_ID, {"user_id": user_id}).scalars().first()
+        self._release_connection()
+        return user
     
+    @traced()
     def get_by_email(self, email: str) -> Optional[User]:
         """
         Obtiene un usuario por su email
         """
-        return self.db.query(User).filter(User.email == email).first()
+        user = self.db.execute(_GET_BY_EMAIL, {"email": email}).scalars().first()
+        self._release_connection()
+        return user
     
+    @traced()
+    def get_auth_principal(self, email: str) -> Optional[Row]:
+        """
+        Obtiene solo las columnas que necesita la autenticación.
+        Todas están en ix_users_email_covering, así que en PostgreSQL
+        la consulta se resuelve con un index-only scan
+        """
+        principal = self.db.execute(_GET_AUTH_PRINCIPAL, {"email": email}).first()
+        self._release_connection()
+        return principal
+    
+    @traced()
+    def get_summary_by_id(self, user_id: int, fields: Optional[Tuple[str, ...]] = None) -> Optional[Row]:
+        """
+        Obtiene id, email e is_active (o los campos indicados) de un usuario por su ID
+        sin cargar la entidad ORM
+        """
+        stmt = _GET_SUMMARY_BY_ID if fields is None else _projected_statement("by_id", fields)
+        summary = self.db.execute(stmt, {"user_id": user_id}).first()
+        self._release_connection()
+        return summary
+    
+    @traced()
+    def get_summary_by_email(self, email: str) -> Optional[Row]:
+        """
+        Obtiene id, email e is_active de un usuario por su email sin cargar la entidad ORM
+        """
+        summary = self.db.execute(_GET_SUMMARY_BY_EMAIL, {"email": email}).first()
+        self._release_connection()
+        return summary
+    
+    @traced()
+    def get_summaries_by_emails(self, emails: List[str]) -> List[Row]:
+        """
+        Obtiene id, email e is_active de varios usuarios en una sola consulta
+        """
+        if not emails:
+            return []
+        summaries = self.db.execute(_GET_SUMMARIES_BY_EMAILS, {"emails": list(emails)}).all()
+        self._release_connection()
+        return summaries
+    
+    @traced()
+    def list_summaries(self, skip: int = 0, limit: int = 100, fields: Optional[Tuple[str, ...]] = None) -> List[Row]:
+        """
+        Lista id, email e is_active (o los campos indicados) de los usuarios con
+        paginación, sin hidratar entidades ORM
+        """
+        stmt = _LIST_SUMMARIES if fields is None else _projected_statement("list", fields)
+        summaries = self.db.execute(stmt, {"skip": skip, "limit": limit}).all()
+        self._release_connection()
+        return summaries
+    
+    @traced()
+    def search_summaries(
+        self, term: str, substring: bool = False, after: str = "", limit: int = 50,
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> List[Row]:
+        """
+        Busca usuarios cuyo email empieza por term o, con substring, lo contiene, en
+        ambos casos sin distinguir mayúsculas. Devuelve id, email e is_active ordenados
+        por email en minúsculas a partir de after (keyset); con LIMIT, el trabajo queda
+        acotado también para términos muy cortos
+        """
+        term, after = term.lower(), after.lower()
+        upper = None if substring else _prefix_upper_bound(term)
+        stmt = _search_statement(self.db.get_bind().dialect.name, substring, upper is not None, fields)
+        params = {"term": _escape_like(term) if substring else term, "after": after, "limit": limit}
+        if upper is not None:
+            params["upper"] = upper
+        summaries = self.db.execute(stmt, params).all()
+        self._release_connection()
+        return summaries
+    
+    @traced()
+    def count(self) -> int:
+        """
+        Cuenta exactamente los usuarios; en tablas grandes recorre todo el índice
+        """
+        total = self.db.execute(_COUNT).scalar()
+        self._release_connection()
+        return total
+    
+    @traced()
+    def estimate_count(self) -> Optional[int]:
+        """
+        Número de filas estimado por el planificador de PostgreSQL, sin recorrer la tabla.
+        None en otros motores o si la tabla aún no tiene estadísticas
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return None
+        estimate = self.db.execute(_ESTIMATE_COUNT, {"table": User.__tablename__}).scalar()
+        self._release_connection()
+        return estimate if estimate is not None and estimate >= 0 else None
+    
+    @traced()
     def create(self, user: User) -> User:
         """
         Crea un nuevo usuario
@@ -32,6 +268,35 @@ class UserRepository(UserRepositoryInterface):
         self.db.refresh(user)
         return user
     
+    @traced()
+    def create_if_absent(self, email: str, hashed_password: str) -> Optional[Row]:
+        """
+        Crea un usuario en una sola ida y vuelta con
+        INSERT ... ON CONFLICT DO NOTHING RETURNING.
+        Devuelve None si el email ya está registrado, aunque sea con otras mayúsculas
+        """
+        dialect = self.db.get_bind().dialect
+        stmt = _CREATE_IF_ABSENT.get(dialect.name)
+        if stmt is None or not dialect.insert_returning:
+            return self._create_if_absent_fallback(email, hashed_password)
+        
+        params = {"email": email, "hashed_password": hashed_password, "is_active": True}
+        created = self.db.execute(stmt, params).first()
+        self.db.commit()
+        return created
+    
+    def _create_if_absent_fallback(self, email: str, hashed_password: str) -> Optional[User]:
+        """
+        Alternativa para backends sin ON CONFLICT ... RETURNING:
+        la violación de la restricción única indica que el email ya existe
+        """
+        try:
+            return self.create(User(email=email, hashed_password=hashed_password, is_active=True))
+        except IntegrityError:
+            self.db.rollback()
+            return None
+    
+    @traced()
     def update(self, user: User) -> User:
         """
         Actualiza un usuario existente
@@ -40,19 +305,96 @@ class UserRepository(UserRepositoryInterface):
         self.db.refresh(user)
         return user
     
-    def delete(self, user_id: int) -> bool:
+    @traced()
+    def update_fields(self, user_id: int, values: Dict[str, Any]) -> Optional[Row]:
         """
-        Elimina un usuario por su ID
+        Actualiza los campos indicados con un único UPDATE ... WHERE id = :id RETURNING.
+        Devuelve None si el usuario no existe y lanza EmailAlreadyRegisteredError
+        si el nuevo email viola la restricción única
         """
-        user = self.get_by_id(user_id)
-        if user:
-            self.db.delete(user)
+        if not values:
+            return self.get_summary_by_id(user_id)
+        
+        stmt = update(User).where(User.id == user_id).values(**values)
+        try:
+            if self.db.get_bind().dialect.update_returning:
+                updated = self.db.execute(stmt.returning(*_SUMMARY_COLUMNS)).first()
+            elif self.db.execute(stmt).rowcount:
+                updated = self.db.execute(select(*_SUMMARY_COLUMNS).where(User.id == user_id)).first()
+            else:
+                updated = None
             self.db.commit()
-            return True
-        return False
+        except IntegrityError as exc:
+            self.db.rollback()
+            raise EmailAlreadyRegisteredError(values.get("email")) from exc
+        return updated
+    
+    @traced()
+    def delete(self, user_id: int) -> bool:
+        """
+        Elimina un usuario por su ID con un único DELETE ... RETURNING id
+        """
+        return len(self.delete_many([user_id])) > 0
+    
+    @traced()
+    def deactivate_many(self, user_ids: List[int]) -> List[int]:
+        """
+        Desactiva varios usuarios con un único UPDATE y devuelve los IDs afectados
+        """
+        stmt = update(User).where(User.id.in_(user_ids), User.is_active.is_not(False)).values(is_active=False)
+        return self._execute_returning_ids(stmt, user_ids, self.db.get_bind().dialect.update_returning)
+    
+    @traced()
+    def delete_many(self, user_ids: List[int]) -> List[int]:
+        """
+        Elimina varios usuarios con un único DELETE y devuelve los IDs eliminados
+        """
+        stmt = delete(User).where(User.id.in_(user_ids))
+        return self._execute_returning_ids(stmt, user_ids, self.db.get_bind().dialect.delete_returning)
+    
+    def _execute_returning_ids(self, stmt, user_ids: List[int], supports_returning: bool) -> List[int]:
+        """
+        Ejecuta una escritura set-based y devuelve los IDs afectados.
+        Sin RETURNING, los IDs se consultan antes de la escritura
+        """
+        if not user_ids:
+            return []
+        if supports_returning:
+            affected = list(self.db.execute(stmt.returning(User.id)).scalars())
+        else:
+            affected = list(self.db.execute(select(User.id).where(stmt.whereclause)).scalars())
+            self.db.execute(stmt)
+        self.db.commit()
+        return affected
         
+    @traced()
+    def record_logins(self, events: List[Dict[str, Any]]):
+        """
+        Guarda un lote de intentos de login en una transacción: un INSERT de varias
+        filas en login_events y un único UPDATE de last_login_at por usuario, con el
+        login correcto más reciente del lote
+        """
+        if not events:
+            return
+        last_logins: Dict[int, Any] = {}
+        for event in events:
+            user_id = event.get("user_id")
+            if event["succeeded"] and user_id is not None:
+                if user_id not in last_logins or event["created_at"] > last_logins[user_id]:
+                    last_logins[user_id] = event["created_at"]
+        self.db.execute(insert(LoginEvent).values(events))
+        if last_logins:
+            self.db.execute(
+                _SET_LAST_LOGIN,
+                [{"user_id": user_id, "login_at": at} for user_id, at in last_logins.items()],
+            )
+        self.db.commit()
+    
+    @traced()
     def list(self, skip: int = 0, limit: int = 100) -> List[User]:
         """
         Lista usuarios con paginación
         """
-        return self.db.query(User).offset(skip).limit(limit).all()
\ No newline at end of file
+        users = self.db.execute(_LIST, {"skip": skip, "limit": limit}).scalars().all()
+        self._release_connection()
+        return users
\ No newline at end of file
@@ -0,0 +1,69 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import default
+
+from app.infrastructure.telemetry.metrics import metrics
+
+_CACHE_RESULTS = {
+    default.CACHE_HIT: "hit",
+    default.CACHE_MISS: "miss",
+    default.CACHING_DISABLED: "disabled",
+    default.NO_CACHE_KEY: "no_cache_key",
+    default.NO_DIALECT_SUPPORT: "no_dialect_support",
+}
+
+statement_cache = metrics.counter(
+    "db_statement_cache_total",
+    "Ejecuciones por resultado en la caché de sentencias compiladas de SQLAlchemy",
+)
+
+
+def statement_cache_stats() -> dict:
+    """
+    Aciertos y fallos de la caché de compilación desde el arranque del proceso
+    """
+    hits = statement_cache.value(result="hit")
+    misses = statement_cache.value(result="miss")
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
+
+
+def instrument_statement_cache(engine):
+    """
+    Cuenta, por cada sentencia ejecutada, si su forma compilada salió de la caché
+    """
+    compiled_cache = engine._compiled_cache
+    metrics.gauge(
+        "db_statement_cache_size",
+        "Entradas en la caché de sentencias compiladas",
+        function=lambda: len(compiled_cache) if compiled_cache is not None else 0,
+    )
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        result = _CACHE_RESULTS.get(getattr(context, "cache_hit", None))
+        if result is not None:
+            statement_cache.inc(result=result)
+
+
+connection_hold_time = metrics.histogram(
+    "db_connection_hold_seconds",
+    "Tiempo entre que una conexión sale del pool y vuelve a él",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0),
+)
+
+
+def instrument_connection_hold_time(engine):
+    """
+    Mide cuánto tiempo retiene cada checkout una conexión del pool
+    """
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            connection_hold_time.observe(time.perf_counter() - checked_out_at)
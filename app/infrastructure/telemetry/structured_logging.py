@@ -0,0 +1,175 @@
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from app.config.settings import Settings
+from app.infrastructure.telemetry.metrics import metrics
+from app.infrastructure.telemetry.tracing import current_span
+
+# Atributos estándar de LogRecord; el resto se considera contexto estructurado (extra=...)
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+log_records_dropped = metrics.counter("log_records_dropped_total", "Registros de log descartados con la cola llena")
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Serializa cada registro como una línea JSON
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = "".join(traceback.format_exception(*record.exc_info))
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler que no formatea en el hilo que emite el log: el mensaje,
+    el traceback y el JSON se construyen en el hilo del QueueListener.
+    Si la cola está llena el registro se descarta y se contabiliza
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        span = current_span()
+        if span.recording:
+            record.trace_id = f"{span.trace_id:032x}"
+            record.span_id = f"{span.span_id:016x}"
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            log_records_dropped.inc()
+
+
+class ErrorSampler:
+    """
+    Limita la captura de tracebacks: cada error distinto (tipo + línea donde se lanzó)
+    se registra una vez por ventana y las repeticiones solo se cuentan. Además hay un
+    tope global de tracebacks por ventana para tormentas de errores distintos
+    """
+    def __init__(self, window_seconds: float = 60.0, max_tracebacks_per_window: int = 20):
+        self.window_seconds = window_seconds
+        self.max_tracebacks_per_window = max_tracebacks_per_window
+        self._lock = threading.Lock()
+        self._seen: Dict[Tuple, list] = {}
+        self._window_start = time.monotonic()
+        self._captured_in_window = 0
+
+    @staticmethod
+    def error_key(exc: BaseException) -> Tuple:
+        tb = exc.__traceback__
+        while tb is not None and tb.tb_next is not None:
+            tb = tb.tb_next
+        if tb is None:
+            return (type(exc).__qualname__,)
+        return (type(exc).__qualname__, tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+
+    def record(self, exc: BaseException) -> Tuple[bool, int]:
+        """
+        Devuelve (capturar_traceback, repeticiones_omitidas_desde_la_última_captura)
+        """
+        key = self.error_key(exc)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_start >= self.window_seconds:
+                self._window_start = now
+                self._captured_in_window = 0
+            state = self._seen.get(key)
+            if state is not None and now - state[0] < self.window_seconds:
+                state[1] += 1
+                return False, 0
+            if self._captured_in_window >= self.max_tracebacks_per_window:
+                if state is None:
+                    self._seen[key] = [now, 1]
+                else:
+                    state[1] += 1
+                return False, 0
+            suppressed = state[1] if state is not None else 0
+            self._seen[key] = [now, 0]
+            self._captured_in_window += 1
+            return True, suppressed
+
+
+error_sampler = ErrorSampler()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+# Handlers que había en el logger raíz (uvicorn, Sentry...) y que pasan al listener
+_previous_handlers: List[logging.Handler] = []
+# Handler propio que queda en el logger raíz tras shutdown_logging si no había otros
+_direct_handler: Optional[logging.Handler] = None
+
+
+def configure_logging(settings: Settings):
+    """
+    Envía todos los logs a una cola que vacía un hilo en segundo plano,
+    de modo que el bucle de eventos nunca escribe ni formatea logs. Los handlers
+    que ya tuviera el logger raíz siguen recibiendo los registros desde el hilo
+    del listener y se devuelven al logger raíz en shutdown_logging
+    """
+    global _listener, _queue_handler, _previous_handlers, _direct_handler
+    if _listener is not None:
+        return
+    error_sampler.window_seconds = settings.LOG_ERROR_SAMPLING_WINDOW_SECONDS
+    error_sampler.max_tracebacks_per_window = settings.LOG_MAX_TRACEBACKS_PER_WINDOW
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    root = logging.getLogger()
+    if _direct_handler is not None:
+        root.removeHandler(_direct_handler)
+        _direct_handler = None
+    _previous_handlers = list(root.handlers)
+    for handler in _previous_handlers:
+        root.removeHandler(handler)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL)
+    _listener = QueueListener(log_queue, stream_handler, *_previous_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """
+    Detiene el hilo escritor después de vaciar la cola y devuelve al logger raíz
+    los handlers que tenía; si no tenía ninguno, los logs se escriben directamente
+    con el handler de la aplicación. Los handlers añadidos entretanto no se tocan
+    """
+    global _listener, _queue_handler, _previous_handlers, _direct_handler
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger()
+        root.removeHandler(_queue_handler)
+        for handler in _previous_handlers:
+            root.addHandler(handler)
+        if not _previous_handlers:
+            _direct_handler = _listener.handlers[0]
+            root.addHandler(_direct_handler)
+        _listener = None
+        _queue_handler = None
+        _previous_handlers = []
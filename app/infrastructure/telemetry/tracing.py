@@ -0,0 +1,363 @@
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+# Tipos de span de OpenTelemetry (SpanKind en OTLP)
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class _NoopSpan:
+    """
+    Span que no registra nada. Se devuelve cuando el tracing está desactivado
+    o la traza no ha sido muestreada, para que el coste sea prácticamente nulo
+    """
+    __slots__ = ()
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _UnsampledSpan(_NoopSpan):
+    """
+    Raíz de una traza no muestreada: se propaga por el contexto
+    para que los spans hijos tampoco se registren
+    """
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class Span:
+    """
+    Span compatible con el modelo de datos de OpenTelemetry
+    """
+    __slots__ = (
+        "tracer", "name", "kind", "trace_id", "span_id", "parent_span_id",
+        "start_ns", "end_ns", "attributes", "status", "status_message", "_token",
+    )
+    recording = True
+
+    def __init__(self, tracer: "Tracer", name: str, kind: int, trace_id: int,
+                 parent_span_id: Optional[int], attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64) or 1
+        self.parent_span_id = parent_span_id
+        self.attributes = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message = None
+        self.start_ns = 0
+        self.end_ns = 0
+
+    def __enter__(self):
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.time_ns()
+        if exc is not None:
+            self.status = STATUS_ERROR
+            self.status_message = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.tracer._on_end(self)
+        return False
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def set_error(self, message: str):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": f"{self.trace_id:032x}",
+            "spanId": f"{self.span_id:016x}",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = f"{self.parent_span_id:016x}"
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class FileSpanExporter:
+    """
+    Escribe cada lote como una línea JSON con el formato OTLP/JSON
+    """
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.service_name = service_name
+
+    def export(self, spans: List[Span]):
+        with open(self.path, "a") as fh:
+            fh.write(json.dumps(_otlp_payload(spans, self.service_name)) + "\n")
+
+
+class OTLPHttpSpanExporter:
+    """
+    Envía los lotes a un colector OTLP/HTTP (POST {endpoint}/v1/traces en JSON)
+    """
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]):
+        body = json.dumps(_otlp_payload(spans, self.service_name)).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def _otlp_payload(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "app"}, "spans": [span.to_otlp() for span in spans]}],
+        }]
+    }
+
+
+class BatchSpanProcessor:
+    """
+    Acumula los spans terminados en una cola acotada y los exporta por lotes
+    desde un hilo en segundo plano; si la cola se llena, los spans se descartan
+    """
+    def __init__(self, exporter, max_queue_size: int = 2048, max_batch_size: int = 512,
+                 schedule_delay: float = 1.0):
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(max_queue_size)
+        self._shutdown = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self):
+        self._shutdown.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._shutdown.is_set():
+            self._export_batch(timeout=self.schedule_delay)
+        while not self._queue.empty():
+            self._export_batch(timeout=0)
+
+    def _export_batch(self, timeout: float):
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait())
+            while len(batch) < self.max_batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not batch:
+            return
+        try:
+            self.exporter.export(batch)
+        except Exception:
+            logger.warning("No se pudieron exportar %d spans", len(batch), exc_info=True)
+
+
+class Tracer:
+    """
+    Tracer ligero con propagación por contextvars (también hacia el threadpool
+    de los endpoints síncronos) y muestreo en la raíz de cada traza
+    """
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.processor: Optional[BatchSpanProcessor] = None
+
+    def start_span(self, name: str, kind: int = SPAN_KIND_INTERNAL,
+                   attributes: Optional[Dict[str, Any]] = None,
+                   remote_parent: Optional[tuple] = None):
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = _current_span.get()
+        if parent is not None:
+            if not parent.recording:
+                return NOOP_SPAN
+            return Span(self, name, kind, parent.trace_id, parent.span_id, attributes)
+        if remote_parent is not None:
+            trace_id, parent_span_id, sampled = remote_parent
+        else:
+            trace_id, parent_span_id = random.getrandbits(128) or 1, None
+            sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        if not sampled:
+            return _UnsampledSpan()
+        return Span(self, name, kind, trace_id, parent_span_id, attributes)
+
+    def _on_end(self, span: Span):
+        if self.processor is not None:
+            self.processor.on_end(span)
+
+
+tracer = Tracer()
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: Optional[str] = None, kind: int = SPAN_KIND_INTERNAL) -> Callable:
+    """
+    Decorador que envuelve la función en un span con su nombre cualificado
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return fn(*args, **kwargs)
+            with tracer.start_span(span_name, kind):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def parse_traceparent(value: str) -> Optional[tuple]:
+    """
+    Interpreta una cabecera W3C traceparent: "00-<trace-id>-<parent-id>-<flags>"
+    """
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        trace_id, parent_span_id, flags = int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    if not trace_id or not parent_span_id:
+        return None
+    return trace_id, parent_span_id, bool(flags & 1)
+
+
+def instrument_engine(engine):
+    """
+    Registra un span de cliente por cada sentencia SQL ejecutada en el engine
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = tracer.start_span("db.query", SPAN_KIND_CLIENT, {
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:1000],
+        })
+        if span.recording:
+            span.__enter__()
+            context._trace_span = span
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            context._trace_span = None
+            span.__exit__(None, None, None)
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(exception_context):
+        context = exception_context.execution_context
+        span = getattr(context, "_trace_span", None) if context is not None else None
+        if span is not None:
+            context._trace_span = None
+            error = exception_context.original_exception
+            span.__exit__(type(error), error, None)
+
+
+def configure_tracing(settings: Settings):
+    """
+    Activa el tracing según la configuración y arranca el exportador por lotes
+    """
+    if not settings.TRACING_ENABLED:
+        return
+    if settings.TRACING_EXPORTER == "otlp":
+        exporter = OTLPHttpSpanExporter(settings.TRACING_OTLP_ENDPOINT, settings.PROJECT_NAME)
+    else:
+        directory = os.path.dirname(settings.TRACING_FILE_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        exporter = FileSpanExporter(settings.TRACING_FILE_PATH, settings.PROJECT_NAME)
+    tracer.sample_rate = settings.TRACING_SAMPLE_RATE
+    tracer.processor = BatchSpanProcessor(exporter)
+    tracer.enabled = True
+
+
+def shutdown_tracing():
+    """
+    Desactiva el tracing y exporta los spans pendientes
+    """
+    tracer.enabled = False
+    if tracer.processor is not None:
+        tracer.processor.shutdown()
+        tracer.processor = None
@@ -1,20 +1,117 @@
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
 from fastapi import FastAPI
+from pydantic import TypeAdapter
 from fastapi.middleware.cors import CORSMiddleware
 from app.config.settings import get_settings
-from app.config.database import engine, Base
+from app.config.database import db_breaker, engine, Base
 from app.adapters.api.router import api_router
 from app.adapters.api.middleware.middleware import ExceptionMiddleware
-from app.adapters.api.middleware.http_response import configure_app
+from app.adapters.api.middleware.http_response import configure_app, create_response
 from app.adapters.api.middleware.exception_handler import add_exception_handlers
+from app.adapters.api.middleware.profiling import ProfilingMiddleware
+from app.adapters.api.middleware.tracing import TracingMiddleware
+from app.adapters.api.middleware.access_log import AccessLogMiddleware
+from app.adapters.api.middleware.deadline import DeadlineMiddleware
+from app.adapters.controllers.auth_controller import login_events
+from app.application.usecases.user_usecase import DEFAULT_USER_FIELD_SET, UserCreate
+from app.infrastructure.auth.jwt import Token, TokenIntrospectionRequest, key_ring, principal_cache, pwd_context
+from app.infrastructure.datasources.change_feed import UserChangeFeed
+from app.infrastructure.datasources.deadlines import install_statement_timeouts
+from app.infrastructure.health.readiness import ReadinessProber
+from app.infrastructure.health.warmup import (
+    WarmUp,
+    warm_password_hashing,
+    warm_pool,
+    warm_serializers,
+    warm_statements,
+    warm_tokens,
+)
+from app.infrastructure.telemetry.structured_logging import configure_logging, shutdown_logging
+from app.infrastructure.telemetry.database_metrics import (
+    instrument_connection_hold_time,
+    instrument_statement_cache,
+    statement_cache_stats,
+)
+from app.infrastructure.telemetry.metrics import metrics
+from app.infrastructure.telemetry.tracing import configure_tracing, instrument_engine, shutdown_tracing
 
 settings = get_settings()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+engines = [engine]
+change_feeds = [UserChangeFeed.from_settings(engine, settings)]
+if settings.SHARD_DATABASE_URLS:
+    from app.infrastructure.datasources.sharding import ShardSet, get_shard_set
+    for shard, shard_engine in enumerate(get_shard_set().engines):
+        Base.metadata.create_all(bind=shard_engine)
+        engines.append(shard_engine)
+        instrument_connection_hold_time(shard_engine)
+        install_statement_timeouts(shard_engine)
+        change_feeds.append(
+            UserChangeFeed.from_settings(shard_engine, settings, map_user_id=partial(ShardSet.to_global_id, shard))
+        )
+for change_feed in change_feeds:
+    change_feed.subscribe(principal_cache.invalidate)
+
+instrument_statement_cache(engine)
+instrument_connection_hold_time(engine)
+install_statement_timeouts(engine)
+if settings.TRACING_ENABLED:
+    instrument_engine(engine)
+
+_warmup_user = {"id": 0, "email": "warmup@example.com", "is_active": True}
+warmup_steps = {}
+for index, warmup_engine in enumerate(engines):
+    # Con shards, engines[0] es la base de datos principal y engines[i] el shard i - 1
+    warmup_steps[f"pool.{index}"] = partial(warm_pool, warmup_engine, settings.WARMUP_POOL_CONNECTIONS)
+    warmup_steps[f"statements.{index}"] = partial(warm_statements, warmup_engine)
+warmup_steps["serializers"] = partial(warm_serializers, [
+    (TypeAdapter(UserCreate), {"email": _warmup_user["email"], "password": "warmup"}),
+    (DEFAULT_USER_FIELD_SET.adapter, _warmup_user),
+    (DEFAULT_USER_FIELD_SET.list_adapter, [_warmup_user]),
+    (TypeAdapter(Token), {"access_token": "warmup", "token_type": "bearer"}),
+    (TypeAdapter(TokenIntrospectionRequest), {"tokens": ["warmup"]}),
+])
+warmup_steps["password_hashing"] = partial(warm_password_hashing, pwd_context)
+warmup_steps["tokens"] = partial(warm_tokens, key_ring)
+warmup = WarmUp.from_settings(settings, warmup_steps)
+
+readiness = ReadinessProber(
+    engine, settings, breaker=db_breaker if settings.DB_BREAKER_ENABLED else None, warmup=warmup
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging(settings)
+    configure_tracing(settings)
+    # En segundo plano: /health responde ya y /ready espera a que termine
+    warmup_task = asyncio.create_task(warmup.run())
+    await readiness.start()
+    if settings.CHANGE_FEED_ENABLED:
+        for change_feed in change_feeds:
+            change_feed.start()
+    if settings.LOGIN_EVENTS_ENABLED:
+        login_events.start()
+    yield
+    # Acotado por WARMUP_TIMEOUT_SECONDS; cancelarlo dejaría su hilo suelto al salir
+    await warmup_task
+    # Escribe lo que quede en el buffer antes de cerrar
+    login_events.stop()
+    for change_feed in change_feeds:
+        change_feed.stop()
+    await readiness.stop()
+    shutdown_tracing()
+    shutdown_logging()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
+    lifespan=lifespan,
 )
 
 add_exception_handlers(app)
@@ -31,6 +128,17 @@ app.add_middleware(
 # Add custom exception handling middleware
 app.add_middleware(ExceptionMiddleware)
 
+# Plazo por petición; las sentencias SQL heredan el tiempo restante.
+# Queda dentro del access log y del tracing para que registren el 504
+app.add_middleware(DeadlineMiddleware, settings=settings)
+
+if settings.ACCESS_LOG_ENABLED:
+    app.add_middleware(AccessLogMiddleware)
+
+# Span raíz por petición; los spans internos cuelgan de él
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api")
 
@@ -43,4 +151,20 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
-app = configure_app(app)
\ No newline at end of file
+@app.get("/ready")
+async def readiness_check():
+    # Solo lee el último sondeo en segundo plano; nunca toca la base de datos
+    result = readiness.status()
+    if result["status"] != "ready":
+        return create_response(error=result, status_code=503)
+    return create_response(data=result)
+
+@app.get("/metrics")
+def read_metrics():
+    return {"statement_cache": statement_cache_stats(), "metrics": metrics.snapshot()}
+
+app = configure_app(app)
+
+# Profiling por petición: se registra el último para cubrir también la estandarización de respuestas
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, settings=settings)
\ No newline at end of file
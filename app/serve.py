@@ -0,0 +1,58 @@
+import argparse
+import importlib.util
+import os
+from typing import Any, Dict, Optional
+
+import uvicorn
+
+from app.config.settings import Settings, get_settings
+
+
+def _module_available(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def default_worker_count() -> int:
+    """
+    Un worker por CPU disponible para el proceso (respeta la afinidad de CPU del contenedor)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+def build_server_config(settings: Settings, workers: Optional[int] = None,
+                        host: Optional[str] = None, port: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Construye los argumentos de uvicorn.run para producción
+    """
+    return {
+        "app": "app.main:app",
+        "host": host or settings.SERVER_HOST,
+        "port": port or settings.SERVER_PORT,
+        "workers": workers or settings.SERVER_WORKERS or default_worker_count(),
+        # uvloop y httptools son opcionales; si no están instalados se usan asyncio y h11
+        "loop": "uvloop" if _module_available("uvloop") else "asyncio",
+        "http": "httptools" if _module_available("httptools") else "h11",
+        "backlog": settings.SERVER_BACKLOG,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_TIMEOUT,
+        "limit_concurrency": settings.SERVER_LIMIT_CONCURRENCY,
+        "proxy_headers": True,
+        # El access log lo escribe AccessLogMiddleware a través de la cola de logging
+        "access_log": False,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de producción multi-worker")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = build_server_config(get_settings(), workers=args.workers, host=args.host, port=args.port)
+    uvicorn.run(**config)
+
+
+if __name__ == "__main__":
+    main()
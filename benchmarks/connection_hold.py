@@ -0,0 +1,55 @@
+"""
+Tiempo que cada petición retiene una conexión del pool frente a la duración total
+de la petición, en endpoints de solo lectura. Con --hold-until-close se reproduce el
+ciclo anterior, en el que la conexión se devolvía al cerrar la sesión de get_db.
+
+    python -m benchmarks.connection_hold --requests 2000
+    python -m benchmarks.connection_hold --requests 2000 --hold-until-close
+"""
+import argparse
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.telemetry.database_metrics import connection_hold_time
+from app.main import app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hold-until-close", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.hold_until_close:
+        UserRepository._release_connection = lambda self: None
+
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    with TestClient(app) as client:
+        user_id = client.post("/api/v1/users/", json={"email": email, "password": "password"}).json()["data"]["id"]
+        token = client.post("/api/v1/auth/login", data={"username": email, "password": "password"}).json()["data"]["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        paths = ["/api/v1/users/me/", f"/api/v1/users/{user_id}"]
+
+        for path in paths:
+            client.get(path, headers=headers)  # calentamiento
+            count, total = connection_hold_time.count, connection_hold_time.sum
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                client.get(path, headers=headers)
+            elapsed = time.perf_counter() - started
+            holds = connection_hold_time.count - count
+            held = connection_hold_time.sum - total
+            print(
+                f"{path:<20} petición {elapsed / args.requests * 1e3:6.3f} ms  "
+                f"conexión retenida {held / args.requests * 1e3:6.3f} ms "
+                f"({held / elapsed:5.1%}, {holds / args.requests:.1f} checkouts/petición)"
+            )
+
+        client.delete(f"/api/v1/users/{user_id}", headers=headers)
+
+
+if __name__ == "__main__":
+    main()
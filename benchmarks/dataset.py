@@ -0,0 +1,187 @@
+"""
+Generador de datos sintéticos para pruebas de escala: crea N usuarios en la base de
+datos configurada (COPY en PostgreSQL, executemany por lotes en el resto).
+
+Los primeros --login-users usuarios tienen contraseña propia ("password-<i>") y su
+hash se calcula en paralelo; el resto reutiliza hashes de un pool precalculado, ya
+que nunca inician sesión. Todo (emails, estados, fechas, sales de bcrypt) se deriva
+de --seed, así que dos ejecuciones con la misma semilla producen la misma tabla.
+
+    python -m benchmarks.dataset --count 1000000 --seed 42 --truncate
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from passlib.context import CryptContext
+from passlib.utils.binary import bcrypt64
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.engine import Engine
+
+from app.config.database import Base
+from app.config.settings import get_settings
+from app.domain.entities import User
+
+_bcrypt = CryptContext(schemes=["bcrypt"]).handler("bcrypt")
+_DOMAINS = ("example.com", "mail.test", "corp.test", "users.test", "demo.test")
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_COLUMNS = ("id", "email", "hashed_password", "is_active", "created_at")
+
+
+def _salt(rng: random.Random) -> str:
+    return bcrypt64.repair_unused("".join(rng.choice(bcrypt64.charmap) for _ in range(22)))
+
+
+def _hash(password: str, salt: str, rounds: int) -> str:
+    return _bcrypt.using(rounds=rounds, salt=salt).hash(password)
+
+
+def hash_passwords(passwords: List[str], seed: int, rounds: int, workers: int) -> List[str]:
+    """
+    Calcula los hashes en paralelo con sales derivadas de la semilla; el resultado
+    no depende del número de procesos
+    """
+    rng = random.Random(f"{seed}:salts")
+    salts = [_salt(rng) for _ in passwords]
+    if workers <= 1:
+        return [_hash(password, salt, rounds) for password, salt in zip(passwords, salts)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(_hash, passwords, salts, [rounds] * len(passwords), chunksize=chunksize))
+
+
+def generate_rows(count: int, seed: int, login_hashes: List[str], pool_hashes: List[str],
+                  batch_size: int) -> Iterator[List[Dict]]:
+    rng = random.Random(f"{seed}:rows")
+    batch = []
+    for i in range(count):
+        if i < len(login_hashes):
+            email = f"user{i}@example.com"
+            hashed_password = login_hashes[i]
+            is_active = True
+        else:
+            email = f"user{i}@{rng.choice(_DOMAINS)}"
+            hashed_password = rng.choice(pool_hashes)
+            is_active = rng.random() >= 0.05
+        batch.append({
+            "id": i + 1,
+            "email": email,
+            "hashed_password": hashed_password,
+            "is_active": is_active,
+            "created_at": _EPOCH + timedelta(seconds=rng.randrange(365 * 86400)),
+        })
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_postgresql(engine: Engine, batches: Iterator[List[Dict]]) -> int:
+    written = 0
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        for batch in batches:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow([row[column] for column in _COLUMNS])
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY users ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            written += len(batch)
+        # Los ids son explícitos: la secuencia debe continuar a partir del máximo
+        cursor.execute("SELECT setval(pg_get_serial_sequence('users', 'id'), (SELECT max(id) FROM users))")
+        raw.commit()
+    finally:
+        raw.close()
+    return written
+
+
+def _executemany(engine: Engine, batches: Iterator[List[Dict]]) -> int:
+    written = 0
+    statement = insert(User.__table__)
+    with engine.begin() as conn:
+        for batch in batches:
+            conn.execute(statement, batch)
+            written += len(batch)
+    return written
+
+
+def run(database_url: str, count: int, seed: int, login_users: int, hash_pool_size: int,
+        rounds: int, workers: int, batch_size: int, truncate: bool) -> Dict:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    if truncate:
+        with engine.begin() as conn:
+            conn.execute(User.__table__.delete())
+
+    login_users = min(login_users, count)
+    started = time.perf_counter()
+    login_hashes = hash_passwords([f"password-{i}" for i in range(login_users)], seed, rounds, workers)
+    pool_hashes = hash_passwords(
+        [f"pool-{seed}-{i}" for i in range(hash_pool_size)], seed + 1, rounds, workers
+    )
+    hashed = time.perf_counter()
+
+    batches = generate_rows(count, seed, login_hashes, pool_hashes, batch_size)
+    if engine.dialect.name == "postgresql":
+        written = _copy_postgresql(engine, batches)
+    else:
+        written = _executemany(engine, batches)
+    finished = time.perf_counter()
+    engine.dispose()
+
+    return {
+        "dialect": engine.dialect.name,
+        "rows": written,
+        "seed": seed,
+        "hashes": login_users + hash_pool_size,
+        "hash_seconds": round(hashed - started, 3),
+        "insert_seconds": round(finished - hashed, 3),
+        "total_seconds": round(finished - started, 3),
+        "rows_per_second": round(written / (finished - hashed)) if finished > hashed else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="Por defecto, DATABASE_URL de la configuración")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--login-users", type=int, default=100, help="Usuarios con contraseña propia")
+    parser.add_argument("--hash-pool-size", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=_bcrypt.default_rounds, help="Coste de bcrypt")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--truncate", action="store_true", help="Vacía la tabla users antes de insertar")
+    parser.add_argument("--report", default=None, help="Guarda el informe de tiempos en JSON")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.database_url or get_settings().DATABASE_URL,
+        args.count,
+        args.seed,
+        args.login_users,
+        args.hash_pool_size,
+        args.rounds,
+        args.workers,
+        args.batch_size,
+        args.truncate,
+    )
+    for key, value in report.items():
+        print(f"{key:<16} {value}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Verificaciones de JWT por segundo: python-jose frente al key ring con claves
+preparadas, sin caché (tokens distintos) y con caché (el mismo token repetido).
+
+    python -m benchmarks.jwt_verify
+"""
+import time
+import timeit
+
+from jose import jwt
+
+from app.infrastructure.auth.token_verifier import JWTKeyRing, PreparedKey
+
+SECRET = "benchmark-secret"
+
+
+def _measure(label: str, fn, number: int):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3))
+    print(f"{label:<36} {number / seconds:>10.0f} tokens/s")
+
+
+def main():
+    signing_key = PreparedKey.from_material(None, "HS256", SECRET)
+    exp = int(time.time()) + 3600
+    tokens = [jwt.encode({"sub": f"user{i}@example.com", "exp": exp}, SECRET, algorithm="HS256") for i in range(20_000)]
+
+    _measure("python-jose jwt.decode", lambda: jwt.decode(tokens[0], SECRET, algorithms=["HS256"]), 5_000)
+
+    uncached = JWTKeyRing("HS256", signing_key, {None: signing_key}, cache_size=0)
+    _measure("key ring sin caché", lambda: uncached.decode(tokens[0]), 20_000)
+
+    cached = JWTKeyRing("HS256", signing_key, {None: signing_key}, cache_size=len(tokens))
+    for token in tokens:
+        cached.decode(token)
+    _measure("key ring con caché", lambda: cached.decode(tokens[0]), 200_000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Lectura de páginas de 1k usuarios: entidades ORM + model_validate por objeto
+frente a consulta proyectada + TypeAdapter(list[UserResponse]) en bloque.
+
+    python -m benchmarks.projection --rows 1000 --iterations 200
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.application.usecases.user_usecase import UserResponse, UserUseCase, user_response_list_adapter
+from app.domain.entities import Base, User
+from app.infrastructure.repositories.user_repository import UserRepository
+
+
+def _orm_page(engine, rows: int):
+    with Session(engine) as session:
+        users = session.query(User).offset(0).limit(rows).all()
+        return [UserResponse.model_validate(user).model_dump() for user in users]
+
+
+def _projected_page(engine, rows: int):
+    with Session(engine) as session:
+        users = UserUseCase(UserRepository(session)).list_users(0, rows)
+        return user_response_list_adapter.dump_python(users)
+
+
+def _measure(fn, engine, rows: int, iterations: int):
+    fn(engine, rows)  # calentamiento
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn(engine, rows)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    fn(engine, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        session.execute(User.__table__.insert(), [
+            {"email": f"user{i}@example.com", "hashed_password": "x" * 60, "is_active": True}
+            for i in range(args.rows)
+        ])
+        session.commit()
+
+    for label, fn in (("ORM + model_validate", _orm_page), ("proyección + TypeAdapter", _projected_page)):
+        median, peak = _measure(fn, engine, args.rows, args.iterations)
+        print(f"{label:<28} mediana={median * 1000:>7.2f} ms  pico={peak / 1024:>8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Coste en Python por consulta: API legacy db.query(...).filter(...) frente a las
+sentencias preconstruidas de UserRepository, y estadísticas de la caché de compilación.
+
+    python -m benchmarks.statement_cache --iterations 5000
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.domain.entities import Base, User
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.telemetry.database_metrics import instrument_statement_cache, statement_cache, statement_cache_stats
+
+
+def _legacy(session: Session, i: int):
+    session.query(User).filter(User.email == f"user{i % 100}@example.com").first()
+    session.query(User).filter(User.id == i % 100 + 1).first()
+
+
+def _prebuilt(session: Session, i: int):
+    repository = UserRepository(session)
+    repository.get_by_email(f"user{i % 100}@example.com")
+    repository.get_by_id(i % 100 + 1)
+
+
+def _per_query_us(fn, engine, iterations: int) -> float:
+    with Session(engine) as session:
+        for i in range(100):
+            fn(session, i)
+        started = time.perf_counter()
+        for i in range(iterations):
+            fn(session, i)
+        return (time.perf_counter() - started) / (iterations * 2) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    instrument_statement_cache(engine)
+    with Session(engine) as session:
+        session.execute(User.__table__.insert(), [
+            {"email": f"user{i}@example.com", "hashed_password": "x" * 60, "is_active": True} for i in range(100)
+        ])
+        session.commit()
+
+    for label, fn in (("db.query(...).filter(...)", _legacy), ("sentencias preconstruidas", _prebuilt)):
+        statement_cache.reset()
+        per_query = _per_query_us(fn, engine, args.iterations)
+        print(f"{label:<28} {per_query:>7.1f} µs/consulta  caché={statement_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
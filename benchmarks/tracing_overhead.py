@@ -0,0 +1,49 @@
+"""
+Coste por span del API de tracing: desactivado, traza no muestreada y muestreada.
+
+    python -m benchmarks.tracing_overhead
+"""
+import timeit
+
+from app.infrastructure.telemetry.tracing import BatchSpanProcessor, traced, tracer
+
+
+class _DiscardExporter:
+    def export(self, spans):
+        pass
+
+
+@traced()
+def _decorated():
+    pass
+
+
+def _with_span():
+    with tracer.start_span("bench"):
+        pass
+
+
+def _measure(label: str, fn, number: int = 200_000):
+    seconds = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{label:<32} {seconds / number * 1e9:>8.0f} ns/span")
+
+
+def main():
+    baseline = min(timeit.repeat(lambda: None, number=200_000, repeat=5)) / 200_000
+
+    tracer.enabled = False
+    _measure("desactivado (with start_span)", _with_span)
+    _measure("desactivado (@traced)", _decorated)
+    print(f"{'llamada vacía (referencia)':<32} {baseline * 1e9:>8.0f} ns")
+
+    tracer.enabled = True
+    tracer.processor = BatchSpanProcessor(_DiscardExporter(), max_queue_size=1_000_000)
+    tracer.sample_rate = 1.0
+    _measure("activado y muestreado", _with_span, number=50_000)
+    tracer.processor.shutdown()
+    tracer.processor = None
+    tracer.enabled = False
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Latencia de las primeras peticiones tras arrancar frente a la del estado estable,
+con y sin calentamiento inicial. Cada variante se ejecuta en un proceso nuevo: espera
+a que /ready responda 200, mide las primeras --first peticiones y después --steady
+más, y compara sus percentiles.
+
+    python -m benchmarks.warmup --first 100 --steady 2000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+
+def _percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _summary(latencies) -> dict:
+    return {
+        "p50": _percentile(latencies, 0.50) * 1e3,
+        "p99": _percentile(latencies, 0.99) * 1e3,
+        "max": max(latencies) * 1e3,
+    }
+
+
+def _run_variant(first: int, steady: int) -> dict:
+    # Importar la aplicación no cuenta: en producción ocurre antes de aceptar tráfico
+    from fastapi.testclient import TestClient
+    from jose import jwt
+    from sqlalchemy import delete, insert
+
+    from app.config.database import engine
+    from app.config.settings import get_settings
+    from app.domain.entities import User
+    from app.main import app
+
+    settings = get_settings()
+    email = f"bench-{uuid.uuid4().hex[:8]}@example.com"
+    # Sin pasar por la aplicación para no calentar nada antes de medir
+    with engine.begin() as conn:
+        user_id = conn.execute(
+            insert(User.__table__).values(email=email, hashed_password="-", is_active=True)
+        ).inserted_primary_key[0]
+    engine.dispose()
+    token = jwt.encode({"sub": email, "exp": int(time.time()) + 3600}, settings.JWT_SECRET_KEY,
+                       algorithm=settings.JWT_ALGORITHM)
+    headers = {"Authorization": f"Bearer {token}"}
+    paths = ["/api/v1/users/me/", f"/api/v1/users/{user_id}", "/api/v1/users/?limit=10"]
+
+    try:
+        with TestClient(app) as client:
+            started = time.perf_counter()
+            while client.get("/ready").status_code != 200:
+                time.sleep(0.01)
+            ready_after = time.perf_counter() - started
+
+            latencies = []
+            for i in range(first + steady):
+                path = paths[i % len(paths)]
+                started = time.perf_counter()
+                response = client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, (path, response.status_code)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(delete(User.__table__).where(User.id == user_id))
+
+    return {
+        "ready_ms": ready_after * 1e3,
+        "first": _summary(latencies[:first]),
+        "steady": _summary(latencies[first:]),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first", type=int, default=100)
+    parser.add_argument("--steady", type=int, default=2000)
+    parser.add_argument("--variant", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.variant:
+        print(json.dumps(_run_variant(args.first, args.steady)))
+        return
+
+    print(f"{'':<16} {'ready':>9} {'primeras p50':>13} {'p99':>9} {'max':>9} {'estable p50':>12} {'p99':>9}")
+    for label, enabled in (("sin warm-up", "false"), ("con warm-up", "true")):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.warmup", "--variant",
+             "--first", str(args.first), "--steady", str(args.steady)],
+            env={**os.environ, "WARMUP_ENABLED": enabled},
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        first, steady = result["first"], result["steady"]
+        print(
+            f"{label:<16} {result['ready_ms']:7.1f}ms {first['p50']:11.3f}ms {first['p99']:7.3f}ms "
+            f"{first['max']:7.3f}ms {steady['p50']:10.3f}ms {steady['p99']:7.3f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Smoke benchmark: peticiones por segundo contra /health con 1..N workers.
+
+    python -m benchmarks.workers --max-workers 4 --duration 5
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+
+from app.serve import default_worker_count
+
+
+def _wait_until_up(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"El servidor no respondió en {timeout}s")
+
+
+def _client_loop(url: str, duration: float) -> int:
+    done = 0
+    with httpx.Client(timeout=5.0) as client:
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            client.get(url)
+            done += 1
+    return done
+
+
+def run(workers: int, port: int, clients: int, duration: float) -> float:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "--workers", str(workers), "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=os.environ.copy(),
+    )
+    url = f"http://127.0.0.1:{port}/health"
+    try:
+        _wait_until_up(url)
+        with ProcessPoolExecutor(max_workers=clients) as pool:
+            # Calentamiento breve para que todos los workers acepten conexiones
+            list(pool.map(_client_loop, [url] * clients, [0.5] * clients))
+            total = sum(pool.map(_client_loop, [url] * clients, [duration] * clients))
+        return total / duration
+    finally:
+        server.terminate()
+        server.wait(timeout=15)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=default_worker_count())
+    parser.add_argument("--clients", type=int, default=None, help="procesos cliente (por defecto 2 por worker)")
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    counts = sorted({1, args.max_workers})
+    baseline = None
+    for workers in counts:
+        clients = args.clients or 2 * args.max_workers
+        rps = run(workers, args.port, clients, args.duration)
+        baseline = baseline or rps
+        print(f"workers={workers:<3} req/s={rps:>10.1f}  x{rps / baseline:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy import text
 
 from alembic import context
 from app.config.settings import get_settings
@@ -72,8 +73,17 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            # Si un ALTER no consigue su lock a tiempo la migración falla en lugar de
+            # dejar en cola todas las escrituras de la tabla detrás de él
+            connection.execute(text("SELECT set_config('lock_timeout', :value, false)"), {"value": settings.MIGRATION_LOCK_TIMEOUT})
+            connection.execute(text("SELECT set_config('statement_timeout', :value, false)"), {"value": settings.MIGRATION_STATEMENT_TIMEOUT})
+            connection.commit()
+        # Cada revisión en su propia transacción: los locks no se acumulan entre migraciones
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,156 @@
+"""
+Utilidades para migraciones que deben poder ejecutarse con la aplicación en marcha
+sobre tablas grandes. Convenciones:
+
+- Los índices se crean y eliminan con create_index_concurrently/drop_index_concurrently:
+  en PostgreSQL usan CONCURRENTLY fuera de la transacción de la migración y no bloquean
+  las escrituras.
+- Las columnas nuevas se añaden nullable y sin default calculado; los datos se rellenan
+  con batched_backfill, que confirma cada lote por separado, hace pausas entre lotes y
+  guarda el progreso para poder reanudarse si se interrumpe.
+- Toda operación que toma un lock sobre la tabla lo hace bajo lock_timeout (configurado
+  en env.py y ajustable con timeouts()), de modo que si hay una transacción larga en
+  curso la migración falla rápido en lugar de encolar todas las escrituras detrás.
+
+En dialectos distintos de PostgreSQL los helpers hacen la operación equivalente sin
+las opciones específicas, lo que permite probarlos sobre SQLite.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+_progress = sa.Table(
+    "migration_progress",
+    sa.MetaData(),
+    sa.Column("name", sa.String(255), primary_key=True),
+    sa.Column("last_key", sa.BigInteger, nullable=False),
+    sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+)
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+@contextmanager
+def timeouts(lock_timeout: Optional[str] = None, statement_timeout: Optional[str] = None) -> Iterator[None]:
+    """
+    Ajusta lock_timeout/statement_timeout de la sesión durante el bloque y
+    restaura los valores anteriores al salir. Sin efecto fuera de PostgreSQL
+    """
+    if not _is_postgresql():
+        yield
+        return
+    bind = op.get_bind()
+    settings = {"lock_timeout": lock_timeout, "statement_timeout": statement_timeout}
+    previous = {}
+    for name, value in settings.items():
+        if value is not None:
+            previous[name] = bind.execute(sa.text(f"SHOW {name}")).scalar()
+            bind.execute(sa.text("SELECT set_config(:name, :value, false)"), {"name": name, "value": value})
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            bind.execute(sa.text("SELECT set_config(:name, :value, false)"), {"name": name, "value": value})
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: Sequence[str], **kw: Any) -> None:
+    """
+    Crea un índice sin bloquear las escrituras. CREATE INDEX CONCURRENTLY no puede
+    ejecutarse dentro de una transacción, así que se hace en un autocommit_block.
+    Si una ejecución anterior se interrumpió, el índice quedó marcado como inválido
+    y se elimina antes de volver a crearlo
+    """
+    if not _is_postgresql():
+        op.create_index(index_name, table_name, columns, **kw)
+        return
+    with op.get_context().autocommit_block():
+        invalid = op.get_bind().execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": index_name},
+        ).scalar()
+        if invalid:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """
+    Elimina un índice sin bloquear las escrituras
+    """
+    if not _is_postgresql():
+        op.drop_index(index_name, table_name=table_name)
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def batched_backfill(
+    name: str,
+    table: sa.Table,
+    values: Dict[str, Any],
+    where: Optional[sa.ColumnElement] = None,
+    key: str = "id",
+    batch_size: int = 10000,
+    pause_seconds: float = 0.1,
+    lock_timeout: Optional[str] = "5s",
+    statement_timeout: Optional[str] = "30s",
+) -> int:
+    """
+    Actualiza la tabla por rangos de la clave primaria, confirmando cada lote por
+    separado para no mantener locks sobre millones de filas. El último valor de la
+    clave procesado se guarda en migration_progress bajo 'name': si la migración se
+    interrumpe, la siguiente ejecución continúa desde ahí. El rango se fija al empezar;
+    las filas insertadas después deben recibir el valor desde la aplicación.
+    'where' debe excluir las filas ya rellenadas para que el proceso sea idempotente.
+    Cada lote se ejecuta con lock_timeout/statement_timeout locales a su transacción.
+    Devuelve el número de filas actualizadas
+    """
+    key_column = table.c[key]
+    updated = 0
+    # La transacción de la migración se confirma antes de empezar (autocommit_block)
+    # para no retener sus locks; los lotes van por una conexión propia
+    with op.get_context().autocommit_block(), op.get_bind().engine.connect() as conn:
+        is_postgresql = conn.dialect.name == "postgresql"
+        with conn.begin():
+            _progress.create(conn, checkfirst=True)
+            last_key = conn.execute(sa.select(_progress.c.last_key).where(_progress.c.name == name)).scalar()
+            if last_key is None:
+                last_key = conn.execute(sa.select(sa.func.min(key_column))).scalar()
+                if last_key is None:
+                    return 0
+                last_key -= 1
+                conn.execute(sa.insert(_progress).values(name=name, last_key=last_key))
+            max_key = conn.execute(sa.select(sa.func.max(key_column))).scalar()
+
+        while last_key < max_key:
+            upper = min(last_key + batch_size, max_key)
+            condition = sa.and_(key_column > last_key, key_column <= upper)
+            if where is not None:
+                condition = sa.and_(condition, where)
+            # Lote y progreso en una misma transacción: o se aplican los dos o ninguno
+            with conn.begin():
+                if is_postgresql:
+                    for setting, value in (("lock_timeout", lock_timeout), ("statement_timeout", statement_timeout)):
+                        if value is not None:
+                            conn.execute(sa.text("SELECT set_config(:name, :value, true)"), {"name": setting, "value": value})
+                updated += conn.execute(sa.update(table).where(condition).values(**values)).rowcount
+                conn.execute(
+                    sa.update(_progress)
+                    .where(_progress.c.name == name)
+                    .values(last_key=upper, updated_at=sa.func.now())
+                )
+            last_key = upper
+            if pause_seconds and last_key < max_key:
+                time.sleep(pause_seconds)
+
+        with conn.begin():
+            conn.execute(sa.delete(_progress).where(_progress.c.name == name))
+    return updated
@@ -0,0 +1,44 @@
+"""Login events audit table and users.last_login_at
+
+Revision ID: 3b6f0d9e8c27
+Revises: 9c4d7e2b1a06
+Create Date: 2026-10-19 19:22:08.641930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b6f0d9e8c27'
+down_revision: Union[str, None] = '9c4d7e2b1a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'login_events',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('succeeded', sa.Boolean(), nullable=False),
+        sa.Column('ip_address', sa.String(length=45), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_login_events_user_id_created_at', 'login_events', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_login_events_email_created_at', 'login_events', ['email', 'created_at'], unique=False)
+    # Nullable y sin default: no reescribe la tabla ni la bloquea más que un instante
+    op.add_column('users', sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'last_login_at')
+    op.drop_index('ix_login_events_email_created_at', table_name='login_events')
+    op.drop_index('ix_login_events_user_id_created_at', table_name='login_events')
+    op.drop_table('login_events')
@@ -0,0 +1,47 @@
+"""Email prefix and substring search indexes
+
+Revision ID: 5e8a2c71d4f3
+Revises: bf1c47e9bb9c
+Create Date: 2026-10-19 16:40:12.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8a2c71d4f3'
+down_revision: Union[str, None] = 'bf1c47e9bb9c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Ambos índices son específicos de PostgreSQL; en SQLite la búsqueda por prefijo
+    # usa el índice único del email y la de subcadena recorre la tabla
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Collation "C" en lugar de text_pattern_ops: sirve igual para el rango del
+    # prefijo y además para el ORDER BY email de la paginación keyset
+    create_index_concurrently('ix_users_email_prefix', 'users', [sa.text('email COLLATE "C"')])
+    create_index_concurrently(
+        'ix_users_email_trgm',
+        'users',
+        ['email'],
+        postgresql_using='gin',
+        postgresql_ops={'email': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    drop_index_concurrently('ix_users_email_trgm', 'users')
+    drop_index_concurrently('ix_users_email_prefix', 'users')
@@ -0,0 +1,40 @@
+"""Case-insensitive email uniqueness and search index
+
+Revision ID: 7d2f4a9c1e58
+Revises: 3b6f0d9e8c27
+Create Date: 2026-10-19 21:12:36.804113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f4a9c1e58'
+down_revision: Union[str, None] = '3b6f0d9e8c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Falla si ya hay emails que solo difieren en mayúsculas: hay que resolverlos
+    # a mano antes, porque cualquiera de las cuentas podría ser la legítima
+    if op.get_bind().dialect.name == 'postgresql':
+        # lower(email) en collation "C" sirve además para el rango del prefijo y el
+        # ORDER BY de la búsqueda, así que sustituye a ix_users_email_prefix
+        create_index_concurrently('ix_users_email_lower', 'users', [sa.text('lower(email) COLLATE "C"')], unique=True)
+        drop_index_concurrently('ix_users_email_prefix', 'users')
+    else:
+        create_index_concurrently('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        create_index_concurrently('ix_users_email_prefix', 'users', [sa.text('email COLLATE "C"')])
+    drop_index_concurrently('ix_users_email_lower', 'users')
@@ -0,0 +1,79 @@
+"""User change feed outbox and triggers
+
+Revision ID: 9c4d7e2b1a06
+Revises: 5e8a2c71d4f3
+Create Date: 2026-10-19 18:05:47.530219
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d7e2b1a06'
+down_revision: Union[str, None] = '5e8a2c71d4f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_changes',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        # Los ids no se pueden reutilizar tras podar: el cursor de los workers no volvería atrás
+        sqlite_autoincrement=True,
+    )
+    op.create_index(op.f('ix_user_changes_changed_at'), 'user_changes', ['changed_at'], unique=False)
+
+    # Solo los cambios que afectan a la autenticación generan eventos
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE OR REPLACE FUNCTION users_record_change() RETURNS trigger AS $$
+            DECLARE
+                change_id bigint;
+            BEGIN
+                INSERT INTO user_changes (user_id, email) VALUES (OLD.id, OLD.email) RETURNING id INTO change_id;
+                PERFORM pg_notify('user_changes', change_id::text);
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute("""
+            CREATE TRIGGER users_change_feed
+            AFTER UPDATE OF email, hashed_password, is_active OR DELETE ON users
+            FOR EACH ROW EXECUTE FUNCTION users_record_change()
+        """)
+    else:
+        op.execute("""
+            CREATE TRIGGER users_change_feed_update
+            AFTER UPDATE OF email, hashed_password, is_active ON users
+            BEGIN
+                INSERT INTO user_changes (user_id, email) VALUES (OLD.id, OLD.email);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER users_change_feed_delete
+            AFTER DELETE ON users
+            BEGIN
+                INSERT INTO user_changes (user_id, email) VALUES (OLD.id, OLD.email);
+            END
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DROP TRIGGER IF EXISTS users_change_feed ON users')
+        op.execute('DROP FUNCTION IF EXISTS users_record_change()')
+    else:
+        op.execute('DROP TRIGGER IF EXISTS users_change_feed_update')
+        op.execute('DROP TRIGGER IF EXISTS users_change_feed_delete')
+    op.drop_index(op.f('ix_user_changes_changed_at'), table_name='user_changes')
+    op.drop_table('user_changes')
@@ -0,0 +1,43 @@
+"""Covering email index for auth lookups
+
+Revision ID: bf1c47e9bb9c
+Revises: d41bf3d40cd0
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bf1c47e9bb9c'
+down_revision: Union[str, None] = 'd41bf3d40cd0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ix_users_id duplica el índice de la clave primaria y solo encarece las escrituras
+    drop_index_concurrently('ix_users_id', 'users')
+    # El índice único de cobertura sustituye a ix_users_email: mantiene la unicidad
+    # y en PostgreSQL incluye las columnas que necesita la autenticación
+    create_index_concurrently(
+        'ix_users_email_covering',
+        'users',
+        ['email'],
+        unique=True,
+        postgresql_include=['id', 'hashed_password', 'is_active'],
+    )
+    drop_index_concurrently('ix_users_email', 'users')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    create_index_concurrently('ix_users_email', 'users', ['email'], unique=True)
+    drop_index_concurrently('ix_users_email_covering', 'users')
+    create_index_concurrently('ix_users_id', 'users', ['id'], unique=False)
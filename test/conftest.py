@@ -1,9 +1,18 @@
+import os
+import shutil
+import tempfile
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+# Antes de importar la aplicación: su engine y los componentes que arranca el lifespan
+# (warm-up, readiness, feed de cambios, registro de logins) usan la misma base de datos
+# SQLite temporal que test_engine, nunca la configurada en DATABASE_URL
+_TEST_DATABASE_DIR = tempfile.mkdtemp(prefix="test-db-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DATABASE_DIR, 'test.db')}"
+
 from app.main import app
 from app.config.settings import get_settings
 from app.domain.entities import Base  # Importa Base desde donde esté definida la entidad User
@@ -12,14 +21,14 @@ from app.config.database import get_db
 # Configuración para una base de datos SQLite en memoria para testing
 @pytest.fixture(scope="session")
 def test_settings():
-    # Sobreescribir configuración para tests
-    settings = get_settings()
-    settings.DATABASE_URL = "sqlite:///:memory:"
-    return settings
+    # DATABASE_URL ya apunta a la base de datos temporal de los tests
+    return get_settings()
 
 @pytest.fixture(scope="session")
 def test_engine(test_settings):
-    # Crear conexión a base de datos de prueba
+    # Engine propio sobre la misma base de datos que la aplicación: las peticiones lo
+    # usan a través de get_db y solo registra sus sentencias, no las de los hilos
+    # en segundo plano del lifespan
     engine = create_engine(
         test_settings.DATABASE_URL,
         connect_args={"check_same_thread": False},
@@ -30,6 +39,8 @@ def test_engine(test_settings):
     yield engine
     # Limpiar después de todos los tests
     Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+    shutil.rmtree(_TEST_DATABASE_DIR, ignore_errors=True)
 
 @pytest.fixture(scope="function")
 def test_db(test_engine):
@@ -63,6 +74,12 @@ def authenticated_client(client, auth_headers):
     client.headers.update(auth_headers)
     return client
 
+@pytest.fixture
+def admin_client(authenticated_client, test_user, monkeypatch):
+    """Cliente autenticado con un usuario administrador"""
+    monkeypatch.setattr(get_settings(), "ADMIN_USER_IDS", [test_user.id])
+    return authenticated_client
+
 @pytest.fixture
 def db_session(test_db):
     """Alias para test_db para que coincida con el nombre usado en las pruebas"""
@@ -91,7 +108,12 @@ def test_user(test_db):
         test_db.commit()
         test_db.refresh(user)
     
-    return user
+    yield user
+    
+    # Limpiar para no afectar a los tests que listan usuarios
+    test_db.rollback()
+    test_db.query(User).filter(User.id == user.id).delete()
+    test_db.commit()
 
 # Fixture para token de autenticación
 @pytest.fixture
@@ -102,4 +124,78 @@ def auth_headers(test_user, client):
         data={"sub": test_user.email}
     )
     headers = {"Authorization": f"Bearer {access_token}"}
-    return headers
\ No newline at end of file
+    return headers
+
+# Presupuestos por petición: sentencias SQL y pico de memoria asignada
+class RequestCost:
+    """Coste medido de una petición hecha con TestClient"""
+
+    def __init__(self, response, statements, peak_bytes):
+        self.response = response
+        self.statements = statements
+        self.peak_bytes = peak_bytes
+
+    @property
+    def queries(self):
+        return len(self.statements)
+
+    def describe(self):
+        lines = [f"{self.queries} sentencias, pico {self.peak_bytes / 1024:.1f} KiB"]
+        lines.extend(f"  {statement}" for statement in self.statements)
+        return "\n".join(lines)
+
+
+@pytest.fixture
+def request_budget(client, test_engine):
+    """
+    Mide cada petición hecha con measure(): sentencias ejecutadas en la base de datos
+    de test y pico de memoria asignada (tracemalloc) durante la petición.
+    Con warm=True se hace antes la misma petición sin medir, para que las cachés de
+    primer uso no cuenten; la caché de principals se vacía siempre, así que la
+    autenticación consulta la base de datos como en el peor caso
+    """
+    import threading
+    import tracemalloc
+    from sqlalchemy import event
+    from app.adapters.controllers.auth_controller import login_events
+    from app.infrastructure.auth.jwt import principal_cache
+    from app.main import change_feeds, warmup
+
+    # El warm-up del primer cliente ejecuta sentencias en segundo plano
+    warmup.wait(30)
+    # Los hilos en segundo plano asignan memoria a destiempo y falsearían el pico;
+    # el lifespan del siguiente cliente los vuelve a arrancar
+    login_events.stop()
+    for change_feed in change_feeds:
+        change_feed.stop()
+
+    statements = []
+    recording = threading.Event()
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if recording.is_set():
+            statements.append(" ".join(statement.split()))
+
+    def measure(method, url, warm=True, **kwargs):
+        if warm:
+            client.request(method, url, **kwargs)
+        principal_cache.invalidate(None)
+        statements.clear()
+        tracemalloc.clear_traces()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        recording.set()
+        try:
+            response = client.request(method, url, **kwargs)
+        finally:
+            recording.clear()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        return RequestCost(response, list(statements), peak)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    tracemalloc.start()
+    try:
+        yield measure
+    finally:
+        tracemalloc.stop()
+        event.remove(test_engine, "before_cursor_execute", record)
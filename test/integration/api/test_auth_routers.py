@@ -0,0 +1,190 @@
+import pytest
+from datetime import timedelta
+from sqlalchemy import event
+from app.config.settings import get_settings
+from app.domain.entities import User
+from app.infrastructure.auth.jwt import create_access_token, principal_cache
+
+
+@pytest.fixture
+def inactive_user(test_db):
+    user = User(email="introspect_inactive@example.com", hashed_password="hashed", is_active=False)
+    test_db.add(user)
+    test_db.commit()
+    yield user
+    test_db.delete(user)
+    test_db.commit()
+
+
+@pytest.fixture
+def introspection_auth(monkeypatch):
+    """Credenciales de un cliente autorizado a usar la introspección"""
+    monkeypatch.setattr(get_settings(), "INTROSPECTION_CLIENTS", {"gateway": "gateway-secret"})
+    return ("gateway", "gateway-secret")
+
+
+@pytest.mark.integration
+class TestAuthRoutes:
+    """Tests de integración para las rutas de autenticación"""
+    
+    def test_introspect_many_tokens(self, client, test_user, inactive_user, test_engine, introspection_auth):
+        """Test para verificar muchos tokens con una sola consulta de usuarios"""
+        # Arrange
+        principal_cache.invalidate(None)
+        active = create_access_token({"sub": test_user.email})
+        tokens = [
+            active,
+            create_access_token({"sub": inactive_user.email}),
+            create_access_token({"sub": "missing@example.com"}),
+            create_access_token({"sub": test_user.email}, expires_delta=timedelta(seconds=-1)),
+            "not-a-token",
+            active,
+        ]
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(test_engine, "before_cursor_execute", listener)
+        
+        # Act
+        try:
+            response = client.post("/api/v1/auth/introspect", json={"tokens": tokens}, auth=introspection_auth)
+        finally:
+            event.remove(test_engine, "before_cursor_execute", listener)
+        
+        # Assert
+        assert response.status_code == 200
+        results = response.json()["data"]["results"]
+        assert [result["status"] for result in results] == [
+            "active", "inactive", "inactive", "expired", "invalid", "active"
+        ]
+        assert results[0]["active"] is True
+        assert results[0]["user_id"] == test_user.id
+        assert results[0]["sub"] == test_user.email
+        assert results[2]["user_id"] is None
+        assert len([sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]) == 1
+    
+    @pytest.mark.parametrize("sub", [123, ["a@example.com"], {"email": "a@example.com"}])
+    def test_non_string_subject_is_unauthorized(self, client, sub):
+        """Un token con 'sub' que no es una cadena se rechaza con 401 y no con 500"""
+        # Arrange
+        token = create_access_token({"sub": sub})
+
+        # Act
+        response = client.get("/api/v1/users/me/", headers={"Authorization": f"Bearer {token}"})
+
+        # Assert
+        assert response.status_code == 401
+
+    def test_introspect_rejects_empty_list(self, client, introspection_auth):
+        """Test para rechazar una petición sin tokens"""
+        # Act
+        response = client.post("/api/v1/auth/introspect", json={"tokens": []}, auth=introspection_auth)
+        
+        # Assert
+        assert response.status_code == 422
+
+    def test_introspect_requires_client_credentials(self, client, test_user, introspection_auth):
+        """Sin credenciales o con un secreto incorrecto la introspección responde 401"""
+        # Arrange
+        body = {"tokens": [create_access_token({"sub": test_user.email})]}
+
+        # Act
+        anonymous = client.post("/api/v1/auth/introspect", json=body)
+        wrong_secret = client.post("/api/v1/auth/introspect", json=body, auth=("gateway", "wrong"))
+        unknown_client = client.post("/api/v1/auth/introspect", json=body, auth=("other", "gateway-secret"))
+
+        # Assert
+        assert anonymous.status_code == 401
+        assert wrong_secret.status_code == 401
+        assert unknown_client.status_code == 401
+
+    def test_introspect_requires_introspect_scope(self, client, test_user):
+        """Un token de usuario sin el scope 'introspect' no basta; con él sí"""
+        # Arrange
+        body = {"tokens": [create_access_token({"sub": test_user.email})]}
+        user_token = create_access_token({"sub": test_user.email})
+        service_token = create_access_token({"sub": "gateway", "scope": "introspect"})
+
+        # Act
+        as_user = client.post("/api/v1/auth/introspect", json=body,
+                              headers={"Authorization": f"Bearer {user_token}"})
+        as_service = client.post("/api/v1/auth/introspect", json=body,
+                                 headers={"Authorization": f"Bearer {service_token}"})
+        invalid = client.post("/api/v1/auth/introspect", json=body,
+                              headers={"Authorization": "Bearer not-a-token"})
+
+        # Assert
+        assert as_user.status_code == 403
+        assert as_service.status_code == 200
+        assert invalid.status_code == 401
+    
+    def test_login_records_attempts_without_writing(self, client, test_user, monkeypatch):
+        """Test para registrar los intentos de login en el buffer con la IP del cliente"""
+        from app.adapters.controllers.auth_controller import login_events
+        
+        # Arrange
+        written = []
+        monkeypatch.setattr(login_events, "_writer", written.extend)
+        login_events.flush()
+        written.clear()
+        
+        # Act
+        ok = client.post("/api/v1/auth/login", data={"username": test_user.email, "password": "testpassword"})
+        failed = client.post("/api/v1/auth/login", data={"username": test_user.email, "password": "wrong"})
+        login_events.flush()
+        
+        # Assert
+        assert ok.status_code == 200
+        assert failed.status_code == 401
+        assert [(e["user_id"], e["succeeded"], e["ip_address"]) for e in written] == [
+            (test_user.id, True, "testclient"),
+            (None, False, "testclient"),
+        ]
+    
+    def test_login_hashing_runs_in_measured_threadpool(self, client, test_user, monkeypatch):
+        """El bcrypt del login ocupa un hueco del threadpool que vigila readiness"""
+        # Arrange
+        import anyio.from_thread
+        import anyio.to_thread
+        from app.infrastructure.auth import jwt as jwt_module
+        borrowed = []
+        verify = jwt_module.verify_password
+
+        def measured_verify(plain_password, hashed_password):
+            borrowed.append(anyio.from_thread.run_sync(
+                lambda: anyio.to_thread.current_default_thread_limiter().borrowed_tokens
+            ))
+            return verify(plain_password, hashed_password)
+
+        monkeypatch.setattr(jwt_module, "verify_password", measured_verify)
+
+        # Act
+        response = client.post(
+            "/api/v1/auth/login", data={"username": test_user.email, "password": "testpassword"}
+        )
+
+        # Assert
+        assert response.status_code == 200
+        assert borrowed and borrowed[0] >= 1
+
+    def test_login_does_not_block_event_loop(self, client, test_user, monkeypatch):
+        """Test para que el hashing y el registro del intento se ejecuten fuera del event loop"""
+        import asyncio
+        from app.adapters.controllers.auth_controller import login_events
+        
+        # Arrange
+        loops = []
+        
+        def record(*args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+        
+        monkeypatch.setattr(login_events, "record", record)
+        
+        # Act
+        response = client.post("/api/v1/auth/login", data={"username": test_user.email, "password": "testpassword"})
+        
+        # Assert
+        assert response.status_code == 200
+        assert loops == [None]
@@ -0,0 +1,89 @@
+import uuid
+from typing import Any, Callable, Dict, NamedTuple
+import pytest
+from app.infrastructure.auth.jwt import create_access_token
+
+# Cuerpo de la petición a partir del usuario de test y su token
+RequestBody = Callable[[Any, str], Dict[str, Any]]
+
+
+class EndpointBudget(NamedTuple):
+    method: str
+    path: str
+    queries: int
+    peak_kib: int = 128
+    body: RequestBody = lambda user, token: {}
+
+
+# Máximo de sentencias SQL y de memoria asignada por petición, con la autenticación
+# incluida. Subir un presupuesto debe ser una decisión explícita en la revisión
+ENDPOINT_BUDGETS = [
+    EndpointBudget("GET", "/api/v1/users/{user_id}", queries=2),
+    EndpointBudget("GET", "/api/v1/users/me/", queries=1),
+    EndpointBudget("GET", "/api/v1/users/?limit=10", queries=2),
+    EndpointBudget("GET", "/api/v1/users/?limit=10&include_total=true", queries=3),
+    EndpointBudget("GET", "/api/v1/users/?limit=10&fields=id,email,created_at", queries=2),
+    EndpointBudget("GET", "/api/v1/users/search?q=test", queries=2),
+    EndpointBudget("PATCH", "/api/v1/users/{user_id}", queries=2, body=lambda user, token: {"json": {"is_active": True}}),
+    EndpointBudget("POST", "/api/v1/users/bulk/deactivate", queries=2, body=lambda user, token: {"json": {"ids": [0]}}),
+    EndpointBudget(
+        "POST", "/api/v1/auth/login", queries=1,
+        body=lambda user, token: {"data": {"username": user.email, "password": "testpassword"}},
+    ),
+    EndpointBudget(
+        "POST", "/api/v1/auth/introspect", queries=1,
+        body=lambda user, token: {
+            "json": {"tokens": [token]},
+            "headers": {"Authorization": f"Bearer {create_access_token({'sub': 'gateway', 'scope': 'introspect'})}"},
+        },
+    ),
+]
+
+
+@pytest.mark.integration
+class TestRequestBudgets:
+    """Presupuestos de consultas y memoria por endpoint"""
+
+    @pytest.mark.parametrize("budget", ENDPOINT_BUDGETS, ids=lambda budget: f"{budget.method} {budget.path}")
+    def test_endpoint_within_budget(self, request_budget, test_user, auth_headers, admin_client, budget):
+        """La petición no supera las sentencias ni la memoria de su presupuesto"""
+        # Arrange
+        token = auth_headers["Authorization"].split()[1]
+        url = budget.path.format(user_id=test_user.id)
+        kwargs = budget.body(test_user, token)
+        headers = {**auth_headers, **kwargs.pop("headers", {})}
+
+        # Act
+        cost = request_budget(budget.method, url, headers=headers, **kwargs)
+
+        # Assert
+        assert cost.response.status_code == 200, cost.response.text
+        assert cost.queries <= budget.queries, cost.describe()
+        assert cost.peak_bytes <= budget.peak_kib * 1024, cost.describe()
+
+    def test_create_user_within_budget(self, request_budget):
+        """Crear un usuario es un único INSERT"""
+        # Arrange
+        request_budget("POST", "/api/v1/users/", warm=False, json={"email": f"budget{uuid.uuid4()}@example.com", "password": "password"})
+
+        # Act
+        cost = request_budget("POST", "/api/v1/users/", warm=False, json={"email": f"budget{uuid.uuid4()}@example.com", "password": "password"})
+
+        # Assert
+        assert cost.response.status_code == 200, cost.response.text
+        assert cost.queries <= 1, cost.describe()
+        assert cost.peak_bytes <= 128 * 1024, cost.describe()
+
+    def test_delete_user_within_budget(self, request_budget, client, auth_headers, admin_client):
+        """Eliminar un usuario cuesta la autenticación y un DELETE"""
+        # Arrange
+        created = client.post("/api/v1/users/", json={"email": f"budget{uuid.uuid4()}@example.com", "password": "password"})
+        user_id = created.json()["data"]["id"]
+
+        # Act
+        cost = request_budget("DELETE", f"/api/v1/users/{user_id}", warm=False, headers=auth_headers)
+
+        # Assert
+        assert cost.response.status_code == 204, cost.response.text
+        assert cost.queries <= 2, cost.describe()
+        assert cost.peak_bytes <= 128 * 1024, cost.describe()
@@ -59,6 +59,68 @@ class TestUserRoutes:
         assert data["id"] == test_user.id
         assert data["email"] == test_user.email
     
+    def test_list_users(self, authenticated_client, test_user):
+        """Test para listar usuarios con paginación"""
+        # Act
+        response = authenticated_client.get("/api/v1/users/", params={"skip": 0, "limit": 1000})
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert {"id": test_user.id, "email": test_user.email, "is_active": True} in data
+        assert all(set(user) == {"id", "email", "is_active"} for user in data)
+    
+    def test_list_users_with_total(self, authenticated_client, test_user):
+        """Test para listar usuarios incluyendo el total y si es exacto"""
+        # Act
+        response = authenticated_client.get("/api/v1/users/", params={"limit": 1, "include_total": True})
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert len(data["items"]) == 1
+        assert data["total"] >= 1
+        assert data["total_is_exact"] is True
+    
+    def test_search_users(self, authenticated_client, test_user):
+        """Test para buscar usuarios por prefijo del email"""
+        # Act
+        response = authenticated_client.get("/api/v1/users/search", params={"q": test_user.email[:4]})
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["mode"] == "prefix"
+        assert test_user.email in [user["email"] for user in data["items"]]
+        
+        # Verificar que el modo inválido se rechaza
+        response = authenticated_client.get("/api/v1/users/search", params={"q": "x", "mode": "regex"})
+        assert response.status_code == 422
+    
+    def test_sparse_fieldsets(self, authenticated_client, test_user):
+        """Test para pedir solo algunos campos en las lecturas de usuarios"""
+        # Act
+        by_id = authenticated_client.get(f"/api/v1/users/{test_user.id}", params={"fields": "email,created_at"})
+        listed = authenticated_client.get("/api/v1/users/", params={"fields": "id", "limit": 2})
+        me = authenticated_client.get("/api/v1/users/me/", params={"fields": "email"})
+        me_extended = authenticated_client.get("/api/v1/users/me/", params={"fields": "id,last_login_at"})
+        searched = authenticated_client.get(
+            "/api/v1/users/search", params={"q": test_user.email[:6], "fields": "is_active", "limit": 1}
+        )
+        unknown = authenticated_client.get("/api/v1/users/", params={"fields": "id,hashed_password"})
+        
+        # Assert
+        data = by_id.json()["data"]
+        assert list(data) == ["email", "created_at"]
+        assert data["email"] == test_user.email
+        assert data["created_at"] is not None
+        assert all(list(user) == ["id"] for user in listed.json()["data"])
+        assert me.json()["data"] == {"email": test_user.email}
+        assert me_extended.json()["data"] == {"id": test_user.id, "last_login_at": None}
+        assert searched.json()["data"]["items"] == [{"is_active": True}]
+        assert searched.json()["data"]["next_after"] == test_user.email
+        assert unknown.status_code == 400
+    
     def test_get_current_user(self, authenticated_client, test_user):
         """Test para obtener el usuario actual autenticado"""
         # Act
@@ -71,6 +133,159 @@ class TestUserRoutes:
         assert data["id"] == test_user.id
         assert data["email"] == test_user.email
     
+    def test_current_user_cache_is_invalidated_by_change_feed(self, authenticated_client, test_user, test_db):
+        """Test para que un usuario desactivado deje de autenticarse cuando llega su cambio"""
+        from app.infrastructure.auth.jwt import principal_cache
+        from app.infrastructure.datasources.change_feed import UserChangeEvent
+        
+        # Arrange
+        assert authenticated_client.get("/api/v1/users/me/").status_code == 200
+        test_user.is_active = False
+        test_db.commit()
+        
+        # Act
+        principal_cache.invalidate([UserChangeEvent(test_user.id, test_user.email)])
+        response = authenticated_client.get("/api/v1/users/me/")
+        
+        # Assert
+        assert response.status_code == 400
+    
+    def test_patch_user(self, admin_client, test_db):
+        """Un administrador puede actualizar parcialmente otro usuario"""
+        # Arrange
+        other = admin_client.post(
+            "/api/v1/users/", json={"email": f"patch{uuid.uuid4()}@example.com", "password": "pwd"}
+        ).json()["data"]
+        
+        # Act
+        response = admin_client.patch(f"/api/v1/users/{other['id']}", json={"is_active": False})
+        
+        # Assert
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["id"] == other["id"]
+        assert data["is_active"] is False
+        
+        # Limpiar
+        admin_client.delete(f"/api/v1/users/{other['id']}")
+    
+    def test_patch_user_duplicate_email(self, admin_client, test_user):
+        """Test para actualizar un usuario con un email ya registrado"""
+        # Arrange
+        other = admin_client.post(
+            "/api/v1/users/", json={"email": f"patch{uuid.uuid4()}@example.com", "password": "pwd"}
+        ).json()["data"]
+        
+        # Act
+        response = admin_client.patch(f"/api/v1/users/{other['id']}", json={"email": test_user.email})
+        
+        # Assert
+        assert response.status_code == 400
+        assert response.json()["error"]["message"] == "Email already registered"
+        
+        # Limpiar
+        admin_client.delete(f"/api/v1/users/{other['id']}")
+    
+    def test_delete_user(self, admin_client):
+        """Un administrador puede eliminar otro usuario"""
+        # Arrange
+        other = admin_client.post(
+            "/api/v1/users/", json={"email": f"delete{uuid.uuid4()}@example.com", "password": "pwd"}
+        ).json()["data"]
+        
+        # Act
+        response = admin_client.delete(f"/api/v1/users/{other['id']}")
+        
+        # Assert
+        assert response.status_code == 204
+        assert admin_client.get(f"/api/v1/users/{other['id']}").status_code == 404
+        assert admin_client.delete(f"/api/v1/users/{other['id']}").status_code == 404
+    
+    def test_bulk_deactivate_and_delete(self, admin_client):
+        """Test para desactivar y eliminar usuarios en bloque"""
+        # Arrange
+        ids = [
+            admin_client.post(
+                "/api/v1/users/", json={"email": f"bulk{uuid.uuid4()}@example.com", "password": "pwd"}
+            ).json()["data"]["id"]
+            for _ in range(2)
+        ]
+        
+        # Act
+        deactivated = admin_client.post("/api/v1/users/bulk/deactivate", json={"ids": ids})
+        deleted = admin_client.post("/api/v1/users/bulk/delete", json={"ids": ids})
+        
+        # Assert
+        assert sorted(deactivated.json()["data"]["ids"]) == sorted(ids)
+        assert sorted(deleted.json()["data"]["ids"]) == sorted(ids)
+    
+    def test_patch_own_user(self, authenticated_client, test_user):
+        """Un usuario puede actualizar su propia cuenta"""
+        # Act
+        response = authenticated_client.patch(f"/api/v1/users/{test_user.id}", json={"is_active": True})
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["data"]["id"] == test_user.id
+
+    def test_patch_other_user_is_forbidden(self, authenticated_client):
+        """Un usuario no puede modificar la cuenta de otro"""
+        # Arrange
+        other = authenticated_client.post(
+            "/api/v1/users/", json={"email": f"other{uuid.uuid4()}@example.com", "password": "pwd"}
+        ).json()["data"]
+
+        # Act
+        response = authenticated_client.patch(f"/api/v1/users/{other['id']}", json={"is_active": False})
+
+        # Assert
+        assert response.status_code == 403
+        assert authenticated_client.get(f"/api/v1/users/{other['id']}").json()["data"]["is_active"] is True
+
+    def test_delete_other_user_is_forbidden(self, authenticated_client):
+        """Un usuario no puede eliminar la cuenta de otro"""
+        # Arrange
+        other = authenticated_client.post(
+            "/api/v1/users/", json={"email": f"other{uuid.uuid4()}@example.com", "password": "pwd"}
+        ).json()["data"]
+
+        # Act
+        response = authenticated_client.delete(f"/api/v1/users/{other['id']}")
+
+        # Assert
+        assert response.status_code == 403
+        assert authenticated_client.get(f"/api/v1/users/{other['id']}").status_code == 200
+
+    def test_bulk_operations_require_admin(self, authenticated_client):
+        """Las operaciones en bloque solo están permitidas a administradores"""
+        # Arrange
+        other = authenticated_client.post(
+            "/api/v1/users/", json={"email": f"other{uuid.uuid4()}@example.com", "password": "pwd"}
+        ).json()["data"]
+
+        # Act
+        deactivated = authenticated_client.post("/api/v1/users/bulk/deactivate", json={"ids": [other["id"]]})
+        deleted = authenticated_client.post("/api/v1/users/bulk/delete", json={"ids": [other["id"]]})
+
+        # Assert
+        assert deactivated.status_code == 403
+        assert deleted.status_code == 403
+        assert authenticated_client.get(f"/api/v1/users/{other['id']}").status_code == 200
+    
+    def test_email_case_variant_gets_no_admin_rights(self, admin_client, test_user):
+        """Una variante en mayúsculas del email de un administrador no se puede registrar ni da sus permisos"""
+        # Arrange
+        variant = test_user.email.replace("test", "Test", 1)
+
+        # Act
+        signup = admin_client.post("/api/v1/users/", json={"email": variant, "password": "pwd"})
+        login = admin_client.post("/api/v1/auth/login", data={"username": variant, "password": "pwd"})
+
+        # Assert
+        assert signup.json()["error"]["message"] == "Email already registered"
+        assert login.status_code == 401
+        assert admin_client.get(f"/api/v1/users/{test_user.id}").status_code == 200
+
     # def test_update_user(self, authenticated_client, test_user):
     #     """Test para actualizar un usuario"""
     #     # Arrange
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import create_engine, text
+from app.infrastructure.auth.jwt import verify_password
+from benchmarks.dataset import run
+
+
+def _dump(url):
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT id, email, hashed_password, is_active, created_at FROM users ORDER BY id")).all()
+    engine.dispose()
+    return rows
+
+
+@pytest.mark.integration
+class TestDatasetGenerator:
+    """Tests del generador de datos sintéticos"""
+
+    def test_same_seed_produces_same_table(self, tmp_path):
+        """Con la misma semilla se genera exactamente la misma tabla"""
+        # Arrange
+        urls = [f"sqlite:///{tmp_path / f'dataset{i}.db'}" for i in range(2)]
+        options = dict(count=500, seed=7, login_users=3, hash_pool_size=4, rounds=4, batch_size=128, truncate=True)
+
+        # Act
+        report = run(urls[0], workers=1, **options)
+        run(urls[1], workers=2, **options)
+
+        # Assert
+        first, second = _dump(urls[0]), _dump(urls[1])
+        assert report["rows"] == 500
+        assert first == second
+        assert len({row.email for row in first}) == 500
+
+    def test_login_users_have_known_passwords(self, tmp_path):
+        """Los usuarios de login pueden autenticarse con 'password-<i>'"""
+        # Arrange
+        url = f"sqlite:///{tmp_path / 'dataset.db'}"
+
+        # Act
+        run(url, count=10, seed=1, login_users=2, hash_pool_size=2, rounds=4, workers=1, batch_size=5, truncate=False)
+
+        # Assert
+        rows = _dump(url)
+        assert rows[1].email == "user1@example.com"
+        assert verify_password("password-1", rows[1].hashed_password)
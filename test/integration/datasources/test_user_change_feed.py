@@ -0,0 +1,164 @@
+import time
+from unittest.mock import Mock
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine, delete, update
+from sqlalchemy.orm import Session
+from app.domain.entities import Base, User, UserChange
+from app.infrastructure.datasources.change_feed import UserChangeEvent, UserChangeFeed
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'feed.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _create_users(engine, *emails):
+    with Session(engine) as session:
+        users = [User(email=email, hashed_password="hashed") for email in emails]
+        session.add_all(users)
+        session.commit()
+        return [user.id for user in users]
+
+
+@pytest.mark.integration
+class TestUserChangeFeed:
+    """Tests de integración del feed de cambios de usuarios sobre SQLite"""
+
+    def test_triggers_record_auth_relevant_changes(self, engine):
+        """Solo los cambios de email, contraseña, estado o borrados generan eventos"""
+        # Arrange
+        user_id, other_id = _create_users(engine, "feed1@example.com", "feed2@example.com")
+        feed = UserChangeFeed(engine)
+        received = []
+        feed.subscribe(received.append)
+
+        # Act
+        with engine.begin() as conn:
+            conn.execute(update(User).where(User.id == user_id).values(updated_at=None))
+            conn.execute(update(User).where(User.id == user_id).values(is_active=False))
+            conn.execute(delete(User).where(User.id == other_id))
+        with engine.connect() as conn:
+            read = feed.poll(conn)
+
+        # Assert
+        assert read == 2
+        assert received == [[UserChangeEvent(user_id, "feed1@example.com"), UserChangeEvent(other_id, "feed2@example.com")]]
+
+    def test_background_subscriber_sees_changes_within_poll_interval(self, engine):
+        """Un cambio hecho desde otra conexión llega al suscriptor en segundo plano"""
+        # Arrange
+        (user_id,) = _create_users(engine, "feed3@example.com")
+        feed = UserChangeFeed(engine, poll_interval=0.05, map_user_id=lambda local_id: local_id + 1000)
+        received = []
+        feed.subscribe(received.append)
+        feed.start()
+        time.sleep(0.2)
+
+        # Act
+        try:
+            with engine.begin() as conn:
+                conn.execute(update(User).where(User.id == user_id).values(email="feed3b@example.com"))
+            deadline = time.monotonic() + 5
+            while not received and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            feed.stop()
+
+        # Assert
+        assert received == [[UserChangeEvent(user_id + 1000, "feed3@example.com")]]
+
+    def test_old_changes_are_pruned(self, engine):
+        """Las filas más antiguas que la retención se eliminan"""
+        # Arrange
+        old_id, recent_id = _create_users(engine, "feed4@example.com", "feed5@example.com")
+        with engine.begin() as conn:
+            conn.execute(delete(User).where(User.id == old_id))
+            conn.execute(update(UserChange).values(changed_at=datetime(2000, 1, 1)))
+            conn.execute(delete(User).where(User.id == recent_id))
+        feed = UserChangeFeed(engine, retention_seconds=60)
+
+        # Act
+        with engine.connect() as conn:
+            feed.poll(conn)
+            conn.commit()
+            remaining = conn.execute(UserChange.__table__.select()).all()
+
+        # Assert
+        assert [row.user_id for row in remaining] == [recent_id]
+
+    def test_changes_after_pruning_every_row_are_delivered(self, engine):
+        """Tras podar la tabla entera los ids nuevos siguen por delante del cursor"""
+        # Arrange
+        first_id, second_id = _create_users(engine, "feed6@example.com", "feed7@example.com")
+        feed = UserChangeFeed(engine, retention_seconds=60)
+        received = []
+        feed.subscribe(received.append)
+        with engine.begin() as conn:
+            conn.execute(delete(User).where(User.id == first_id))
+            conn.execute(update(UserChange).values(changed_at=datetime(2000, 1, 1)))
+        with engine.connect() as conn:
+            feed.poll(conn)
+            conn.commit()
+            assert conn.execute(UserChange.__table__.select()).all() == []
+
+        # Act
+        with engine.begin() as conn:
+            conn.execute(delete(User).where(User.id == second_id))
+        with engine.connect() as conn:
+            read = feed.poll(conn)
+
+        # Assert
+        assert read == 1
+        assert received == [
+            [UserChangeEvent(first_id, "feed6@example.com")],
+            [UserChangeEvent(second_id, "feed7@example.com")],
+        ]
+
+    def test_ids_committed_out_of_order_are_not_skipped(self, engine):
+        """Un id menor confirmado después de leer uno mayor se publica en el siguiente ciclo"""
+        # Arrange
+        feed = UserChangeFeed(engine)
+        received = []
+        feed.subscribe(received.append)
+        changes = UserChange.__table__
+        with engine.begin() as conn:
+            conn.execute(changes.insert().values(id=1, user_id=10, email="gap1@example.com"))
+            conn.execute(changes.insert().values(id=3, user_id=30, email="gap3@example.com"))
+        with engine.connect() as conn:
+            feed.poll(conn)
+
+        # Act
+        with engine.begin() as conn:
+            conn.execute(changes.insert().values(id=2, user_id=20, email="gap2@example.com"))
+        with engine.connect() as conn:
+            read = feed.poll(conn)
+
+        # Assert
+        assert read == 1
+        assert received == [
+            [UserChangeEvent(10, "gap1@example.com"), UserChangeEvent(30, "gap3@example.com")],
+            [UserChangeEvent(20, "gap2@example.com")],
+        ]
+
+    def test_unfilled_gap_clears_cache_after_timeout(self, engine):
+        """Si un id saltado no aparece a tiempo se avisa con None"""
+        # Arrange
+        clock = Mock(return_value=0.0)
+        feed = UserChangeFeed(engine, gap_timeout=5, clock=clock)
+        received = []
+        feed.subscribe(received.append)
+        with engine.begin() as conn:
+            conn.execute(UserChange.__table__.insert().values(id=2, user_id=20, email="gap@example.com"))
+        with engine.connect() as conn:
+            feed.poll(conn)
+
+            # Act
+            clock.return_value = 6.0
+            feed.poll(conn)
+
+        # Assert
+        assert received == [[UserChangeEvent(20, "gap@example.com")], None]
@@ -0,0 +1,107 @@
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from migrations import helpers
+from migrations.helpers import batched_backfill, create_index_concurrently, drop_index_concurrently
+
+users = sa.table("users", sa.column("id", sa.Integer), sa.column("email", sa.String), sa.column("email_domain", sa.String))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    with engine.begin() as conn:
+        conn.execute(sa.text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR, email_domain VARCHAR)"))
+        conn.execute(
+            sa.text("INSERT INTO users (id, email) VALUES (:id, :email)"),
+            [{"id": i, "email": f"user{i}@example{i % 3}.com"} for i in range(1, 1001)],
+        )
+    yield engine
+    engine.dispose()
+
+
+def _run(engine, fn):
+    """Ejecuta fn dentro de una migración, como lo haría env.py"""
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn)
+        with Operations.context(context), context.begin_transaction():
+            result = fn()
+        conn.commit()
+    return result
+
+
+def _domain_backfill(**kw):
+    kw.setdefault("pause_seconds", 0)
+    return batched_backfill(
+        "users_email_domain",
+        users,
+        {"email_domain": sa.func.substr(users.c.email, sa.func.instr(users.c.email, "@") + 1)},
+        where=users.c.email_domain.is_(None),
+        **kw,
+    )
+
+
+@pytest.mark.integration
+class TestOnlineMigrationHelpers:
+    """Tests de los helpers de migraciones online sobre SQLite"""
+
+    def test_batched_backfill_updates_all_rows(self, engine):
+        """El backfill recorre la tabla por lotes y no deja progreso pendiente"""
+        # Act
+        updated = _run(engine, lambda: _domain_backfill(batch_size=128))
+
+        # Assert
+        with engine.connect() as conn:
+            pending = conn.execute(sa.text("SELECT count(*) FROM users WHERE email_domain IS NULL")).scalar()
+            domain = conn.execute(sa.text("SELECT email_domain FROM users WHERE id = 4")).scalar()
+            progress = conn.execute(sa.text("SELECT count(*) FROM migration_progress")).scalar()
+        assert updated == 1000
+        assert pending == 0
+        assert domain == "example1.com"
+        assert progress == 0
+
+    def test_batched_backfill_resumes_after_interruption(self, engine, monkeypatch):
+        """Si el backfill se interrumpe, la siguiente ejecución continúa desde el último lote"""
+        # Arrange
+        def _interrupt(seconds):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(helpers.time, "sleep", _interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            _run(engine, lambda: _domain_backfill(batch_size=300, pause_seconds=0.01))
+        with engine.connect() as conn:
+            last_key = conn.execute(sa.text("SELECT last_key FROM migration_progress")).scalar()
+            done = conn.execute(sa.text("SELECT count(*) FROM users WHERE email_domain IS NOT NULL")).scalar()
+        monkeypatch.undo()
+
+        # Act
+        updated = _run(engine, lambda: _domain_backfill(batch_size=300))
+
+        # Assert
+        assert last_key == 300
+        assert done == 300
+        assert updated == 700
+
+    def test_batched_backfill_on_empty_table(self, engine):
+        """Sobre una tabla vacía no hay nada que rellenar"""
+        # Arrange
+        with engine.begin() as conn:
+            conn.execute(sa.text("DELETE FROM users"))
+
+        # Act
+        updated = _run(engine, lambda: _domain_backfill())
+
+        # Assert
+        assert updated == 0
+
+    def test_index_helpers_fall_back_outside_postgresql(self, engine):
+        """Fuera de PostgreSQL los índices se crean y eliminan con las operaciones normales"""
+        # Act
+        _run(engine, lambda: create_index_concurrently("ix_users_email_domain", "users", ["email_domain"]))
+        created = {index["name"] for index in sa.inspect(engine).get_indexes("users")}
+        _run(engine, lambda: drop_index_concurrently("ix_users_email_domain", "users"))
+
+        # Assert
+        assert "ix_users_email_domain" in created
+        assert sa.inspect(engine).get_indexes("users") == []
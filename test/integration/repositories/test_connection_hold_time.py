@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.domain.entities import Base, User
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.telemetry.database_metrics import connection_hold_time, instrument_connection_hold_time
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'hold.db'}")
+    Base.metadata.create_all(bind=engine)
+    instrument_connection_hold_time(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session(engine):
+    session = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    yield session
+    session.close()
+
+
+@pytest.mark.integration
+class TestConnectionHoldTime:
+    """Tests del ciclo de vida de la conexión en las lecturas del repositorio"""
+
+    def test_reads_return_connection_to_pool(self, engine, session):
+        """Tras una lectura la sesión sigue abierta pero la conexión ya está en el pool"""
+        # Arrange
+        repository = UserRepository(session)
+        created = repository.create_if_absent("hold@example.com", "hashed")
+
+        # Act
+        user = repository.get_by_id(created.id)
+        principal = repository.get_auth_principal("hold@example.com")
+        summaries = repository.list_summaries(0, 10)
+
+        # Assert
+        assert engine.pool.checkedout() == 0
+        assert user.email == "hold@example.com"
+        assert principal.hashed_password == "hashed"
+        assert [row.id for row in summaries] == [created.id]
+
+    def test_connection_is_checked_out_lazily(self, engine, session):
+        """Crear la sesión no toma ninguna conexión hasta la primera consulta"""
+        # Act
+        UserRepository(session)
+
+        # Assert
+        assert engine.pool.checkedout() == 0
+        assert session.get_bind() is engine
+
+    def test_hold_time_is_measured(self, engine, session):
+        """Cada checkout del pool queda registrado en el histograma"""
+        # Arrange
+        count_before = connection_hold_time.count
+        sum_before = connection_hold_time.sum
+
+        # Act
+        UserRepository(session).get_summary_by_email("missing@example.com")
+
+        # Assert
+        assert connection_hold_time.count == count_before + 1
+        assert connection_hold_time.sum > sum_before
@@ -0,0 +1,227 @@
+import pytest
+from sqlalchemy import create_engine, func, select
+from app.application.usecases.user_usecase import UserCreate, UserUpdate, UserUseCase
+from app.domain.entities import Base, User
+from app.domain.exceptions import EmailAlreadyRegisteredError
+from app.infrastructure.datasources.deadlines import DeadlineExceededError, deadline, install_statement_timeouts
+from app.infrastructure.datasources.sharding import MAX_SHARDS, ShardSet
+from app.infrastructure.repositories.sharded_user_repository import ShardedUserRepository
+
+
+@pytest.fixture
+def shards(tmp_path):
+    engines = [create_engine(f"sqlite:///{tmp_path / f'shard{i}.db'}") for i in range(3)]
+    for engine in engines:
+        Base.metadata.create_all(bind=engine)
+    shard_set = ShardSet(engines)
+    yield shard_set
+    shard_set.dispose()
+
+
+@pytest.fixture
+def repository(shards):
+    return ShardedUserRepository(shards)
+
+
+def _emails_by_shard(shards, count=30):
+    """Emails agrupados por el shard al que los asigna el hash"""
+    grouped = {shard: [] for shard in range(len(shards))}
+    for i in range(count):
+        email = f"user{i}@example.com"
+        grouped[shards.shard_for_email(email)].append(email)
+    return grouped
+
+
+def _count(shards, shard):
+    with shards.session(shard) as session:
+        return session.execute(select(func.count()).select_from(User)).scalar()
+
+
+@pytest.mark.integration
+class TestShardedUserRepository:
+    """Tests de integración del repositorio de usuarios con varias bases SQLite"""
+
+    def test_routing_is_stable_and_normalized(self, shards):
+        """El shard depende solo del email normalizado"""
+        # Act
+        shard = shards.shard_for_email("Someone@Example.com ")
+
+        # Assert
+        assert shard == shards.shard_for_email("someone@example.com")
+        assert shard == ShardSet(shards.engines).shard_for_email("someone@example.com")
+        assert all(_emails_by_shard(shards).values())
+
+    def test_create_and_lookup_route_to_one_shard(self, shards, repository):
+        """El usuario se guarda en el shard de su email y el id lo codifica"""
+        # Arrange
+        email = "routed@example.com"
+        shard = shards.shard_for_email(email)
+
+        # Act
+        created = repository.create_if_absent(email, "hashed")
+
+        # Assert
+        assert created.id % MAX_SHARDS == shard
+        assert repository.get_summary_by_id(created.id).email == email
+        assert repository.get_summary_by_email(email).id == created.id
+        assert repository.get_auth_principal(email).hashed_password == "hashed"
+        assert repository.get_by_id(created.id).id == created.id
+        assert repository.get_by_email(email).id == created.id
+        assert [_count(shards, s) for s in range(3)] == [1 if s == shard else 0 for s in range(3)]
+
+    def test_duplicate_email_returns_none(self, repository):
+        """Un email repetido no crea un segundo usuario"""
+        # Arrange
+        repository.create_if_absent("dup@example.com", "hashed")
+
+        # Act
+        duplicate = repository.create_if_absent("dup@example.com", "other")
+
+        # Assert
+        assert duplicate is None
+
+    def test_unknown_ids_return_none(self, repository):
+        """Ids de shards inexistentes o sin usuario no se encuentran"""
+        # Act & Assert
+        assert repository.get_summary_by_id(MAX_SHARDS + 7) is None
+        assert repository.get_by_id(5 * MAX_SHARDS) is None
+        assert repository.update_fields(0, {"is_active": False}) is None
+        assert repository.delete(MAX_SHARDS + 999) is False
+
+    def test_list_fans_out_and_paginates_by_global_id(self, shards, repository):
+        """El listado mezcla todos los shards ordenado por id global"""
+        # Arrange
+        created = [repository.create_if_absent(f"user{i}@example.com", "hashed") for i in range(30)]
+        expected = sorted(user.id for user in created)
+
+        # Act
+        pages = [repository.list_summaries(skip, 7) for skip in range(0, 30, 7)]
+        users = repository.list(5, 10)
+
+        # Assert
+        assert [row.id for page in pages for row in page] == expected
+        assert [user.id for user in users] == expected[5:15]
+
+    def test_deadline_reaches_fan_out_threads(self, shards, repository):
+        """El plazo fijado por quien llama se aplica también en los hilos de cada shard"""
+        # Arrange
+        for engine in shards.engines:
+            install_statement_timeouts(engine)
+        repository.create_if_absent("user0@example.com", "hashed")
+
+        # Act & Assert
+        with pytest.raises(DeadlineExceededError):
+            with deadline(0):
+                repository.list_summaries(0, 10)
+        assert len(repository.list_summaries(0, 10)) == 1
+
+    def test_bulk_operations_group_ids_by_shard(self, shards, repository):
+        """Las operaciones en bloque afectan a usuarios de varios shards"""
+        # Arrange
+        grouped = _emails_by_shard(shards)
+        ids = [repository.create_if_absent(emails[0], "hashed").id for emails in grouped.values()]
+
+        # Act
+        deactivated = repository.deactivate_many(ids + [MAX_SHARDS * 500])
+        deleted = repository.delete_many(ids[:2])
+
+        # Assert
+        assert sorted(deactivated) == sorted(ids)
+        assert sorted(deleted) == sorted(ids[:2])
+        assert repository.get_summary_by_id(ids[2]).is_active is False
+
+    def test_email_change_moves_user_to_new_shard(self, shards, repository):
+        """Un cambio de email que cambia de shard mueve al usuario y le asigna un id nuevo"""
+        # Arrange
+        grouped = _emails_by_shard(shards)
+        original = repository.create_if_absent(grouped[0][0], "hashed")
+
+        # Act
+        moved = repository.update_fields(original.id, {"email": grouped[1][0]})
+
+        # Assert
+        assert moved.id % MAX_SHARDS == 1
+        assert moved.email == grouped[1][0]
+        assert repository.get_summary_by_id(original.id) is None
+        assert repository.get_auth_principal(grouped[1][0]).hashed_password == "hashed"
+
+    def test_email_change_to_registered_email_conflicts(self, shards, repository):
+        """Mover a un email ya registrado en otro shard lanza EmailAlreadyRegisteredError"""
+        # Arrange
+        grouped = _emails_by_shard(shards)
+        original = repository.create_if_absent(grouped[0][0], "hashed")
+        repository.create_if_absent(grouped[2][0], "hashed")
+
+        # Act & Assert
+        with pytest.raises(EmailAlreadyRegisteredError):
+            repository.update_fields(original.id, {"email": grouped[2][0]})
+        assert repository.get_summary_by_id(original.id) is not None
+
+    def test_usecase_works_unchanged(self, repository):
+        """UserUseCase funciona igual sobre el repositorio con shards"""
+        # Arrange
+        usecase = UserUseCase(repository)
+
+        # Act
+        created = usecase.create_user(UserCreate(email="case@example.com", password="secret"))
+        updated = usecase.update_user(created.id, UserUpdate(is_active=False))
+        listed = usecase.list_users(0, 10)
+
+        # Assert
+        assert updated.is_active is False
+        assert [user.id for user in listed] == [created.id]
+        assert usecase.get_user_by_email("case@example.com").id == created.id
+
+    def test_search_merges_shards_by_email(self, shards, repository):
+        """La búsqueda mezcla los shards en orden de email y pagina con el último email"""
+        # Arrange
+        grouped = _emails_by_shard(shards, count=12)
+        for emails in grouped.values():
+            for email in emails:
+                repository.create_if_absent(email, "hashed")
+        expected = sorted(email for emails in grouped.values() for email in emails)
+
+        # Act
+        first_page = repository.search_summaries("user", limit=5)
+        second_page = repository.search_summaries("user", after=first_page[-1].email, limit=5)
+
+        # Assert
+        assert [row.email for row in first_page + second_page] == expected[:10]
+        assert all(repository.get_summary_by_id(row.id).email == row.email for row in first_page)
+
+    def test_summaries_by_emails_query_each_shard_once(self, shards, repository):
+        """Los emails se agrupan por shard y se devuelven con su id global"""
+        # Arrange
+        grouped = _emails_by_shard(shards, count=9)
+        emails = [email for group in grouped.values() for email in group]
+        for email in emails:
+            repository.create_if_absent(email, "hashed")
+
+        # Act
+        rows = repository.get_summaries_by_emails(emails + ["missing@example.com"])
+
+        # Assert
+        assert sorted(row.email for row in rows) == sorted(emails)
+        assert all(repository.get_summary_by_id(row.id).email == row.email for row in rows)
+
+    def test_record_logins_go_to_email_shard(self, shards, repository):
+        """Cada intento se guarda en el shard de su email con el id local del usuario"""
+        # Arrange
+        from datetime import datetime, timezone
+        from app.domain.entities import LoginEvent
+        email = "login@example.com"
+        created = repository.create_if_absent(email, "hashed")
+        shard = shards.shard_for_email(email)
+        now = datetime.now(timezone.utc)
+
+        # Act
+        repository.record_logins([
+            {"user_id": created.id, "email": email, "succeeded": True, "ip_address": None, "created_at": now},
+            {"user_id": None, "email": "nobody@example.com", "succeeded": False, "ip_address": None, "created_at": now},
+        ])
+
+        # Assert
+        with shards.session(shard) as session:
+            stored = session.execute(select(LoginEvent.user_id).where(LoginEvent.email == email)).scalars().all()
+        assert stored == [shards.split_id(created.id)[1]]
+        assert repository.get_by_id(created.id).last_login_at is not None
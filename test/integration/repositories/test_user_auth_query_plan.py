@@ -0,0 +1,91 @@
+import os
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from app.domain.entities import Base, User
+from app.infrastructure.repositories.user_repository import UserRepository
+
+
+def _capture_auth_lookup(engine, session: Session, email: str):
+    """Ejecuta UserRepository.get_auth_principal y devuelve el SQL y los parámetros emitidos"""
+    captured = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        UserRepository(session).get_auth_principal(email)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    return captured[-1]
+
+
+def _seed_users(session: Session, count: int):
+    session.execute(
+        User.__table__.insert(),
+        [
+            {"email": f"plan{i}@example.com", "hashed_password": f"hash{i}", "is_active": True}
+            for i in range(count)
+        ],
+    )
+    session.commit()
+
+
+@pytest.mark.integration
+class TestUserAuthQueryPlan:
+    """Tests del plan de ejecución de las búsquedas de autenticación"""
+
+    def test_auth_lookup_uses_covering_index_sqlite(self, tmp_path):
+        """La búsqueda por email usa el índice de cobertura y no recorre la tabla"""
+        # Arrange
+        engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            _seed_users(session, 2000)
+            session.execute(text("ANALYZE"))
+
+            sql, params = _capture_auth_lookup(engine, session, "plan42@example.com")
+
+            # Act
+            rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(row[-1] for row in rows)
+
+        # Assert
+        assert "ix_users_email_covering" in plan
+        assert "SCAN" not in plan
+        engine.dispose()
+
+    def test_ix_users_id_is_not_created(self, db_session: Session):
+        """El índice redundante sobre la clave primaria ya no existe"""
+        # Act
+        indexes = {row[1] for row in db_session.execute(text("PRAGMA index_list('users')"))}
+
+        # Assert
+        assert "ix_users_id" not in indexes
+        assert "ix_users_email_covering" in indexes
+
+    @pytest.mark.skipif(not os.getenv("TEST_POSTGRES_URL"), reason="TEST_POSTGRES_URL no configurada")
+    def test_auth_lookup_is_index_only_scan_postgres(self):
+        """En PostgreSQL la búsqueda por email es un index-only scan"""
+        # Arrange
+        engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as session:
+            _seed_users(session, 20000)
+        # VACUUM actualiza el visibility map, requisito de los index-only scans
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE users"))
+
+        with Session(engine) as session:
+            sql, params = _capture_auth_lookup(engine, session, "plan42@example.com")
+
+            # Act
+            rows = session.connection().exec_driver_sql(f"EXPLAIN {sql}", params)
+            plan = "\n".join(row[0] for row in rows)
+
+        # Assert
+        assert "Index Only Scan using ix_users_email_covering" in plan
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
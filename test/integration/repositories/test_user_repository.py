@@ -1,6 +1,9 @@
 import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.domain.entities import User
+from app.domain.entities import LoginEvent, User, UserChange
+from app.domain.exceptions import EmailAlreadyRegisteredError
 from app.infrastructure.repositories.user_repository import UserRepository
 
 
@@ -31,6 +34,48 @@ class TestUserRepository:
         db_session.delete(db_user)
         db_session.commit()
         
+    def test_create_if_absent(self, db_session: Session):
+        """Test para crear usuario con INSERT ... ON CONFLICT DO NOTHING"""
+        # Arrange
+        repository = UserRepository(db_session)
+        
+        # Act
+        created = repository.create_if_absent("if_absent@example.com", "hashed_password")
+        duplicated = repository.create_if_absent("if_absent@example.com", "other_password")
+        
+        # Assert
+        assert created is not None
+        assert created.id is not None
+        assert created.email == "if_absent@example.com"
+        assert created.is_active is True
+        assert duplicated is None
+        
+        db_user = db_session.query(User).filter_by(email="if_absent@example.com").one()
+        assert db_user.hashed_password == "hashed_password"
+        
+        # Limpiar
+        db_session.delete(db_user)
+        db_session.commit()
+        
+    def test_create_if_absent_fallback(self, db_session: Session, monkeypatch):
+        """Test para crear usuario en backends sin RETURNING"""
+        # Arrange
+        repository = UserRepository(db_session)
+        monkeypatch.setattr(db_session.get_bind().dialect, "insert_returning", False)
+        
+        # Act
+        created = repository.create_if_absent("fallback@example.com", "hashed_password")
+        duplicated = repository.create_if_absent("fallback@example.com", "other_password")
+        
+        # Assert
+        assert created is not None
+        assert created.email == "fallback@example.com"
+        assert duplicated is None
+        
+        # Limpiar
+        db_session.delete(created)
+        db_session.commit()
+        
     def test_get_by_id(self, db_session: Session):
         """Test para obtener usuario por ID"""
         # Arrange
@@ -98,6 +143,69 @@ class TestUserRepository:
         db_session.delete(user)
         db_session.commit()
         
+    def test_update_fields(self, db_session: Session):
+        """Test para actualizar usuario con un único UPDATE ... RETURNING"""
+        # Arrange
+        repository = UserRepository(db_session)
+        user = User(email="before_fields@example.com", hashed_password="original_password")
+        db_session.add(user)
+        db_session.commit()
+        
+        # Act
+        updated = repository.update_fields(user.id, {"email": "after_fields@example.com", "is_active": False})
+        
+        # Assert
+        assert updated.id == user.id
+        assert updated.email == "after_fields@example.com"
+        assert updated.is_active is False
+        assert repository.update_fields(999999, {"is_active": False}) is None
+        
+        # Limpiar
+        db_session.delete(user)
+        db_session.commit()
+        
+    def test_update_fields_email_conflict(self, db_session: Session):
+        """Test para actualizar usuario con un email que ya está en uso"""
+        # Arrange
+        repository = UserRepository(db_session)
+        first = User(email="taken@example.com", hashed_password="pwd1")
+        second = User(email="free@example.com", hashed_password="pwd2")
+        db_session.add_all([first, second])
+        db_session.commit()
+        
+        # Act / Assert
+        with pytest.raises(EmailAlreadyRegisteredError):
+            repository.update_fields(second.id, {"email": "taken@example.com"})
+        
+        # Limpiar
+        db_session.delete(first)
+        db_session.delete(second)
+        db_session.commit()
+        
+    def test_deactivate_and_delete_many(self, db_session: Session):
+        """Test para desactivar y eliminar usuarios en bloque"""
+        # Arrange
+        repository = UserRepository(db_session)
+        users = [User(email=f"bulk{i}@example.com", hashed_password="pwd") for i in range(3)]
+        db_session.add_all(users)
+        db_session.commit()
+        user_ids = [user.id for user in users]
+        
+        # Act
+        deactivated = repository.deactivate_many(user_ids + [999999])
+        deleted = repository.delete_many(user_ids[:2])
+        
+        # Assert
+        assert sorted(deactivated) == sorted(user_ids)
+        assert sorted(deleted) == sorted(user_ids[:2])
+        remaining = db_session.query(User).filter(User.id.in_(user_ids)).all()
+        assert [user.id for user in remaining] == [user_ids[2]]
+        assert remaining[0].is_active is False
+        
+        # Limpiar
+        db_session.delete(remaining[0])
+        db_session.commit()
+        
     def test_delete_user(self, db_session: Session):
         """Test para eliminar usuario"""
         # Arrange
@@ -152,4 +260,173 @@ class TestUserRepository:
         # Limpiar
         for user in users:
             db_session.delete(user)
-        db_session.commit()
\ No newline at end of file
+        db_session.commit()        
+    def test_search_summaries(self, db_session: Session):
+        """Test para buscar usuarios por prefijo y subcadena con paginación keyset"""
+        # Arrange
+        repository = UserRepository(db_session)
+        users = [
+            User(email=email, hashed_password="pwd")
+            for email in ("srch_a@example.com", "srch_b@example.com", "srch_c@example.com", "other_srch%@example.com")
+        ]
+        db_session.add_all(users)
+        db_session.commit()
+        
+        # Act
+        first_page = repository.search_summaries("srch_", limit=2)
+        second_page = repository.search_summaries("srch_", after=first_page[-1].email, limit=2)
+        substring = repository.search_summaries("SRCH%", substring=True)
+        no_match = repository.search_summaries("srch_z")
+        
+        # Assert
+        assert [row.email for row in first_page] == ["srch_a@example.com", "srch_b@example.com"]
+        assert [row.email for row in second_page] == ["srch_c@example.com"]
+        assert [row.email for row in substring] == ["other_srch%@example.com"]
+        assert no_match == []
+        
+        # Limpiar
+        for user in users:
+            db_session.delete(user)
+        db_session.commit()
+
+
+    def test_search_modes_agree_on_case(self, db_session: Session):
+        """El mismo término con mayúsculas encuentra lo mismo por prefijo y por subcadena"""
+        # Arrange
+        repository = UserRepository(db_session)
+        users = [User(email=email, hashed_password="pwd") for email in ("CaseSrch@example.com", "casesrch2@example.com")]
+        db_session.add_all(users)
+        db_session.commit()
+
+        # Act
+        prefix = repository.search_summaries("caseSRCH")
+        substring = repository.search_summaries("caseSRCH", substring=True)
+        second_page = repository.search_summaries("CASESRCH", after=prefix[0].email, limit=1)
+
+        # Assert
+        assert [row.email for row in prefix] == ["casesrch2@example.com", "CaseSrch@example.com"]
+        assert [row.email for row in substring] == [row.email for row in prefix]
+        assert [row.email for row in second_page] == ["CaseSrch@example.com"]
+
+        # Limpiar
+        for user in users:
+            db_session.delete(user)
+        db_session.commit()
+
+    def test_create_if_absent_rejects_case_variant(self, db_session: Session):
+        """Un email que solo difiere en mayúsculas cuenta como ya registrado"""
+        # Arrange
+        repository = UserRepository(db_session)
+        created = repository.create_if_absent("variant@example.com", "pwd")
+
+        # Act
+        duplicate = repository.create_if_absent("Variant@example.com", "other")
+
+        # Assert
+        assert duplicate is None
+        db_session.query(User).filter(User.id == created.id).delete()
+        db_session.commit()
+
+    def test_get_summaries_by_emails(self, db_session: Session):
+        """Test para obtener varios usuarios por email en una sola consulta"""
+        # Arrange
+        repository = UserRepository(db_session)
+        users = [User(email=f"batch{i}@example.com", hashed_password="pwd") for i in range(3)]
+        db_session.add_all(users)
+        db_session.commit()
+        
+        # Act
+        result = repository.get_summaries_by_emails(["batch0@example.com", "batch2@example.com", "missing@example.com"])
+        
+        # Assert
+        assert sorted(row.email for row in result) == ["batch0@example.com", "batch2@example.com"]
+        assert repository.get_summaries_by_emails([]) == []
+        
+        # Limpiar
+        for user in users:
+            db_session.delete(user)
+        db_session.commit()
+
+        
+    def test_record_logins(self, db_session: Session):
+        """Test para guardar un lote de logins y el último login correcto de cada usuario"""
+        # Arrange
+        repository = UserRepository(db_session)
+        user = User(email="logins@example.com", hashed_password="pwd")
+        db_session.add(user)
+        db_session.commit()
+        now = datetime.now(timezone.utc)
+        changes_before = db_session.execute(select(UserChange.id)).all()
+        events = [
+            {"user_id": user.id, "email": user.email, "succeeded": True, "ip_address": "10.0.0.1", "created_at": now},
+            {"user_id": user.id, "email": user.email, "succeeded": True, "ip_address": "10.0.0.2", "created_at": now - timedelta(minutes=5)},
+            {"user_id": None, "email": user.email, "succeeded": False, "ip_address": "10.0.0.3", "created_at": now + timedelta(minutes=1)},
+        ]
+        
+        # Act
+        repository.record_logins(events)
+        repository.record_logins([{**events[1], "created_at": now - timedelta(hours=1)}])
+        
+        # Assert
+        stored = db_session.execute(select(LoginEvent).where(LoginEvent.email == user.email)).scalars().all()
+        assert sorted(event.ip_address for event in stored) == ["10.0.0.1", "10.0.0.2", "10.0.0.2", "10.0.0.3"]
+        db_session.refresh(user)
+        assert user.last_login_at.replace(tzinfo=None) == now.replace(tzinfo=None)
+        # last_login_at no dispara el feed de cambios
+        assert db_session.execute(select(UserChange.id)).all() == changes_before
+        
+        # Limpiar
+        for event in stored:
+            db_session.delete(event)
+        db_session.delete(user)
+        db_session.commit()
+        
+    def test_record_logins_keeps_updated_at(self, db_session: Session):
+        """Test para que registrar logins no cambie updated_at"""
+        # Arrange
+        repository = UserRepository(db_session)
+        edited_at = datetime(2020, 1, 1, 12, 0, 0)
+        user = User(email="logins-updated@example.com", hashed_password="pwd", updated_at=edited_at)
+        db_session.add(user)
+        db_session.commit()
+        event = {
+            "user_id": user.id, "email": user.email, "succeeded": True, "ip_address": None,
+            "created_at": datetime.now(timezone.utc),
+        }
+        
+        # Act
+        repository.record_logins([event])
+        
+        # Assert
+        db_session.refresh(user)
+        assert user.last_login_at is not None
+        assert user.updated_at.replace(tzinfo=None) == edited_at
+        
+        # Limpiar
+        for stored in db_session.execute(select(LoginEvent).where(LoginEvent.email == user.email)).scalars():
+            db_session.delete(stored)
+        db_session.delete(user)
+        db_session.commit()
+        
+    def test_projected_reads(self, db_session: Session):
+        """Test para que las lecturas con campos solo proyecten esas columnas y las que necesitan"""
+        # Arrange
+        repository = UserRepository(db_session)
+        user = User(email="projected@example.com", hashed_password="pwd")
+        db_session.add(user)
+        db_session.commit()
+        
+        # Act
+        by_id = repository.get_summary_by_id(user.id, fields=("created_at",))
+        listed = repository.list_summaries(0, 1, fields=("email",))
+        searched = repository.search_summaries("projected@", fields=("is_active",))
+        
+        # Assert
+        assert by_id._fields == ("id", "created_at")
+        assert by_id.created_at is not None
+        assert listed[0]._fields == ("id", "email")
+        assert searched[0]._fields == ("id", "email", "is_active")
+        
+        # Limpiar
+        db_session.delete(user)
+        db_session.commit()
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import MagicMock, patch
 from app.adapters.controllers.user_controller import UserController
-from app.application.usecases.user_usecase import UserCreate, UserUpdate, UserResponse
+from app.application.usecases.user_usecase import DEFAULT_USER_FIELD_SET, UserCreate, UserUpdate, UserResponse
 
 
 class TestUserController:
@@ -43,7 +43,7 @@ class TestUserController:
             
             # Assert
             assert result == expected_response
-            mock_usecase.get_user_by_id.assert_called_once_with(user_id)
+            mock_usecase.get_user_by_id.assert_called_once_with(user_id, DEFAULT_USER_FIELD_SET)
     
     def test_get_user_by_id_not_found(self):
         """Test para obtener usuario por ID cuando no existe"""
@@ -61,4 +61,4 @@ class TestUserController:
             
             # Assert
             assert result is None
-            mock_usecase.get_user_by_id.assert_called_once_with(user_id)
\ No newline at end of file
+            mock_usecase.get_user_by_id.assert_called_once_with(user_id, DEFAULT_USER_FIELD_SET)
\ No newline at end of file
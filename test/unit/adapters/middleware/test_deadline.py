@@ -0,0 +1,200 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.config.settings import get_settings
+from app.adapters.api.middleware.deadline import DeadlineMiddleware, deadline_exceeded
+from app.infrastructure.auth.jwt import verify_password
+from app.infrastructure.datasources.deadlines import (
+    DeadlineExceededError,
+    deadline,
+    install_statement_timeouts,
+    _statement_timeout_to_set,
+    remaining,
+)
+
+# Consulta que tarda varios segundos en SQLite
+_SLOW_QUERY = (
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 50000000) "
+    "SELECT count(*) FROM c"
+)
+
+
+def _client(**overrides):
+    settings = get_settings().model_copy(update={
+        "REQUEST_TIMEOUT_SECONDS": 0.2,
+        "REQUEST_TIMEOUT_MAX_SECONDS": 1.0,
+        **overrides,
+    })
+    app = FastAPI()
+
+    @app.get("/remaining")
+    def _remaining():
+        return {"remaining": remaining()}
+
+    @app.get("/slow")
+    async def _slow():
+        await asyncio.sleep(2)
+        return {"ok": True}
+
+    @app.get("/late-error")
+    def _late_error():
+        time.sleep(0.3)
+        return {"ok": False}
+
+    app.add_middleware(DeadlineMiddleware, settings=settings)
+    return TestClient(app)
+
+
+class TestDeadlineMiddleware:
+    """Tests del plazo por petición"""
+
+    def test_default_deadline_is_visible_in_endpoint(self):
+        """El endpoint síncrono ve el plazo restante de la petición"""
+        # Act
+        response = _client().get("/remaining")
+
+        # Assert
+        assert 0 < response.json()["remaining"] <= 0.2
+
+    def test_header_overrides_default_and_is_capped(self):
+        """X-Request-Timeout sustituye al valor por defecto, acotado por el máximo"""
+        # Arrange
+        client = _client()
+
+        # Act
+        short = client.get("/remaining", headers={"X-Request-Timeout": "0.05"}).json()["remaining"]
+        capped = client.get("/remaining", headers={"X-Request-Timeout": "60"}).json()["remaining"]
+
+        # Assert
+        assert short <= 0.05
+        assert 0.2 < capped <= 1.0
+
+    def test_route_default(self):
+        """Los plazos por prefijo de ruta prevalecen sobre el global"""
+        # Arrange
+        client = _client(REQUEST_TIMEOUT_ROUTES={"/rem": 0.5})
+
+        # Act
+        value = client.get("/remaining").json()["remaining"]
+
+        # Assert
+        assert 0.2 < value <= 0.5
+
+    def test_slow_request_is_cut_with_504(self):
+        """Una petición que no responde a tiempo recibe un 504 y se cuenta"""
+        # Arrange
+        client = _client()
+        before = deadline_exceeded.value(method="GET")
+
+        # Act
+        started = time.perf_counter()
+        response = client.get("/slow")
+        elapsed = time.perf_counter() - started
+
+        # Assert
+        assert response.status_code == 504
+        assert response.json()["error"]["message"] == "Request deadline exceeded"
+        assert elapsed < 1.0
+        assert deadline_exceeded.value(method="GET") == before + 1
+
+    def test_late_response_is_replaced_by_504(self):
+        """Una respuesta que empieza después del plazo se sustituye por el 504"""
+        # Act
+        response = _client().get("/late-error")
+
+        # Assert
+        assert response.status_code == 504
+
+
+class TestStatementTimeouts:
+    """Tests de la traducción del plazo a límites por sentencia"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'deadline.db'}")
+        install_statement_timeouts(engine)
+        yield engine
+        engine.dispose()
+
+    def test_sqlite_query_is_interrupted_at_deadline(self, engine):
+        """El progress handler interrumpe la consulta cuando vence el plazo"""
+        # Act
+        started = time.perf_counter()
+        with deadline(0.1), engine.connect() as conn:
+            with pytest.raises(OperationalError, match="interrupted"):
+                conn.execute(text(_SLOW_QUERY))
+        elapsed = time.perf_counter() - started
+
+        # Assert
+        assert elapsed < 1.0
+
+    def test_handler_is_removed_after_statement(self, engine):
+        """Fuera del plazo la misma conexión ejecuta sin límite"""
+        # Arrange
+        with engine.connect() as conn:
+            with deadline(5):
+                conn.execute(text("SELECT 1"))
+
+            # Act
+            result = conn.execute(text("SELECT count(*) FROM (SELECT 1 UNION ALL SELECT 2)")).scalar()
+
+        # Assert
+        assert result == 2
+
+    def test_expired_deadline_skips_statement(self, engine):
+        """Con el plazo vencido la sentencia ni se envía"""
+        # Act & Assert
+        with deadline(0.01):
+            time.sleep(0.02)
+            with engine.connect() as conn:
+                with pytest.raises(DeadlineExceededError):
+                    conn.execute(text("SELECT 1"))
+
+    def test_statement_timeout_is_set_once_per_transaction(self):
+        """Solo se vuelve a fijar cuando el plazo restante baja de la mitad del fijado"""
+        # Arrange
+        info = {}
+
+        # Act
+        first = _statement_timeout_to_set(info, 1000)
+        same = _statement_timeout_to_set(info, 900)
+        halved = _statement_timeout_to_set(info, 400)
+
+        # Assert
+        assert (first, same, halved) == (1000, None, 400)
+
+    def test_statement_timeout_is_forgotten_at_transaction_end(self, engine):
+        """Al terminar la transacción el valor cacheado se descarta"""
+        # Arrange
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            _statement_timeout_to_set(conn.info, 1000)
+
+            # Act
+            conn.commit()
+
+            # Assert
+            assert _statement_timeout_to_set(conn.info, 1000) == 1000
+
+    def test_expired_deadline_skips_bcrypt(self):
+        """verify_password no calcula el hash si el plazo ya venció"""
+        # Act & Assert
+        with deadline(0.01):
+            time.sleep(0.02)
+            with pytest.raises(DeadlineExceededError):
+                verify_password("password", "$2b$12$" + "a" * 53)
+
+    def test_nested_deadline_keeps_shortest(self):
+        """Un plazo interior no puede alargar el exterior"""
+        # Act
+        with deadline(0.1):
+            with deadline(10):
+                value = remaining()
+
+        # Assert
+        assert value <= 0.1
+        assert remaining() is None
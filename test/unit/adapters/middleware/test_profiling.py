@@ -0,0 +1,87 @@
+import os
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config.settings import get_settings
+from app.adapters.api.middleware.profiling import (
+    ProfilingMiddleware,
+    sign_profile_request,
+    verify_profile_signature,
+)
+
+
+def _busy_endpoint():
+    end = time.perf_counter() + 0.05
+    while time.perf_counter() < end:
+        pass
+    return {"ok": True}
+
+
+def _profiled_client(tmp_path, **overrides):
+    settings = get_settings().model_copy(update={
+        "PROFILING_ENABLED": True,
+        "PROFILING_SECRET": "profiling-secret",
+        "PROFILING_OUTPUT_DIR": str(tmp_path),
+        **overrides,
+    })
+    app = FastAPI()
+    app.get("/busy")(_busy_endpoint)
+    # Los endpoints de este test viven fuera del paquete app
+    app.add_middleware(ProfilingMiddleware, settings=settings, include_paths=(os.path.dirname(__file__),))
+    return TestClient(app)
+
+
+class TestProfilingMiddleware:
+    """Tests para el profiling por petición"""
+
+    def test_signature_roundtrip(self):
+        """La firma solo es válida para el mismo método y ruta"""
+        # Arrange
+        value = sign_profile_request("secret", "GET", "/api/v1/users/1")
+
+        # Assert
+        assert verify_profile_signature("secret", "GET", "/api/v1/users/1", value)
+        assert not verify_profile_signature("secret", "GET", "/api/v1/users/2", value)
+        assert not verify_profile_signature("other", "GET", "/api/v1/users/1", value)
+        assert not verify_profile_signature("secret", "GET", "/api/v1/users/1", "1:abc")
+
+    def test_signed_request_writes_collapsed_stacks(self, tmp_path):
+        """Una petición firmada genera un fichero de pilas colapsadas"""
+        # Arrange
+        client = _profiled_client(tmp_path)
+        headers = {"X-Profile": sign_profile_request("profiling-secret", "GET", "/busy")}
+
+        # Act
+        response = client.get("/busy", headers=headers)
+
+        # Assert
+        assert response.status_code == 200
+        files = list(tmp_path.glob("*.collapsed"))
+        assert len(files) == 1
+        lines = files[0].read_text().splitlines()
+        assert lines
+        assert any("_busy_endpoint" in line for line in lines)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    def test_unsigned_request_is_not_profiled(self, tmp_path):
+        """Sin cabecera firmada ni muestreo no se escribe nada"""
+        # Arrange
+        client = _profiled_client(tmp_path)
+
+        # Act
+        client.get("/busy")
+        client.get("/busy", headers={"X-Profile": "1:forged"})
+
+        # Assert
+        assert list(tmp_path.glob("*.collapsed")) == []
+
+    def test_sample_rate_profiles_without_header(self, tmp_path):
+        """Con PROFILING_SAMPLE_RATE=1 se perfilan todas las peticiones"""
+        # Arrange
+        client = _profiled_client(tmp_path, PROFILING_SECRET=None, PROFILING_SAMPLE_RATE=1.0)
+
+        # Act
+        client.get("/busy")
+
+        # Assert
+        assert len(list(tmp_path.glob("*.collapsed"))) == 1
@@ -1,6 +1,8 @@
 import pytest
+from collections import namedtuple
 from unittest.mock import Mock
 from app.domain.entities import User
+from app.domain.exceptions import EmailAlreadyRegisteredError
 from app.application.usecases.user_usecase import UserUseCase, UserCreate, UserUpdate, UserResponse
 
 
@@ -11,11 +13,10 @@ class TestUserUseCase:
         """Test para crear usuario exitosamente"""
         # Arrange
         mock_repository = Mock()
-        mock_repository.get_by_email.return_value = None
         
         # Simular creación exitosa
         mock_user = User(id=1, email="test@example.com", is_active=True)
-        mock_repository.create.return_value = mock_user
+        mock_repository.create_if_absent.return_value = mock_user
         
         usecase = UserUseCase(mock_repository)
         user_data = UserCreate(email="test@example.com", password="password123")
@@ -33,26 +34,28 @@ class TestUserUseCase:
         assert result.email == "test@example.com"
         assert result.is_active is True
         
-        # Verificar que se llamó al repositorio correctamente
-        mock_repository.get_by_email.assert_called_once_with("test@example.com")
-        mock_repository.create.assert_called_once()
+        # Verificar que se creó con una sola llamada al repositorio, sin consulta previa
+        mock_repository.create_if_absent.assert_called_once_with("test@example.com", "hashed_password123")
+        mock_repository.get_by_email.assert_not_called()
         
-    def test_create_user_email_exists(self):
+    def test_create_user_email_exists(self, monkeypatch):
         """Test para crear usuario cuando el email ya existe"""
         # Arrange
         mock_repository = Mock()
-        # Simular que el email ya existe
-        mock_repository.get_by_email.return_value = User(id=1, email="test@example.com")
+        # Simular que el INSERT no insertó nada porque el email ya existe
+        mock_repository.create_if_absent.return_value = None
         
         usecase = UserUseCase(mock_repository)
         user_data = UserCreate(email="test@example.com", password="password123")
+        monkeypatch.setattr('app.application.usecases.user_usecase.get_password_hash', 
+                    lambda password: f"hashed_{password}")
         
         # Act
         result = usecase.create_user(user_data)
         
         # Assert
         assert result is None
-        mock_repository.get_by_email.assert_called_once_with("test@example.com")
+        mock_repository.create_if_absent.assert_called_once_with("test@example.com", "hashed_password123")
         mock_repository.create.assert_not_called()
         
     def test_get_user_by_id_exists(self):
@@ -60,7 +63,7 @@ class TestUserUseCase:
         # Arrange
         mock_repository = Mock()
         mock_user = User(id=1, email="test@example.com", is_active=True)
-        mock_repository.get_by_id.return_value = mock_user
+        mock_repository.get_summary_by_id.return_value = mock_user
         
         usecase = UserUseCase(mock_repository)
         
@@ -71,13 +74,13 @@ class TestUserUseCase:
         assert result is not None
         assert result.id == 1
         assert result.email == "test@example.com"
-        mock_repository.get_by_id.assert_called_once_with(1)
+        mock_repository.get_summary_by_id.assert_called_once_with(1)
         
     def test_get_user_by_id_not_exists(self):
         """Test para obtener usuario por ID cuando no existe"""
         # Arrange
         mock_repository = Mock()
-        mock_repository.get_by_id.return_value = None
+        mock_repository.get_summary_by_id.return_value = None
         
         usecase = UserUseCase(mock_repository)
         
@@ -86,24 +89,19 @@ class TestUserUseCase:
         
         # Assert
         assert result is None
-        mock_repository.get_by_id.assert_called_once_with(999)
+        mock_repository.get_summary_by_id.assert_called_once_with(999)
         
     def test_update_user_success(self, monkeypatch):  # Agrega monkeypatch como parámetro
         """Test para actualizar usuario exitosamente"""
         # Arrange
         mock_repository = Mock()
-        mock_user = User(id=1, email="old@example.com", is_active=True)
-        mock_repository.get_by_id.return_value = mock_user
-        
-        # Simular que el nuevo email no está en uso
-        mock_repository.get_by_email.return_value = None
         
         # Simular actualización exitosa
         mock_updated_user = User(id=1, email="new@example.com", is_active=False)
-        mock_repository.update.return_value = mock_updated_user
+        mock_repository.update_fields.return_value = mock_updated_user
         
         usecase = UserUseCase(mock_repository)
-        user_update = UserUpdate(email="new@example.com", is_active=False)
+        user_update = UserUpdate(email="new@example.com", is_active=False, password="secret")
         
         # Act
         # Usa directamente el monkeypatch pasado como parámetro
@@ -118,32 +116,42 @@ class TestUserUseCase:
         assert result.email == "new@example.com"
         assert result.is_active is False
         
-        mock_repository.get_by_id.assert_called_once_with(1)
-        mock_repository.get_by_email.assert_called_once_with("new@example.com")
-        mock_repository.update.assert_called_once()
+        # Una sola escritura, sin leer antes el usuario ni comprobar el email
+        mock_repository.update_fields.assert_called_once_with(
+            1, {"email": "new@example.com", "is_active": False, "hashed_password": "hashed_secret"}
+        )
+        mock_repository.get_by_id.assert_not_called()
+        mock_repository.get_by_email.assert_not_called()
         
-    def test_update_user_email_exists(self):
-        """Test para actualizar usuario cuando el nuevo email ya está en uso"""
+    def test_update_user_not_found(self):
+        """Test para actualizar un usuario que no existe"""
         # Arrange
         mock_repository = Mock()
-        mock_user = User(id=1, email="old@example.com", is_active=True)
-        mock_repository.get_by_id.return_value = mock_user
-        
-        # Simular que el nuevo email ya está en uso por otro usuario
-        other_user = User(id=2, email="new@example.com", is_active=True)
-        mock_repository.get_by_email.return_value = other_user
+        mock_repository.update_fields.return_value = None
         
         usecase = UserUseCase(mock_repository)
-        user_update = UserUpdate(email="new@example.com")
         
         # Act
-        result = usecase.update_user(1, user_update)
+        result = usecase.update_user(999, UserUpdate(is_active=False))
         
         # Assert
         assert result is None
-        mock_repository.get_by_id.assert_called_once_with(1)
-        mock_repository.get_by_email.assert_called_once_with("new@example.com")
-        mock_repository.update.assert_not_called()
+        mock_repository.update_fields.assert_called_once_with(999, {"is_active": False})
+        
+    def test_update_user_email_exists(self):
+        """Test para actualizar usuario cuando el nuevo email ya está en uso"""
+        # Arrange
+        mock_repository = Mock()
+        # Simular que la restricción única del email rechaza la actualización
+        mock_repository.update_fields.side_effect = EmailAlreadyRegisteredError("new@example.com")
+        
+        usecase = UserUseCase(mock_repository)
+        user_update = UserUpdate(email="new@example.com")
+        
+        # Act / Assert
+        with pytest.raises(EmailAlreadyRegisteredError):
+            usecase.update_user(1, user_update)
+        mock_repository.update_fields.assert_called_once_with(1, {"email": "new@example.com"})
         
     def test_delete_user_success(self):
         """Test para eliminar usuario exitosamente"""
@@ -164,11 +172,13 @@ class TestUserUseCase:
         """Test para listar usuarios"""
         # Arrange
         mock_repository = Mock()
+        # Filas proyectadas (id, email, is_active), como las devuelve el repositorio
+        UserSummary = namedtuple("UserSummary", ["id", "email", "is_active"])
         mock_users = [
-            User(id=1, email="user1@example.com", is_active=True),
-            User(id=2, email="user2@example.com", is_active=False)
+            UserSummary(1, "user1@example.com", True),
+            UserSummary(2, "user2@example.com", False)
         ]
-        mock_repository.list.return_value = mock_users
+        mock_repository.list_summaries.return_value = mock_users
         
         usecase = UserUseCase(mock_repository)
         
@@ -181,4 +191,67 @@ class TestUserUseCase:
         assert result[0].email == "user1@example.com"
         assert result[1].id == 2
         assert result[1].email == "user2@example.com"
-        mock_repository.list.assert_called_once_with(0, 10)
\ No newline at end of file
+        assert result[1].is_active is False
+        mock_repository.list_summaries.assert_called_once_with(0, 10)
+        
+    def test_search_users_short_substring_falls_back_to_prefix(self):
+        """Test para que una subcadena corta se busque como prefijo"""
+        # Arrange
+        mock_repository = Mock()
+        Row = namedtuple("Row", ["id", "email", "is_active"])
+        mock_repository.search_summaries.return_value = [Row(1, "ab@example.com", True), Row(2, "ac@example.com", True)]
+        usecase = UserUseCase(mock_repository)
+        
+        # Act
+        page = usecase.search_users("a", mode="substring", limit=2)
+        
+        # Assert
+        assert page.mode == "prefix"
+        assert [user.email for user in page.items] == ["ab@example.com", "ac@example.com"]
+        assert page.next_after == "ac@example.com"
+        mock_repository.search_summaries.assert_called_once_with("a", False, "", 2)
+        
+    def test_search_users_last_page_has_no_cursor(self):
+        """Test para que la última página no devuelva cursor"""
+        # Arrange
+        mock_repository = Mock()
+        Row = namedtuple("Row", ["id", "email", "is_active"])
+        mock_repository.search_summaries.return_value = [Row(1, "john@example.com", True)]
+        usecase = UserUseCase(mock_repository)
+        
+        # Act
+        page = usecase.search_users("ohn", mode="substring", limit=10)
+        
+        # Assert
+        assert page.mode == "substring"
+        assert page.next_after is None
+        mock_repository.search_summaries.assert_called_once_with("ohn", True, "", 10)
+
+        
+    def test_list_users_with_field_set(self):
+        """Test para listar usuarios proyectando solo los campos pedidos"""
+        # Arrange
+        from app.application.usecases.user_usecase import parse_user_fields
+        mock_repository = Mock()
+        Row = namedtuple("Row", ["id", "email"])
+        mock_repository.list_summaries.return_value = [Row(1, "user1@example.com")]
+        usecase = UserUseCase(mock_repository)
+        field_set = parse_user_fields("email, id")
+        
+        # Act
+        result = usecase.list_users(skip=0, limit=10, field_set=field_set)
+        
+        # Assert
+        assert field_set.fields == ("id", "email")
+        assert parse_user_fields("id,email") is field_set
+        assert field_set.list_adapter.dump_python(result) == [{"id": 1, "email": "user1@example.com"}]
+        mock_repository.list_summaries.assert_called_once_with(0, 10, fields=("id", "email"))
+        
+    def test_parse_user_fields_rejects_unknown_fields(self):
+        """Test para rechazar campos que no se pueden exponer"""
+        from app.application.usecases.user_usecase import parse_user_fields
+        
+        with pytest.raises(ValueError):
+            parse_user_fields("id,hashed_password")
+        with pytest.raises(ValueError):
+            parse_user_fields(" , ")
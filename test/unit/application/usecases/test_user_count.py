@@ -0,0 +1,136 @@
+from unittest.mock import Mock
+from app.application.usecases.user_count import UserCountStrategy, UserTotal
+from app.application.usecases.user_usecase import UserUseCase
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor:
+    """Ejecuta las tareas al enviarlas, o las guarda si deferred=True"""
+    def __init__(self, deferred=False):
+        self.deferred = deferred
+        self.pending = []
+
+    def submit(self, fn):
+        if self.deferred:
+            self.pending.append(fn)
+        else:
+            fn()
+
+    def run_pending(self):
+        while self.pending:
+            self.pending.pop(0)()
+
+
+def _repository(estimate, exact):
+    repository = Mock()
+    repository.estimate_count.return_value = estimate
+    repository.count.return_value = exact
+    return repository
+
+
+class TestUserCountStrategy:
+    """Tests de la estrategia de recuento de usuarios"""
+
+    def test_small_table_is_counted_exactly(self):
+        """Por debajo del umbral el total es un count(*) exacto"""
+        # Arrange
+        strategy = UserCountStrategy(exact_threshold=1000, refresh=Mock())
+        repository = _repository(estimate=120, exact=123)
+
+        # Act
+        total = strategy.total(repository)
+
+        # Assert
+        assert total == UserTotal(123, True)
+        strategy._refresh.assert_not_called()
+
+    def test_large_table_uses_estimate_then_cached_count(self):
+        """En tablas grandes se devuelve la estimación mientras se calcula el recuento en segundo plano"""
+        # Arrange
+        executor = InlineExecutor(deferred=True)
+        refresh = Mock(return_value=5_000_123)
+        strategy = UserCountStrategy(exact_threshold=1000, refresh=refresh, executor=executor)
+        repository = _repository(estimate=5_000_000, exact=None)
+
+        # Act
+        first = strategy.total(repository)
+        executor.run_pending()
+        second = strategy.total(repository)
+
+        # Assert
+        assert first == UserTotal(5_000_000, False)
+        assert second == UserTotal(5_000_123, False)
+        repository.count.assert_not_called()
+        refresh.assert_called_once()
+
+    def test_stale_cache_is_refreshed_once(self):
+        """Un recuento caducado se sirve mientras se refresca, con un solo refresco en curso"""
+        # Arrange
+        clock = FakeClock()
+        executor = InlineExecutor(deferred=True)
+        refresh = Mock(side_effect=[2000, 2500])
+        strategy = UserCountStrategy(exact_threshold=1000, cache_ttl=60, refresh=refresh, executor=executor, clock=clock)
+        repository = _repository(estimate=1900, exact=None)
+        strategy.total(repository)
+        executor.run_pending()
+        clock.now += 61
+
+        # Act
+        during_refresh = [strategy.total(repository) for _ in range(3)]
+        executor.run_pending()
+        after_refresh = strategy.total(repository)
+
+        # Assert
+        assert during_refresh == [UserTotal(2000, False)] * 3
+        assert after_refresh == UserTotal(2500, False)
+        assert refresh.call_count == 2
+
+    def test_without_estimate_uses_last_exact_count_as_size(self):
+        """Sin estadísticas del motor, el último recuento exacto decide el tamaño"""
+        # Arrange
+        executor = InlineExecutor(deferred=True)
+        strategy = UserCountStrategy(exact_threshold=1000, refresh=Mock(return_value=1500), executor=executor)
+        repository = _repository(estimate=None, exact=1400)
+
+        # Act
+        first = strategy.total(repository)
+        second = strategy.total(repository)
+
+        # Assert
+        assert first == UserTotal(1400, True)
+        assert second == UserTotal(1400, False)
+        assert repository.count.call_count == 1
+
+    def test_refresh_errors_are_swallowed(self):
+        """Un fallo del refresco no afecta a la petición y permite reintentar"""
+        # Arrange
+        refresh = Mock(side_effect=[RuntimeError("db down"), 3000])
+        strategy = UserCountStrategy(exact_threshold=1000, refresh=refresh, executor=InlineExecutor())
+        repository = _repository(estimate=2000, exact=None)
+
+        # Act
+        first = strategy.total(repository)
+        second = strategy.total(repository)
+
+        # Assert
+        assert first == UserTotal(2000, False)
+        assert second == UserTotal(2000, False)
+        assert strategy.total(repository) == UserTotal(3000, False)
+
+    def test_usecase_without_strategy_counts_exactly(self):
+        """Sin estrategia, el caso de uso cuenta con count(*)"""
+        # Arrange
+        repository = _repository(estimate=None, exact=7)
+
+        # Act
+        total = UserUseCase(repository).count_users()
+
+        # Assert
+        assert total == UserTotal(7, True)
@@ -0,0 +1,242 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.infrastructure.datasources.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    install_circuit_breaker,
+)
+from app.infrastructure.datasources.deadlines import deadline, install_statement_timeouts
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(
+        name="test",
+        window_size=10,
+        minimum_calls=4,
+        failure_rate_threshold=0.5,
+        slow_call_seconds=1.0,
+        slow_call_rate_threshold=0.75,
+        open_seconds=5.0,
+        half_open_calls=2,
+        clock=clock,
+    )
+
+
+class TestCircuitBreaker:
+    """Tests de la máquina de estados del circuit breaker"""
+
+    def test_opens_on_error_rate(self, breaker):
+        """Con la mitad de llamadas fallidas en la ventana el circuito se abre"""
+        # Arrange
+        breaker.record_success(0.01)
+        breaker.record_success(0.01)
+        breaker.record_failure()
+
+        # Act
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError) as exc_info:
+            breaker.before_call()
+        assert exc_info.value.retry_after == 5.0
+
+    def test_needs_minimum_calls(self, breaker):
+        """Pocas llamadas no bastan para abrir el circuito"""
+        # Act
+        for _ in range(3):
+            breaker.record_failure()
+
+        # Assert
+        assert breaker.state == CLOSED
+        breaker.before_call()
+
+    def test_opens_on_slow_call_rate(self, breaker):
+        """Un exceso de llamadas lentas también abre el circuito"""
+        # Act
+        breaker.record_success(0.01)
+        for _ in range(3):
+            breaker.record_success(2.0)
+
+        # Assert
+        assert breaker.state == OPEN
+
+    def test_half_open_probes_close_circuit(self, breaker, clock):
+        """Pasado open_seconds se admiten sondas; si van bien el circuito se cierra"""
+        # Arrange
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now += 5.0
+
+        # Act
+        breaker.before_call()
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success(0.01)
+        breaker.record_success(0.01)
+
+        # Assert
+        assert breaker.state == CLOSED
+
+    def test_half_open_failure_reopens(self, breaker, clock):
+        """Un fallo durante el semiabierto vuelve a abrir el circuito"""
+        # Arrange
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now += 5.0
+        assert breaker.state == HALF_OPEN
+
+        # Act
+        breaker.before_call()
+        breaker.record_failure()
+
+        # Assert
+        assert breaker.state == OPEN
+
+    def test_unused_probe_permits_are_renewed(self, breaker, clock):
+        """Si las sondas admitidas nunca llegan a la base de datos, se admiten otras"""
+        # Arrange
+        for _ in range(4):
+            breaker.record_failure()
+        clock.now += 5.0
+        breaker.before_call()
+        breaker.before_call()
+
+        # Act
+        clock.now += 5.0
+
+        # Assert
+        breaker.before_call()
+
+
+class TestCircuitBreakerEngine:
+    """Tests de la integración del breaker con los eventos del engine"""
+
+    def test_sql_errors_do_not_feed_breaker(self, tmp_path):
+        """Los errores de SQL o de integridad no cuentan como fallos"""
+        # Arrange
+        engine = create_engine(f"sqlite:///{tmp_path / 'breaker.db'}")
+        breaker = CircuitBreaker(name="engine_test", minimum_calls=2, failure_rate_threshold=0.5)
+        install_circuit_breaker(engine, breaker)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+            conn.execute(text("INSERT INTO t VALUES (1)"))
+
+        # Act
+        with engine.connect() as conn:
+            with pytest.raises(IntegrityError):
+                conn.execute(text("INSERT INTO t VALUES (1)"))
+        state_after_integrity_error = breaker.snapshot()
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM missing_table"))
+
+        # Assert
+        assert state_after_integrity_error["failure_rate"] == 0
+        assert breaker.snapshot()["failure_rate"] == 0
+        assert breaker.state == CLOSED
+        engine.dispose()
+
+    def test_connect_errors_feed_breaker(self, tmp_path):
+        """No poder conectar cuenta como fallo"""
+        # Arrange
+        engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'breaker.db'}")
+        breaker = CircuitBreaker(name="connect_test", minimum_calls=2, failure_rate_threshold=0.5)
+        install_circuit_breaker(engine, breaker)
+
+        # Act
+        for _ in range(2):
+            with pytest.raises(OperationalError):
+                engine.connect()
+
+        # Assert
+        assert breaker.state == OPEN
+        engine.dispose()
+
+    def test_pool_timeout_feeds_breaker(self, tmp_path):
+        """Agotar la espera del pool cuenta como fallo"""
+        # Arrange
+        engine = create_engine(f"sqlite:///{tmp_path / 'breaker.db'}", pool_size=1, max_overflow=0, pool_timeout=0.01)
+        breaker = CircuitBreaker(name="pool_test", minimum_calls=2, failure_rate_threshold=0.5)
+        install_circuit_breaker(engine, breaker)
+
+        # Act
+        with engine.connect():
+            for _ in range(2):
+                with pytest.raises(PoolTimeoutError):
+                    engine.connect()
+
+        # Assert
+        assert breaker.state == OPEN
+        engine.dispose()
+
+    def test_deadline_cancelled_statements_leave_breaker_closed(self, tmp_path):
+        """Las sentencias interrumpidas por el plazo de la petición no abren el circuito"""
+        # Arrange
+        engine = create_engine(f"sqlite:///{tmp_path / 'breaker.db'}")
+        breaker = CircuitBreaker(name="deadline_test", minimum_calls=2, failure_rate_threshold=0.5)
+        install_circuit_breaker(engine, breaker)
+        install_statement_timeouts(engine)
+        endless = text(
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c"
+        )
+
+        # Act
+        with engine.connect() as conn:
+            for _ in range(3):
+                with deadline(0.01), pytest.raises(OperationalError):
+                    conn.execute(endless)
+
+        # Assert
+        assert breaker.state == CLOSED
+        engine.dispose()
+
+
+class TestCircuitOpenResponse:
+    """Tests de la respuesta de la API con el circuito abierto"""
+
+    def test_open_circuit_returns_503_fast(self, monkeypatch):
+        """Con el circuito abierto las rutas responden 503 sin tocar la base de datos"""
+        # Arrange
+        from app.config import database
+        from app.main import app
+
+        def _open():
+            raise CircuitOpenError("database", 4.2)
+
+        monkeypatch.setattr(database.db_breaker, "before_call", _open)
+
+        with TestClient(app) as client:
+            # Act
+            started = time.perf_counter()
+            response = client.get("/api/v1/users/1", headers={"Authorization": "Bearer token"})
+            elapsed = time.perf_counter() - started
+
+        # Assert
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert response.json() == {"data": None, "error": {"message": "Database unavailable", "status_code": 503}}
+        assert elapsed < 0.5
@@ -0,0 +1,127 @@
+import threading
+import time
+import pytest
+from app.infrastructure.auth.login_events import BLOCK, DROP_NEWEST, DROP_OLDEST, LoginEventRecorder
+
+
+class CollectingWriter:
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+
+    def __call__(self, batch):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("db down")
+        self.batches.append([event["email"] for event in batch])
+
+
+def _fill(recorder, count, prefix="u"):
+    for i in range(count):
+        recorder.record(f"{prefix}{i}@example.com", True, i, "10.0.0.1")
+
+
+class TestLoginEventRecorder:
+    """Tests del buffer de intentos de login con escritura diferida"""
+
+    def test_record_does_not_write(self):
+        """Registrar un intento solo lo añade al buffer"""
+        # Arrange
+        writer = CollectingWriter()
+        recorder = LoginEventRecorder(writer, flush_size=10)
+
+        # Act
+        recorder.record("a@example.com", False, None, "10.0.0.1")
+
+        # Assert
+        assert writer.batches == []
+        assert len(recorder) == 1
+
+    def test_flush_writes_in_batches(self):
+        """El buffer se escribe en lotes de flush_size"""
+        # Arrange
+        writer = CollectingWriter()
+        recorder = LoginEventRecorder(writer, flush_size=2)
+        _fill(recorder, 5)
+
+        # Act
+        written = recorder.flush()
+
+        # Assert
+        assert written == 5
+        assert [len(batch) for batch in writer.batches] == [2, 2, 1]
+        assert len(recorder) == 0
+
+    @pytest.mark.parametrize("policy, expected", [
+        (DROP_NEWEST, ["u0@example.com", "u1@example.com"]),
+        (DROP_OLDEST, ["u1@example.com", "u2@example.com"]),
+        (BLOCK, ["u0@example.com", "u1@example.com"]),
+    ])
+    def test_overflow_policy(self, policy, expected):
+        """Con el buffer lleno se aplica la política configurada"""
+        # Arrange
+        writer = CollectingWriter()
+        recorder = LoginEventRecorder(writer, buffer_size=2, flush_size=10, overflow_policy=policy, block_timeout=0.01)
+
+        # Act
+        _fill(recorder, 3)
+        recorder.flush()
+
+        # Assert
+        assert writer.batches == [expected]
+
+    def test_block_policy_waits_for_flush(self):
+        """Con block, el intento espera a que el flush deje hueco"""
+        # Arrange
+        writer = CollectingWriter()
+        recorder = LoginEventRecorder(writer, buffer_size=1, flush_size=10, overflow_policy=BLOCK, block_timeout=5)
+        _fill(recorder, 1)
+        flusher = threading.Timer(0.05, recorder.flush)
+        flusher.start()
+
+        # Act
+        recorder.record("late@example.com", True)
+        flusher.join()
+        recorder.flush()
+
+        # Assert
+        assert writer.batches == [["u0@example.com"], ["late@example.com"]]
+
+    def test_failed_batch_is_requeued(self):
+        """Un lote que falla vuelve al buffer y se escribe en el siguiente ciclo"""
+        # Arrange
+        writer = CollectingWriter(fail_times=1)
+        recorder = LoginEventRecorder(writer, flush_size=10)
+        _fill(recorder, 3)
+
+        # Act
+        first = recorder.flush()
+        second = recorder.flush()
+
+        # Assert
+        assert first == 0
+        assert second == 3
+        assert writer.batches == [["u0@example.com", "u1@example.com", "u2@example.com"]]
+
+    def test_background_flush_on_size_and_stop(self):
+        """El hilo escribe al llegar a flush_size y stop escribe lo que quede"""
+        # Arrange
+        writer = CollectingWriter()
+        recorder = LoginEventRecorder(writer, flush_size=2, flush_interval=60)
+        recorder.start()
+
+        # Act
+        _fill(recorder, 2)
+        deadline = time.monotonic() + 5
+        while not writer.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+        _fill(recorder, 1, prefix="late")
+        recorder.stop()
+
+        # Assert
+        assert writer.batches == [["u0@example.com", "u1@example.com"], ["late0@example.com"]]
+
+    def test_unknown_policy_is_rejected(self):
+        """Una política desconocida es un error de configuración"""
+        with pytest.raises(ValueError):
+            LoginEventRecorder(CollectingWriter(), overflow_policy="spill")
@@ -0,0 +1,117 @@
+from collections import namedtuple
+from app.infrastructure.auth.principal_cache import PrincipalCache
+from app.infrastructure.datasources.change_feed import UserChangeEvent
+
+Principal = namedtuple("Principal", ["id", "email", "hashed_password", "is_active"])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _principal(user_id=1, email="user@example.com"):
+    return Principal(user_id, email, "hashed", True)
+
+
+class TestPrincipalCache:
+    """Tests de la caché de principals de autenticación"""
+
+    def test_hit_until_ttl(self):
+        """Las entradas se sirven hasta que caduca el TTL"""
+        # Arrange
+        clock = FakeClock()
+        cache = PrincipalCache(ttl=60, clock=clock)
+        cache.put("user@example.com", _principal(), cache.generation)
+
+        # Act
+        hit = cache.get("user@example.com")
+        clock.now = 61
+        expired = cache.get("user@example.com")
+
+        # Assert
+        assert hit == _principal()
+        assert expired is None
+
+    def test_invalidate_by_id_and_old_email(self):
+        """Un cambio elimina la entrada por id aunque el email haya cambiado"""
+        # Arrange
+        cache = PrincipalCache(ttl=60)
+        cache.put("old@example.com", _principal(1, "old@example.com"), cache.generation)
+        cache.put("other@example.com", _principal(2, "other@example.com"), cache.generation)
+
+        # Act
+        cache.invalidate([UserChangeEvent(1, None)])
+
+        # Assert
+        assert cache.get("old@example.com") is None
+        assert cache.get("other@example.com") is not None
+
+    def test_invalidate_none_clears_everything(self):
+        """None indica que pudieron perderse cambios: se vacía la caché"""
+        # Arrange
+        cache = PrincipalCache(ttl=60)
+        cache.put("user@example.com", _principal(), cache.generation)
+
+        # Act
+        cache.invalidate(None)
+
+        # Assert
+        assert cache.get("user@example.com") is None
+
+    def test_read_started_before_invalidation_is_not_stored(self):
+        """Una lectura anterior a una invalidación podría estar obsoleta y no se guarda"""
+        # Arrange
+        cache = PrincipalCache(ttl=60)
+        generation = cache.generation
+        cache.invalidate([UserChangeEvent(1, "user@example.com")])
+
+        # Act
+        cache.put("user@example.com", _principal(), generation)
+
+        # Assert
+        assert cache.get("user@example.com") is None
+
+    def test_bounded_size_evicts_least_recent(self):
+        """La caché no supera max_size y descarta la entrada más antigua"""
+        # Arrange
+        cache = PrincipalCache(ttl=60, max_size=2)
+
+        # Act
+        for user_id in range(1, 4):
+            cache.put(f"u{user_id}@example.com", _principal(user_id, f"u{user_id}@example.com"), cache.generation)
+
+        # Assert
+        assert cache.get("u1@example.com") is None
+        assert cache.get("u3@example.com") is not None
+        assert len(cache._emails_by_id) == 2
+
+    def test_recently_read_entry_survives_eviction(self):
+        """Una entrada leída pasa al final y se descarta antes la menos usada"""
+        # Arrange
+        cache = PrincipalCache(ttl=60, max_size=2)
+        cache.put("u1@example.com", _principal(1, "u1@example.com"), cache.generation)
+        cache.put("u2@example.com", _principal(2, "u2@example.com"), cache.generation)
+
+        # Act
+        cache.get("u1@example.com")
+        cache.put("u3@example.com", _principal(3, "u3@example.com"), cache.generation)
+
+        # Assert
+        assert cache.get("u1@example.com") is not None
+        assert cache.get("u2@example.com") is None
+        assert cache.get("u3@example.com") is not None
+
+    def test_disabled_cache_stores_nothing(self):
+        """Con TTL 0 la caché no guarda nada"""
+        # Arrange
+        cache = PrincipalCache(ttl=0)
+
+        # Act
+        cache.put("user@example.com", _principal(), cache.generation)
+
+        # Assert
+        assert cache.get("user@example.com") is None
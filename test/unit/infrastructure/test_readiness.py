@@ -0,0 +1,132 @@
+import asyncio
+from unittest.mock import Mock
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from app.config.settings import get_settings
+from app.infrastructure.health.readiness import ReadinessProber
+from app.infrastructure.health.warmup import WarmUp
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ready.db'}", pool_size=2, max_overflow=0)
+    yield engine
+    engine.dispose()
+
+
+class TestReadinessProber:
+    """Tests del prober de readiness"""
+
+    def test_not_ready_before_first_probe(self, engine):
+        """Sin ningún sondeo completado la instancia no está lista"""
+        # Arrange
+        prober = ReadinessProber(engine, get_settings())
+
+        # Act
+        result = prober.status()
+
+        # Assert
+        assert result["status"] == "not_ready"
+
+    def test_ready_when_all_checks_pass(self, engine):
+        """Con la base de datos accesible y pools libres la instancia está lista"""
+        # Arrange
+        prober = ReadinessProber(engine, get_settings())
+
+        # Act
+        asyncio.run(prober.probe())
+        result = prober.status()
+
+        # Assert
+        assert result["status"] == "ready"
+        assert result["checks"]["database"]["ok"] is True
+        assert result["checks"]["pool"] == {"ok": True, "in_use": 0, "capacity": 2}
+
+    def test_database_failure_is_not_ready(self, engine, monkeypatch):
+        """Un error de conexión marca la instancia como no lista"""
+        # Arrange
+        prober = ReadinessProber(engine, get_settings())
+        monkeypatch.setattr(prober, "_ping", Mock(side_effect=OperationalError("SELECT 1", {}, Exception("down"))))
+
+        # Act
+        asyncio.run(prober.probe())
+
+        # Assert
+        result = prober.status()
+        assert result["status"] == "not_ready"
+        assert result["checks"]["database"] == {"ok": False, "error": "OperationalError"}
+
+    def test_saturated_pool_is_not_ready(self, engine):
+        """Con todas las conexiones del pool en uso la instancia no está lista"""
+        # Arrange
+        prober = ReadinessProber(engine, get_settings())
+        connections = [engine.connect() for _ in range(2)]
+
+        # Act
+        result = prober._check_pool()
+
+        # Assert
+        assert result == {"ok": False, "in_use": 2, "capacity": 2}
+        for conn in connections:
+            conn.close()
+
+    def test_stale_result_is_not_ready(self, engine):
+        """Si el prober deja de actualizar el resultado, este caduca"""
+        # Arrange
+        prober = ReadinessProber(engine, get_settings())
+        asyncio.run(prober.probe())
+        prober._checked_at -= prober.stale_after + 1
+
+        # Act
+        result = prober.status()
+
+        # Assert
+        assert result["status"] == "not_ready"
+        assert result["reason"] == "probe result is stale"
+
+    def test_not_ready_during_warmup(self, engine):
+        """Con el calentamiento en curso la instancia no está lista aunque el sondeo pase"""
+        # Arrange
+        warmup = WarmUp({})
+        prober = ReadinessProber(engine, get_settings(), warmup=warmup)
+        asyncio.run(prober.probe())
+
+        # Act
+        during = prober.status()
+        asyncio.run(warmup.run())
+        after = prober.status()
+
+        # Assert
+        assert during == {"status": "not_ready", "reason": "warm-up in progress"}
+        assert after["status"] == "ready"
+
+
+class TestReadyEndpoint:
+    """Tests del endpoint /ready"""
+
+    def test_ready_endpoint(self, client):
+        """/ready devuelve el resultado cacheado con el formato estándar"""
+        # Arrange
+        from app.main import warmup
+        warmup.wait(5)
+
+        # Act
+        response = client.get("/ready")
+
+        # Assert
+        assert response.status_code == 200
+        assert response.json()["data"]["status"] == "ready"
+
+    def test_ready_endpoint_returns_503_when_not_ready(self, client, monkeypatch):
+        """/ready responde 503 cuando el último sondeo falló"""
+        # Arrange
+        from app.main import readiness
+        monkeypatch.setattr(readiness, "status", lambda: {"status": "not_ready", "reason": "test"})
+
+        # Act
+        response = client.get("/ready")
+
+        # Assert
+        assert response.status_code == 503
+        assert response.json() == {"data": None, "error": {"status": "not_ready", "reason": "test"}}
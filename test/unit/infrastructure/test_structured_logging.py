@@ -0,0 +1,167 @@
+import json
+import logging
+import queue
+import pytest
+from app.config.settings import get_settings
+from app.infrastructure.telemetry.metrics import metrics
+from app.infrastructure.telemetry.structured_logging import (
+    ErrorSampler,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    configure_logging,
+    log_records_dropped,
+    shutdown_logging,
+)
+
+
+def _raise_at_same_line(message):
+    raise RuntimeError(message)
+
+
+class TestStructuredLogging:
+    """Tests para el logging estructurado no bloqueante"""
+
+    def test_repeated_errors_are_collapsed(self):
+        """Un mismo error solo captura traceback una vez por ventana"""
+        # Arrange
+        sampler = ErrorSampler(window_seconds=60)
+        errors = []
+        for i in range(5):
+            try:
+                _raise_at_same_line(f"db down {i}")
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        # Act
+        decisions = [sampler.record(exc) for exc in errors]
+
+        # Assert
+        assert decisions[0] == (True, 0)
+        assert all(decision == (False, 0) for decision in decisions[1:])
+
+    def test_repeated_count_is_reported_on_next_window(self):
+        """Al abrirse una nueva ventana se informa de las repeticiones omitidas"""
+        # Arrange
+        sampler = ErrorSampler(window_seconds=60)
+        try:
+            _raise_at_same_line("boom")
+        except RuntimeError as exc:
+            error = exc
+        for _ in range(3):
+            sampler.record(error)
+
+        # Act
+        sampler.window_seconds = 0
+        capture, repeated = sampler.record(error)
+
+        # Assert
+        assert capture is True
+        assert repeated == 2
+
+    def test_global_traceback_budget(self):
+        """Hay un tope de tracebacks por ventana aunque los errores sean distintos"""
+        # Arrange
+        sampler = ErrorSampler(window_seconds=60, max_tracebacks_per_window=2)
+        errors = [ValueError("a"), KeyError("b"), TypeError("c")]
+
+        # Act
+        captured = [sampler.record(exc)[0] for exc in errors]
+
+        # Assert
+        assert captured == [True, True, False]
+
+    def test_json_formatter_includes_extra_and_exception(self):
+        """El formateador JSON incluye el contexto y el traceback"""
+        # Arrange
+        try:
+            _raise_at_same_line("boom")
+        except RuntimeError as exc:
+            record = logging.makeLogRecord({
+                "name": "app.test",
+                "levelname": "ERROR",
+                "msg": "failed %s",
+                "args": ("request",),
+                "exc_info": (type(exc), exc, exc.__traceback__),
+                "path": "/api/v1/users/",
+            })
+
+        # Act
+        entry = json.loads(JsonFormatter().format(record))
+
+        # Assert
+        assert entry["message"] == "failed request"
+        assert entry["path"] == "/api/v1/users/"
+        assert "RuntimeError: boom" in entry["exception"]
+
+    def test_full_queue_drops_records(self):
+        """Con la cola llena los registros se descartan sin bloquear"""
+        # Arrange
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        record = logging.makeLogRecord({"msg": "hello"})
+
+        # Act
+        handler.handle(record)
+        handler.handle(record)
+
+        # Assert
+        assert handler.dropped == 1
+
+    def test_dropped_records_are_exported_as_metric(self):
+        """Los registros descartados se ven en las métricas"""
+        # Arrange
+        handler = NonBlockingQueueHandler(queue.Queue(1))
+        record = logging.makeLogRecord({"msg": "hello"})
+        before = log_records_dropped.value()
+
+        # Act
+        handler.handle(record)
+        handler.handle(record)
+
+        # Assert
+        assert log_records_dropped.value() == before + 1
+        assert metrics.snapshot()["log_records_dropped_total"] == [{"labels": {}, "value": before + 1}]
+
+
+class TestConfigureLogging:
+    """Tests de la instalación del logging en el logger raíz"""
+
+    @pytest.fixture
+    def root(self):
+        root = logging.getLogger()
+        saved = list(root.handlers), root.level
+        shutdown_logging()
+        yield root
+        shutdown_logging()
+        root.handlers, root.level = saved
+
+    def test_existing_handlers_keep_receiving_records_and_are_restored(self, root):
+        """Los handlers previos reciben los logs desde el listener y vuelven al terminar"""
+        # Arrange
+        captured = []
+        existing = logging.Handler()
+        existing.emit = captured.append
+        root.handlers = [existing]
+
+        # Act
+        configure_logging(get_settings())
+        installed = list(root.handlers)
+        logging.getLogger("test.configure").warning("through the queue")
+        shutdown_logging()
+
+        # Assert
+        assert existing not in installed
+        assert [record.getMessage() for record in captured] == ["through the queue"]
+        assert root.handlers == [existing]
+
+    def test_repeated_configure_does_not_duplicate_handlers(self, root):
+        """Arrancar y parar varias veces no acumula handlers propios"""
+        # Arrange
+        root.handlers = []
+
+        # Act
+        for _ in range(3):
+            configure_logging(get_settings())
+            shutdown_logging()
+
+        # Assert
+        assert len(root.handlers) == 1
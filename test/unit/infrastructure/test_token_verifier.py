@@ -0,0 +1,200 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from jose import jwt
+from app.config.settings import get_settings
+from app.infrastructure.auth.token_verifier import (
+    JWTKeyRing,
+    PreparedKey,
+    TokenExpiredError,
+    TokenVerificationError,
+)
+
+SECRET = "test-secret"
+
+
+def _key_ring(secret=SECRET, kid=None, previous=None, cache_size=100):
+    signing_key = PreparedKey.from_material(kid, "HS256", secret)
+    verification_keys = {kid: signing_key}
+    verification_keys.update(previous or {})
+    return JWTKeyRing("HS256", signing_key, verification_keys, cache_size)
+
+
+def _claims(minutes=5):
+    return {"sub": "user@example.com", "exp": datetime.utcnow() + timedelta(minutes=minutes)}
+
+
+class TestJWTKeyRing:
+    """Tests del verificador de JWT con claves preparadas"""
+
+    def test_round_trip(self):
+        """Un token firmado por el key ring se verifica con el mismo key ring"""
+        # Arrange
+        key_ring = _key_ring()
+
+        # Act
+        claims = key_ring.decode(key_ring.encode(_claims()))
+
+        # Assert
+        assert claims["sub"] == "user@example.com"
+        assert isinstance(claims["exp"], int)
+
+    def test_compatible_with_jose(self):
+        """Los tokens son intercambiables con python-jose en ambos sentidos"""
+        # Arrange
+        key_ring = _key_ring()
+
+        # Act
+        decoded_by_jose = jwt.decode(key_ring.encode(_claims()), SECRET, algorithms=["HS256"])
+        decoded_by_ring = key_ring.decode(jwt.encode(_claims(), SECRET, algorithm="HS256"))
+
+        # Assert
+        assert decoded_by_jose["sub"] == "user@example.com"
+        assert decoded_by_ring["sub"] == "user@example.com"
+
+    def test_expired_token_is_rejected(self):
+        """Un token expirado lanza TokenExpiredError"""
+        # Arrange
+        key_ring = _key_ring()
+        token = key_ring.encode(_claims(minutes=-1))
+
+        # Act & Assert
+        with pytest.raises(TokenExpiredError):
+            key_ring.decode(token)
+
+    def test_cached_token_expires(self):
+        """La caché no devuelve un token cuyo exp ya ha pasado"""
+        # Arrange
+        key_ring = _key_ring()
+        token = key_ring.encode({"sub": "user@example.com", "exp": int(time.time()) + 60})
+        key_ring.decode(token)
+        claims, _ = key_ring._cache[token]
+        key_ring._cache[token] = (claims, time.time() - 1)
+
+        # Act & Assert
+        with pytest.raises(TokenExpiredError):
+            key_ring.decode(token)
+        assert token not in key_ring._cache
+
+    def test_tampered_token_is_rejected(self):
+        """Un token con el payload modificado no pasa la verificación"""
+        # Arrange
+        key_ring = _key_ring()
+        header, _, signature = key_ring.encode(_claims()).split(".")
+        forged_payload = key_ring.encode({"sub": "admin@example.com"}).split(".")[1]
+
+        # Act & Assert
+        with pytest.raises(TokenVerificationError):
+            key_ring.decode(f"{header}.{forged_payload}.{signature}")
+
+    def test_wrong_secret_and_malformed_tokens_are_rejected(self):
+        """Tokens de otra clave o mal formados son inválidos"""
+        # Arrange
+        key_ring = _key_ring()
+        foreign = jwt.encode(_claims(), "other-secret", algorithm="HS256")
+
+        # Act & Assert
+        for token in (foreign, "not-a-token", "a.b.c"):
+            with pytest.raises(TokenVerificationError):
+                key_ring.decode(token)
+
+    def test_algorithm_mismatch_is_rejected(self):
+        """Un token con otro 'alg' (p. ej. 'none') se rechaza antes de verificar"""
+        # Arrange
+        key_ring = _key_ring()
+        token = jwt.encode(_claims(), SECRET, algorithm="HS512")
+
+        # Act & Assert
+        with pytest.raises(TokenVerificationError):
+            key_ring.decode(token)
+
+    def test_kid_rotation(self):
+        """Los tokens firmados con la clave anterior siguen siendo válidos"""
+        # Arrange
+        old_ring = _key_ring(secret="old-secret", kid="v1")
+        old_token = old_ring.encode(_claims())
+        new_ring = _key_ring(
+            secret="new-secret",
+            kid="v2",
+            previous={"v1": PreparedKey.from_material("v1", "HS256", "old-secret")},
+        )
+
+        # Act
+        claims = new_ring.decode(old_token)
+
+        # Assert
+        assert claims["sub"] == "user@example.com"
+        assert jwt.get_unverified_header(new_ring.encode(_claims()))["kid"] == "v2"
+
+    def test_verified_tokens_are_cached(self, monkeypatch):
+        """Un token ya verificado no vuelve a comprobar la firma"""
+        # Arrange
+        key_ring = _key_ring()
+        token = key_ring.encode(_claims())
+        key_ring.decode(token)
+        monkeypatch.setattr(key_ring, "_verify", lambda *args: pytest.fail("firma verificada de nuevo"))
+
+        # Act
+        claims = key_ring.decode(token)
+
+        # Assert
+        assert claims["sub"] == "user@example.com"
+
+    def test_cache_is_bounded(self):
+        """La caché descarta los tokens más antiguos al llenarse"""
+        # Arrange
+        key_ring = _key_ring(cache_size=2)
+        tokens = [key_ring.encode({"sub": f"user{i}@example.com", "exp": int(time.time()) + 60}) for i in range(3)]
+
+        # Act
+        for token in tokens:
+            key_ring.decode(token)
+
+        # Assert
+        assert list(key_ring._cache) == tokens[1:]
+
+    def test_cache_evicts_least_recently_used(self):
+        """Un token usado de nuevo pasa al final y no es el siguiente en descartarse"""
+        # Arrange
+        key_ring = _key_ring(cache_size=2)
+        tokens = [key_ring.encode({"sub": f"user{i}@example.com", "exp": int(time.time()) + 60}) for i in range(3)]
+        key_ring.decode(tokens[0])
+        key_ring.decode(tokens[1])
+
+        # Act
+        key_ring.decode(tokens[0])
+        key_ring.decode(tokens[2])
+
+        # Assert
+        assert list(key_ring._cache) == [tokens[0], tokens[2]]
+
+    def test_rs256_from_settings(self):
+        """Con claves RSA se firma con la privada y se verifica con la pública"""
+        # Arrange
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        ).decode()
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        ).decode()
+        settings = get_settings().model_copy(update={
+            "JWT_ALGORITHM": "RS256",
+            "JWT_KEY_ID": "rsa-1",
+            "JWT_PRIVATE_KEY": private_pem,
+            "JWT_PUBLIC_KEY": public_pem,
+        })
+        key_ring = JWTKeyRing.from_settings(settings)
+
+        # Act
+        token = key_ring.encode(_claims())
+
+        # Assert
+        assert key_ring.decode(token)["sub"] == "user@example.com"
+        assert jwt.decode(token, public_pem, algorithms=["RS256"])["sub"] == "user@example.com"
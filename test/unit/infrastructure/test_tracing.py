@@ -0,0 +1,152 @@
+import asyncio
+import json
+import pytest
+from app.config.settings import get_settings
+from app.infrastructure.telemetry.tracing import (
+    NOOP_SPAN,
+    BatchSpanProcessor,
+    Tracer,
+    configure_tracing,
+    parse_traceparent,
+    shutdown_tracing,
+    traced,
+    tracer as global_tracer,
+)
+
+
+class _MemoryExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def memory_tracer():
+    exporter = _MemoryExporter()
+    tracer = Tracer()
+    tracer.enabled = True
+    tracer.processor = BatchSpanProcessor(exporter, schedule_delay=0.01)
+    yield tracer, exporter
+    tracer.processor.shutdown()
+
+
+class TestTracing:
+    """Tests para el API de spans"""
+
+    def test_disabled_tracer_returns_noop_span(self):
+        """Con el tracing desactivado no se crean spans"""
+        # Arrange
+        tracer = Tracer()
+
+        # Assert
+        assert tracer.start_span("anything") is NOOP_SPAN
+
+    def test_nested_spans_share_trace(self, memory_tracer):
+        """Los spans hijos heredan la traza y apuntan al padre"""
+        # Arrange
+        tracer, exporter = memory_tracer
+
+        # Act
+        with tracer.start_span("controller") as parent:
+            with tracer.start_span("usecase") as child:
+                pass
+        tracer.processor.shutdown()
+
+        # Assert
+        assert [span.name for span in exporter.spans] == ["usecase", "controller"]
+        assert child.trace_id == parent.trace_id
+        assert child.parent_span_id == parent.span_id
+        assert parent.parent_span_id is None
+        assert parent.end_ns >= child.end_ns >= child.start_ns >= parent.start_ns
+
+    def test_context_propagates_to_threadpool(self, memory_tracer):
+        """El span actual se propaga a los hilos del threadpool"""
+        # Arrange
+        tracer, exporter = memory_tracer
+
+        def work():
+            with tracer.start_span("repository"):
+                pass
+
+        async def handler():
+            with tracer.start_span("request") as root:
+                await asyncio.to_thread(work)
+            return root
+
+        # Act
+        root = asyncio.run(handler())
+        tracer.processor.shutdown()
+
+        # Assert
+        repository = next(span for span in exporter.spans if span.name == "repository")
+        assert repository.parent_span_id == root.span_id
+
+    def test_unsampled_trace_records_nothing(self, memory_tracer):
+        """Si la raíz no se muestrea, tampoco se registran sus hijos"""
+        # Arrange
+        tracer, exporter = memory_tracer
+        tracer.sample_rate = 0.0
+
+        # Act
+        with tracer.start_span("root") as root:
+            child = tracer.start_span("child")
+        tracer.processor.shutdown()
+
+        # Assert
+        assert not root.recording
+        assert child is NOOP_SPAN
+        assert exporter.spans == []
+
+    def test_exception_marks_span_as_error(self, memory_tracer):
+        """Una excepción dentro del span lo marca como erróneo"""
+        # Arrange
+        tracer, exporter = memory_tracer
+
+        # Act
+        with pytest.raises(ValueError):
+            with tracer.start_span("failing"):
+                raise ValueError("boom")
+        tracer.processor.shutdown()
+
+        # Assert
+        assert exporter.spans[0].to_otlp()["status"] == {"code": 2, "message": "ValueError: boom"}
+
+    def test_parse_traceparent(self):
+        """Interpreta la cabecera W3C traceparent"""
+        # Act
+        parsed = parse_traceparent("00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01")
+
+        # Assert
+        assert parsed == (0x4bf92f3577b34da6a3ce929d0e0e4736, 0x00f067aa0ba902b7, True)
+        assert parse_traceparent("garbage") is None
+
+    def test_file_exporter_writes_otlp_json(self, tmp_path):
+        """El exportador a fichero escribe lotes OTLP/JSON"""
+        # Arrange
+        settings = get_settings().model_copy(update={
+            "TRACING_ENABLED": True,
+            "TRACING_FILE_PATH": str(tmp_path / "spans.jsonl"),
+        })
+
+        @traced()
+        def decorated():
+            return 42
+
+        # Act
+        configure_tracing(settings)
+        try:
+            with global_tracer.start_span("root"):
+                assert decorated() == 42
+        finally:
+            shutdown_tracing()
+
+        # Assert
+        lines = (tmp_path / "spans.jsonl").read_text().splitlines()
+        spans = [
+            span
+            for line in lines
+            for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        ]
+        assert {span["name"] for span in spans} == {"root", decorated.__qualname__}
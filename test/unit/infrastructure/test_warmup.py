@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from unittest.mock import Mock
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from app.domain.entities import Base
+from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.health.warmup import WarmUp, warm_pool, warm_serializers, warm_statements
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'warmup.db'}", pool_size=3, max_overflow=2)
+    yield engine
+    engine.dispose()
+
+
+class TestWarmUp:
+    """Tests del calentamiento inicial"""
+
+    def test_runs_every_step_and_finishes(self):
+        """Ejecuta los pasos en orden y queda terminado"""
+        # Arrange
+        calls = []
+        warmup = WarmUp({"a": lambda: calls.append("a"), "b": lambda: calls.append("b")})
+
+        # Act
+        asyncio.run(warmup.run())
+
+        # Assert
+        assert calls == ["a", "b"]
+        assert warmup.finished is True
+        assert warmup.results["a"]["ok"] is True
+
+    def test_failed_step_does_not_stop_the_rest(self):
+        """Un paso que falla se registra y los siguientes se ejecutan"""
+        # Arrange
+        last = Mock()
+        warmup = WarmUp({"broken": Mock(side_effect=RuntimeError("boom")), "last": last})
+
+        # Act
+        asyncio.run(warmup.run())
+
+        # Assert
+        assert warmup.results["broken"] == {"ok": False, "error": "RuntimeError"}
+        last.assert_called_once()
+        assert warmup.finished is True
+
+    def test_timeout_marks_warmup_as_finished(self):
+        """Pasado el timeout se da por terminado aunque el paso siga en curso"""
+        # Arrange
+        release = threading.Event()
+        warmup = WarmUp({"slow": lambda: release.wait(5)}, timeout=0.05)
+
+        # Act
+        asyncio.run(warmup.run())
+        release.set()
+
+        # Assert
+        assert warmup.finished is True
+        assert "slow" not in warmup.results
+
+    def test_disabled_warmup_is_finished_without_running(self):
+        """Desactivado no ejecuta nada y no retrasa readiness"""
+        # Arrange
+        step = Mock()
+        warmup = WarmUp({"step": step}, enabled=False)
+
+        # Act
+        asyncio.run(warmup.run())
+
+        # Assert
+        assert warmup.finished is True
+        step.assert_not_called()
+
+
+class TestWarmUpSteps:
+    """Tests de los pasos de calentamiento"""
+
+    def test_warm_pool_leaves_connections_open_in_the_pool(self, engine):
+        """Abre como mucho el tamaño del pool y las deja disponibles"""
+        # Act
+        opened = warm_pool(engine, 10)
+
+        # Assert
+        assert opened == 3
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+
+    def test_warm_statements_fills_the_compiled_cache(self, engine):
+        """Las sentencias calientes quedan compiladas en la caché del engine"""
+        # Arrange
+        Base.metadata.create_all(bind=engine)
+
+        # Act
+        warm_statements(engine)
+
+        # Assert
+        assert len(engine._compiled_cache) >= 8
+
+    def test_warm_statements_skips_exact_count(self, engine, monkeypatch):
+        """El count(*) exacto no se ejecuta al arrancar: recorrería la tabla entera"""
+        # Arrange
+        Base.metadata.create_all(bind=engine)
+        count = Mock(return_value=0)
+        monkeypatch.setattr(UserRepository, "count", count)
+
+        # Act
+        warm_statements(engine)
+
+        # Assert
+        count.assert_not_called()
+
+    def test_warm_serializers_validates_and_dumps(self):
+        """Cada adaptador valida y serializa su ejemplo"""
+        # Arrange
+        adapter = Mock(wraps=TypeAdapter(int))
+
+        # Act
+        warm_serializers([(adapter, "1")])
+
+        # Assert
+        adapter.validate_python.assert_called_once_with("1")
+        adapter.dump_json.assert_called_once_with(1)